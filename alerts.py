@@ -0,0 +1,435 @@
+# alerts.py - Moteur d'alertes sur les seuils (évaluation incrémentale des nouveaux points)
+#
+# Chaque instantané ajouté à la base des rapports fournit des points datés (niveau
+# d'enrichissement, stock à 60%, temps de breakout, jours sans inspection). Seuls les
+# points postérieurs au curseur enregistré sont évalués : l'historique n'est jamais
+# rescanné. L'état des règles (actif, premier franchissement, acquittement) et les
+# événements à diffuser sont conservés dans une base SQLite locale ; un thread
+# d'arrière-plan évalue les nouveaux points puis livre les événements aux sorties
+# configurées (fichier JSON lignes, webhook).
+import argparse
+import json
+import logging
+import operator
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import requests
+import streamlit as st
+
+import data_store
+from utils import get_threat_level
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB_PATH = os.environ.get("IAEA_ALERTS_DB", os.path.join(BASE_DIR, "data", "alerts.sqlite"))
+ALERTS_LOG_ENV = "IAEA_ALERTS_LOG"
+ALERTS_WEBHOOK_ENV = "IAEA_ALERTS_WEBHOOK"
+ALERTS_INTERVAL_ENV = "IAEA_ALERTS_INTERVAL"
+DEFAULT_ALERTS_LOG = os.path.join(BASE_DIR, "data", "alerts.jsonl")
+DEFAULT_INTERVAL = 60  # secondes
+WEBHOOK_TIMEOUT = (5, 10)
+
+# Seuils propres aux alertes (les autres viennent du dictionnaire « thresholds » du rapport)
+BREAKOUT_ALERT_DAYS = 30
+INSPECTION_GAP_DAYS = 90
+
+OPERATORS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+
+# Règles évaluées, dans l'ordre d'affichage des badges
+RULES = [
+    {
+        "id": "weapons_grade",
+        "label": "Enrichissement de qualité militaire",
+        "metric": "enrichment_level",
+        "op": ">=",
+        "threshold": lambda thresholds: thresholds["weapons_grade"],
+        "severity": "critical",
+        "badge": lambda value, threshold: f"☢️ {value:g}% ≥ seuil militaire",
+    },
+    {
+        "id": "jcpoa_limit",
+        "label": "Enrichissement au-delà de la limite JCPOA",
+        "metric": "enrichment_level",
+        "op": ">",
+        "threshold": lambda thresholds: thresholds["jcpoa_limit"],
+        "severity": "warning",
+        "badge": lambda value, threshold: f"⚠️ {value:g}% Enrichissement",
+    },
+    {
+        "id": "significant_quantity",
+        "label": "Stock à 60% supérieur à une quantité significative",
+        "metric": "stock_60",
+        "op": ">=",
+        "threshold": lambda thresholds: thresholds["significant_quantity"],
+        "severity": "critical",
+        "badge": lambda value, threshold: f"💣 {int(value // threshold)} bombes potentielles",
+    },
+    {
+        "id": "breakout_time",
+        "label": f"Temps de breakout inférieur à {BREAKOUT_ALERT_DAYS} jours",
+        "metric": "breakout_time",
+        "op": "<=",
+        "threshold": lambda thresholds: BREAKOUT_ALERT_DAYS,
+        "severity": "critical",
+        "badge": lambda value, threshold: f"🕒 Breakout: {value:g} jours",
+    },
+    {
+        "id": "no_inspection",
+        "label": f"Plus de {INSPECTION_GAP_DAYS} jours sans inspection des sites à 60%",
+        "metric": "days_without_inspection",
+        "op": ">",
+        "threshold": lambda thresholds: INSPECTION_GAP_DAYS,
+        "severity": "warning",
+        "badge": lambda value, threshold: f"📋 AIEA: {value:.0f} jours sans inspection",
+    },
+]
+RULES_BY_ID = {rule["id"]: rule for rule in RULES}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alert_state (
+    rule_id TEXT PRIMARY KEY,
+    active INTEGER NOT NULL,
+    first_crossed TEXT,
+    active_since TEXT,
+    acknowledged_at TEXT,
+    last_date TEXT,
+    last_value REAL,
+    threshold REAL
+);
+CREATE TABLE IF NOT EXISTS alert_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    rule_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    date TEXT NOT NULL,
+    value REAL,
+    threshold REAL,
+    created_at TEXT NOT NULL,
+    delivered_at TEXT
+);
+CREATE TABLE IF NOT EXISTS cursors (
+    source TEXT PRIMARY KEY,
+    position TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_pending ON alert_events(delivered_at);
+"""
+
+_evaluate_lock = threading.Lock()
+
+
+def connect(db_path=DEFAULT_DB_PATH):
+    """Ouvre une connexion SQLite et crée le schéma si nécessaire"""
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def store_signature(db_path=DEFAULT_DB_PATH):
+    """Signature (mtime, taille) de la base : change à chaque évaluation ou acquittement"""
+    try:
+        stat = os.stat(db_path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def snapshot_points(reports_conn, report_date, thresholds, after_history_date):
+    """Points (metric, date, value) apportés par un instantané, dans l'ordre chronologique.
+
+    Seules les lignes d'historique postérieures à after_history_date sont reprises.
+    """
+    points = [
+        ("enrichment_level", date, level)
+        for date, level in reports_conn.execute(
+            "SELECT date, level FROM enrichment_history WHERE report_date = ? AND date > ? AND level IS NOT NULL "
+            "ORDER BY date", (report_date, after_history_date or ""))
+    ]
+    stock_60, = reports_conn.execute(
+        "SELECT uranium_60_percent FROM snapshots WHERE report_date = ?", (report_date,)).fetchone()
+    if stock_60 is not None:
+        points.append(("stock_60", report_date, stock_60))
+    if "breakout_time" in thresholds:
+        points.append(("breakout_time", report_date, thresholds["breakout_time"]))
+    # Dernière vérification : inspection la plus récente des sites d'enrichissement à 60%
+    inspections = [
+        last_inspection for last_inspection, levels in reports_conn.execute(
+            "SELECT last_inspection, enrichment_levels FROM facilities WHERE report_date = ?", (report_date,))
+        if last_inspection and any("60%" in level for level in json.loads(levels))
+    ]
+    if inspections:
+        gap = datetime.fromisoformat(report_date) - datetime.fromisoformat(max(inspections))
+        points.append(("days_without_inspection", report_date, gap.days))
+    return sorted(points, key=lambda point: point[1])
+
+
+def _load_states(conn):
+    columns = ["rule_id", "active", "first_crossed", "active_since", "acknowledged_at",
+               "last_date", "last_value", "threshold"]
+    states = {rule["id"]: {"rule_id": rule["id"], "active": 0, "first_crossed": None, "active_since": None,
+                           "acknowledged_at": None, "last_date": None, "last_value": None, "threshold": None}
+              for rule in RULES}
+    for row in conn.execute(f"SELECT {', '.join(columns)} FROM alert_state"):
+        if row[0] in states:
+            states[row[0]] = dict(zip(columns, row))
+    return states
+
+
+def apply_point(states, metric, date, value, thresholds):
+    """Met à jour l'état des règles portant sur metric ; renvoie les événements (rule_id, kind, date, value, seuil)"""
+    events = []
+    for rule in RULES:
+        if rule["metric"] != metric:
+            continue
+        try:
+            threshold = rule["threshold"](thresholds)
+        except KeyError:
+            continue
+        state = states[rule["id"]]
+        crossed = OPERATORS[rule["op"]](value, threshold)
+        if crossed and not state["active"]:
+            state.update(active=1, active_since=date, acknowledged_at=None,
+                         first_crossed=state["first_crossed"] or date)
+            events.append((rule["id"], "raised", date, value, threshold))
+        elif not crossed and state["active"]:
+            state.update(active=0, active_since=None)
+            events.append((rule["id"], "cleared", date, value, threshold))
+        state.update(last_date=date, last_value=value, threshold=threshold)
+    return events
+
+
+def evaluate_new(db_path=DEFAULT_DB_PATH, reports_db=data_store.DEFAULT_DB_PATH):
+    """Évalue les instantanés postérieurs au curseur ; renvoie le nombre d'événements créés"""
+    data_store.sync_reports_dir(reports_db)
+    with _evaluate_lock:
+        conn = connect(db_path)
+        reports_conn = data_store.connect(reports_db)
+        try:
+            cursors = dict(conn.execute("SELECT source, position FROM cursors"))
+            new_snapshots = reports_conn.execute(
+                "SELECT report_date, thresholds FROM snapshots WHERE report_date > ? ORDER BY report_date",
+                (cursors.get("snapshots", ""),)).fetchall()
+            if not new_snapshots:
+                return 0
+
+            states = _load_states(conn)
+            created = 0
+            for report_date, thresholds in new_snapshots:
+                thresholds = json.loads(thresholds)
+                points = snapshot_points(reports_conn, report_date, thresholds, cursors.get("enrichment_history"))
+                events = []
+                for metric, date, value in points:
+                    events.extend(apply_point(states, metric, date, value, thresholds))
+                history_dates = [date for metric, date, _ in points if metric == "enrichment_level"]
+                if history_dates:
+                    cursors["enrichment_history"] = max(history_dates)
+                cursors["snapshots"] = report_date
+
+                # Un instantané = une transaction : état, événements et curseurs avancent ensemble
+                with conn:
+                    now = datetime.now().isoformat(timespec="seconds")
+                    conn.executemany(
+                        "INSERT INTO alert_events (rule_id, kind, date, value, threshold, created_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)", [(*event, now) for event in events])
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO alert_state VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        [(s["rule_id"], s["active"], s["first_crossed"], s["active_since"], s["acknowledged_at"],
+                          s["last_date"], s["last_value"], s["threshold"]) for s in states.values()])
+                    conn.executemany("INSERT OR REPLACE INTO cursors VALUES (?, ?)", cursors.items())
+                created += len(events)
+            return created
+        finally:
+            reports_conn.close()
+            conn.close()
+
+
+def acknowledge(rule_id, db_path=DEFAULT_DB_PATH):
+    """Acquitte une alerte active ; l'acquittement est levé si la règle se redéclenche"""
+    conn = connect(db_path)
+    try:
+        with conn:
+            updated = conn.execute(
+                "UPDATE alert_state SET acknowledged_at = ? WHERE rule_id = ? AND active = 1",
+                (datetime.now().isoformat(timespec="seconds"), rule_id)).rowcount
+    finally:
+        conn.close()
+    if not updated:
+        raise KeyError(f"Aucune alerte active pour la règle {rule_id}")
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _alert_states(db_path, signature):
+    """État des règles, mis en cache par signature de la base (relu après chaque évaluation)"""
+    conn = connect(db_path)
+    try:
+        states = _load_states(conn)
+    finally:
+        conn.close()
+    return [dict(states[rule["id"]], label=rule["label"], severity=rule["severity"]) for rule in RULES]
+
+
+def load_alert_states(db_path=DEFAULT_DB_PATH):
+    """État de chaque règle (ordre de RULES), partagé entre sessions : lecture seule"""
+    return _alert_states(db_path, store_signature(db_path))
+
+
+def badges(states):
+    """Badges à afficher : (classe CSS, texte) pour chaque alerte active, puis le niveau de menace"""
+    result = []
+    level = next((s["last_value"] for s in states if RULES_BY_ID[s["rule_id"]]["metric"] == "enrichment_level"
+                  and s["last_value"] is not None), None)
+    if level is not None:
+        threat_level, threat_icon = get_threat_level(level)
+        result.append(("critical-badge" if level >= 60 else "warning-badge", f"{threat_icon} Niveau: {threat_level}"))
+    for state in states:
+        if not state["active"]:
+            continue
+        text = RULES_BY_ID[state["rule_id"]]["badge"](state["last_value"], state["threshold"])
+        css_class = "critical-badge" if state["severity"] == "critical" else "warning-badge"
+        if state["acknowledged_at"]:
+            css_class, text = "iaea-badge", f"{text} ✓"
+        result.append((css_class, text))
+    return result
+
+
+SEVERITY_RANK = {"critical": 0, "warning": 1}
+
+
+def headline_alert(states):
+    """Alerte active la plus sévère (à sévérité égale, la plus ancienne), ou None si aucune n'est active"""
+    active = [state for state in states if state["active"]]
+    if not active:
+        return None
+    return min(active, key=lambda state: (SEVERITY_RANK.get(state["severity"], len(SEVERITY_RANK)),
+                                          state["first_crossed"] or state["active_since"] or ""))
+
+
+# ---------------------------------------------------------------------------
+# Diffusion
+# ---------------------------------------------------------------------------
+
+class FileSink:
+    """Ajoute chaque événement en JSON (une ligne) à un fichier local"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, event):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+
+class WebhookSink:
+    """Envoie chaque événement en POST JSON à une URL (IAEA_ALERTS_WEBHOOK)"""
+
+    def __init__(self, url, session=None):
+        self.url = url
+        self.session = session or requests.Session()
+
+    def send(self, event):
+        self.session.post(self.url, json=event, timeout=WEBHOOK_TIMEOUT).raise_for_status()
+
+
+def configured_sinks():
+    sinks = [FileSink(os.environ.get(ALERTS_LOG_ENV) or DEFAULT_ALERTS_LOG)]
+    if os.environ.get(ALERTS_WEBHOOK_ENV):
+        sinks.append(WebhookSink(os.environ[ALERTS_WEBHOOK_ENV]))
+    return sinks
+
+
+def deliver_pending(sinks, db_path=DEFAULT_DB_PATH):
+    """Livre les événements non encore diffusés ; renvoie le nombre livré.
+
+    Un événement n'est marqué livré qu'une fois accepté par toutes les sorties :
+    en cas d'échec il sera renvoyé au prochain passage (livraison au moins une fois).
+    """
+    conn = connect(db_path)
+    try:
+        pending = conn.execute(
+            "SELECT id, rule_id, kind, date, value, threshold, created_at FROM alert_events "
+            "WHERE delivered_at IS NULL ORDER BY id").fetchall()
+        delivered = 0
+        for event_id, rule_id, kind, date, value, threshold, created_at in pending:
+            event = {"id": event_id, "rule": rule_id, "label": RULES_BY_ID.get(rule_id, {}).get("label"),
+                     "severity": RULES_BY_ID.get(rule_id, {}).get("severity"), "kind": kind, "date": date,
+                     "value": value, "threshold": threshold, "created_at": created_at}
+            for sink in sinks:
+                sink.send(event)
+            with conn:
+                conn.execute("UPDATE alert_events SET delivered_at = ? WHERE id = ?",
+                             (datetime.now().isoformat(timespec="seconds"), event_id))
+            delivered += 1
+        return delivered
+    finally:
+        conn.close()
+
+
+class AlertScheduler(threading.Thread):
+    """Thread d'arrière-plan : évalue les nouveaux points puis livre les événements"""
+
+    def __init__(self, sinks, db_path=DEFAULT_DB_PATH, interval=DEFAULT_INTERVAL):
+        super().__init__(name="iaea-alerts", daemon=True)
+        self.sinks = list(sinks)
+        self.db_path = db_path
+        self.interval = interval
+        self.status = {"last_run": None, "events": 0, "delivered": 0, "error": None}
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.run_once()
+
+    def run_once(self):
+        self.status["last_run"] = datetime.now().isoformat(timespec="seconds")
+        try:
+            self.status["events"] += evaluate_new(self.db_path)
+            self.status["delivered"] += deliver_pending(self.sinks, self.db_path)
+            self.status["error"] = None
+        except Exception as exc:  # une sortie en erreur ne doit pas arrêter le thread
+            logger.warning("Alertes en échec : %s", exc)
+            self.status["error"] = str(exc)
+
+
+@st.cache_resource(show_spinner=False)
+def start_alerting():
+    """Démarre (une fois par processus) le thread d'alertes après une première évaluation"""
+    interval = float(os.environ.get(ALERTS_INTERVAL_ENV, DEFAULT_INTERVAL))
+    scheduler = AlertScheduler(configured_sinks(), interval=interval)
+    scheduler.run_once()
+    scheduler.start()
+    return scheduler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Alertes sur les seuils des rapports AIEA")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="chemin de la base SQLite des alertes")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("evaluate", help="évaluer les nouveaux instantanés et livrer les événements")
+    sub.add_parser("list", help="afficher l'état des règles")
+    sub_ack = sub.add_parser("ack", help="acquitter une alerte active")
+    sub_ack.add_argument("rule", choices=sorted(RULES_BY_ID))
+    args = parser.parse_args()
+
+    if args.command == "evaluate":
+        print(f"{evaluate_new(args.db)} événement(s), {deliver_pending(configured_sinks(), args.db)} livré(s)")
+    elif args.command == "ack":
+        acknowledge(args.rule, args.db)
+        print(f"{args.rule} acquittée")
+    else:
+        for state in _alert_states(args.db, store_signature(args.db)):
+            status = "ACTIVE" if state["active"] else "inactive"
+            if state["acknowledged_at"]:
+                status += f" (acquittée le {state['acknowledged_at']})"
+            print(f"{state['rule_id']:<22} {status:<46} premier franchissement {state['first_crossed'] or '—'}, "
+                  f"dernière valeur {state['last_value']} ({state['last_date']})")
+
+
+if __name__ == "__main__":
+    main()
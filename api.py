@@ -0,0 +1,170 @@
+# api.py - API JSON locale des KPI, de l'historique d'enrichissement et des sites (hors Streamlit)
+#
+#   python api.py                      # http://127.0.0.1:8502/api/kpis
+#   python api.py --port 9000 --host 0.0.0.0
+#
+# Les réponses sont sérialisées une fois par version des données (et par jour, pour
+# days_since_last) puis servies telles quelles : corps JSON et variante gzip précalculés,
+# ETag, réponse 304 sur If-None-Match. Aucun script Streamlit n'est exécuté ; la couche de
+# données (data_store, dataset.kpis) est la même que celle du tableau de bord.
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import date
+
+import data_store
+from dataset import kpis
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8502
+# Intervalle minimal entre deux vérifications de la base des rapports (secondes)
+REFRESH_INTERVAL = 5.0
+# Durée pendant laquelle un client peut réutiliser une réponse sans la revalider (secondes)
+MAX_AGE = 60
+# En dessous de cette taille, la compression ne vaut pas l'en-tête
+GZIP_MIN_BYTES = 512
+
+
+def _facilities(latest):
+    return [{"facility_id": facility_id, **facility} for facility_id, facility in latest["facilities"].items()]
+
+
+# Ressources servies : chemin -> construction du document à partir de l'instantané
+ENDPOINTS = {
+    "/api/kpis": lambda latest, today: kpis(latest, today),
+    "/api/enrichment_history": lambda latest, today: latest["enrichment_history"],
+    "/api/facilities": lambda latest, today: _facilities(latest),
+}
+
+
+def encode(document):
+    """Représentations précalculées d'un document : (corps, corps gzip ou None, ETag)"""
+    body = json.dumps(document, ensure_ascii=False, default=str, separators=(",", ":")).encode("utf-8")
+    etag = hashlib.sha1(body).hexdigest()[:20]
+    compressed = gzip.compress(body, compresslevel=6, mtime=0) if len(body) >= GZIP_MIN_BYTES else None
+    return body, compressed, etag
+
+
+class ResponseCache:
+    """Réponses prêtes à l'envoi, reconstruites quand la version des données ou le jour change"""
+
+    def __init__(self, db_path=data_store.DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self.responses = {}
+        self._key = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        now = time.monotonic()
+        if now - self._checked_at >= REFRESH_INTERVAL:
+            self.refresh()
+        return self.responses.get(path)
+
+    def refresh(self):
+        with self._lock:
+            self._checked_at = time.monotonic()
+            latest = data_store.load_snapshot(db_path=self.db_path)
+            today = date.today()
+            key = (latest["data_version"], today)
+            if key == self._key:
+                return False
+            responses = {}
+            for path, build in ENDPOINTS.items():
+                body, compressed, etag = encode(build(latest, today))
+                responses[path] = {"body": body, "gzip": compressed, "etag": etag}
+            index = {"report_date": latest["report_date"], "data_version": latest["data_version"],
+                     "endpoints": sorted(ENDPOINTS)}
+            body, compressed, etag = encode(index)
+            responses["/api"] = {"body": body, "gzip": compressed, "etag": etag}
+            # Bascule atomique : les requêtes en cours gardent l'ancien dictionnaire
+            self.responses = responses
+            self._key = key
+            logger.info("Réponses reconstruites pour le rapport %s", latest["report_date"])
+            return True
+
+
+def _header(scope, name):
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return b""
+
+
+class JsonApi:
+    """Application ASGI minimale : GET/HEAD sur les chemins de ENDPOINTS"""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    self.cache.refresh()
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+
+        if scope["method"] not in ("GET", "HEAD"):
+            await self._send(send, 405, b'{"error":"method not allowed"}', [(b"allow", b"GET, HEAD")])
+            return
+        response = self.cache.get(scope["path"].rstrip("/") or "/api")
+        if response is None:
+            await self._send(send, 404, b'{"error":"not found"}')
+            return
+
+        use_gzip = response["gzip"] is not None and b"gzip" in _header(scope, b"accept-encoding")
+        etag = f'"{response["etag"]}-gz"' if use_gzip else f'"{response["etag"]}"'
+        headers = [
+            (b"etag", etag.encode("ascii")),
+            (b"cache-control", f"public, max-age={MAX_AGE}".encode("ascii")),
+            (b"vary", b"Accept-Encoding"),
+        ]
+        # If-None-Match : l'ETag de l'une ou l'autre représentation valide la ressource
+        if_none_match = _header(scope, b"if-none-match")
+        if if_none_match and response["etag"].encode("ascii") in if_none_match:
+            await self._send(send, 304, b"", headers)
+            return
+        if use_gzip:
+            headers.append((b"content-encoding", b"gzip"))
+        body = response["gzip"] if use_gzip else response["body"]
+        await self._send(send, 200, body, headers, head_only=scope["method"] == "HEAD")
+
+    @staticmethod
+    async def _send(send, status, body, headers=(), head_only=False):
+        headers = list(headers)
+        if status != 304:
+            headers.append((b"content-type", b"application/json; charset=utf-8"))
+        headers.append((b"content-length", str(len(body)).encode("ascii")))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": b"" if head_only or status == 304 else body})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API JSON des données du tableau de bord")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--db", default=data_store.DEFAULT_DB_PATH, help="chemin de la base SQLite des rapports")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    logging.basicConfig(level=logging.INFO)
+    # Un seul processus, une seule boucle : l'essentiel du travail est précalculé
+    uvicorn.run(JsonApi(ResponseCache(args.db)), host=args.host, port=args.port,
+                http="httptools", access_log=False, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
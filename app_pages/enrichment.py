@@ -0,0 +1,112 @@
+# app_pages/enrichment.py - 📈 Évolution de l'enrichissement
+from datetime import datetime
+
+import plotly.graph_objs as go
+import streamlit as st
+from plotly.subplots import make_subplots
+
+from dataset import get_dataset, kpis
+from ledger import load_balances, reconcile
+from monte_carlo import production_prior, project_unverified_stock
+from profiling import span
+from utils import format_date_fr
+
+LATEST_IAEA_DATA, INSPECTION_HISTORY, DATA_VERSION = get_dataset()
+
+st.markdown("## 📈 Projection du stock non vérifié")
+
+# Dernière vérification : inspection la plus récente des sites d'enrichissement à 60%
+KPIS = kpis(LATEST_IAEA_DATA)
+last_verification = KPIS["last_verification"]
+df_history = LATEST_IAEA_DATA["frames"]["enrichment_history"]
+rate_60_mean, rate_60_std = production_prior(INSPECTION_HISTORY["date"], INSPECTION_HISTORY["stock_60pct"],
+                                             last_verification)
+rate_total_mean, rate_total_std = production_prior(df_history["date"], df_history["stock"], last_verification)
+
+st.markdown(f"""
+<div class='info-box'>
+    Aucune vérification depuis le <b>{last_verification}</b> ({KPIS['days_since_last']} jours). Les trajectoires
+    partent du dernier stock vérifié, appliquent une perte incertaine due aux frappes de juin 2025 puis, si
+    l'enrichissement a repris, une fraction de la production d'avant-frappes ({rate_60_mean:.1f} ± {rate_60_std:.1f} kg/mois à 60%,
+    {rate_total_mean:.0f} ± {rate_total_std:.0f} kg/mois au total).
+</div>
+""", unsafe_allow_html=True)
+
+col_mc1, col_mc2, col_mc3, col_mc4 = st.columns(4)
+with col_mc1:
+    loss_mean = st.slider("Perte moyenne due aux frappes", 0.0, 0.9, 0.3, step=0.05)
+with col_mc2:
+    capacity_low, capacity_high = st.slider("Capacité résiduelle (fraction)", 0.0, 1.0, (0.0, 0.3), step=0.05)
+with col_mc3:
+    resume_probability = st.slider("Probabilité de reprise", 0.0, 1.0, 0.5, step=0.05)
+with col_mc4:
+    n_paths = st.select_slider("Trajectoires", options=[10_000, 50_000, 100_000, 250_000, 500_000], value=100_000)
+
+with span("monte_carlo"):
+    df_projection, projection_summary = project_unverified_stock(
+        last_verification, datetime.now().strftime("%Y-%m-%d"),
+        LATEST_IAEA_DATA["uranium_60_percent"], LATEST_IAEA_DATA["uranium_total"],
+        rate_60_mean, rate_60_std, rate_total_mean, rate_total_std,
+        loss_mean=loss_mean, capacity_low=capacity_low, capacity_high=capacity_high,
+        resume_probability=resume_probability, n_paths=n_paths
+    )
+
+col_res1, col_res2, col_res3 = st.columns(3)
+with col_res1:
+    st.metric("Stock 60% médian aujourd'hui", f"{projection_summary['median_60_final']:.0f} kg",
+              delta=f"{projection_summary['median_60_final'] - LATEST_IAEA_DATA['uranium_60_percent']:.0f} kg")
+with col_res2:
+    st.metric("P(stock 60% > stock vérifié)", f"{projection_summary['prob_60_above_verified']:.0%}")
+with col_res3:
+    st.metric("P(stock total > stock vérifié)", f"{projection_summary['prob_total_above_verified']:.0%}")
+
+fig_projection = make_subplots(rows=1, cols=2, subplot_titles=("Stock à 60% (kg)", "Stock enrichi total (kg)"))
+verified = INSPECTION_HISTORY[INSPECTION_HISTORY["date"] <= last_verification]
+fig_projection.add_trace(go.Scatter(x=verified["date"], y=verified["stock_60pct"], name="Vérifié (60%)",
+                                    line=dict(color='#333333', width=2)), row=1, col=1)
+fig_projection.add_trace(go.Scatter(x=df_history["date"][df_history["date"] <= last_verification],
+                                    y=df_history["stock"][df_history["date"] <= last_verification],
+                                    name="Vérifié (total)", line=dict(color='#333333', width=2)), row=1, col=2)
+for col, series in ((1, "stock_60pct"), (2, "stock_total")):
+    bands = df_projection[df_projection["series"] == series].pivot(index="date", columns="percentile", values="value")
+    for low, high, opacity in ((5, 95, 0.15), (25, 75, 0.3)):
+        fig_projection.add_trace(go.Scatter(
+            x=list(bands.index) + list(bands.index[::-1]),
+            y=list(bands[high]) + list(bands[low][::-1]),
+            fill='toself', fillcolor=f"rgba(218, 0, 0, {opacity})", line=dict(width=0),
+            name=f"P{low}-P{high}", showlegend=col == 1, hoverinfo='skip'), row=1, col=col)
+    fig_projection.add_trace(go.Scatter(x=bands.index, y=bands[50], name="Médiane", showlegend=col == 1,
+                                        line=dict(color='#DA0000', width=2, dash='dash')), row=1, col=col)
+fig_projection.update_layout(height=450, template='plotly_white',
+                             title_text=f"Projection Monte Carlo ({projection_summary['n_paths']:,} trajectoires)")
+with span("projection/plotly_chart"):
+    st.plotly_chart(fig_projection, use_container_width=True)
+
+st.markdown("## ⚖️ Comptabilité des matières par site")
+report_date = LATEST_IAEA_DATA["report_date"]
+with span("ledger/balances"):
+    balances = load_balances(report_date)
+if balances.empty:
+    st.info("Registre des matières vide : `python ledger.py bootstrap` l'ouvre sur les totaux du dernier "
+            "rapport, puis `python ledger.py add` / `import` enregistre production, transferts, dilution et pertes.")
+else:
+    table = balances.pivot_table(index="facility", columns="level", values="balance", aggfunc="sum", fill_value=0.0)
+    table = table[sorted(table.columns, reverse=True)]
+    table.columns = [f"{level:g}%" for level in table.columns]
+    table.index.name = "Site"
+    st.markdown(f"Soldes au {format_date_fr(report_date)} (kg)")
+    st.dataframe(table.round(1), use_container_width=True)
+
+    with span("ledger/reconcile"):
+        reconciliation = reconcile()
+    gaps = reconciliation[~reconciliation["reconciled"]]
+    if gaps.empty:
+        st.success("Registre rapproché des totaux déclarés.")
+    else:
+        st.warning(f"{len(gaps)} écart(s) entre le registre et les totaux déclarés.")
+    st.dataframe(reconciliation.rename(columns={
+        "date": "Date", "source": "Source",
+        "reported_60": "Déclaré 60% (kg)", "ledger_60": "Registre 60% (kg)", "gap_60": "Écart 60% (kg)",
+        "reported_total": "Déclaré total (kg)", "ledger_total": "Registre total (kg)", "gap_total": "Écart total (kg)",
+        "reconciled": "Rapproché",
+    }), hide_index=True, use_container_width=True)
@@ -0,0 +1,156 @@
+# app_pages/facilities.py - 🏭 Sites nucléaires
+from datetime import date
+
+import streamlit as st
+
+from assets import load_borders
+from comparison import facility_card_html, facility_tables, select_pairs
+from dataset import get_dataset
+from figures import build_map_figure
+from observations import layer_files, load_layer
+from profiling import fragment, span
+
+LATEST_IAEA_DATA, INSPECTION_HISTORY, DATA_VERSION = get_dataset()
+
+st.markdown("## 🏭 Sites nucléaires")
+
+# Métriques par site et par paire : calculées une fois par version des données et par jour
+with span("facilities/tables"):
+    per_facility, pairs = facility_tables(DATA_VERSION, date.today().isoformat(),
+                                          LATEST_IAEA_DATA["facilities"], LATEST_IAEA_DATA["uranium_60_percent"])
+facilities_list = list(per_facility.index)
+
+
+def facility_card(facility_id):
+    st.markdown(facility_card_html(per_facility.loc[facility_id]), unsafe_allow_html=True)
+
+
+comparison_mode = st.toggle("Mode comparaison", value=st.session_state.comparison_mode, key="_comparison_mode")
+st.session_state.comparison_mode = comparison_mode
+
+if not comparison_mode:
+    current = st.session_state.selected_facility
+    selected_facility = st.selectbox(
+        "Site",
+        options=facilities_list,
+        index=facilities_list.index(current) if current in facilities_list else 0,
+        key="_facilities_page_site",
+    )
+    st.session_state.selected_facility = selected_facility
+    facility_card(selected_facility)
+else:
+    # Par défaut : le site surveillé et le suivant dans la liste
+    if "_compared_facilities" not in st.session_state:
+        first = st.session_state.selected_facility
+        first = first if first in facilities_list else facilities_list[0]
+        others = [f for f in facilities_list if f != first]
+        st.session_state["_compared_facilities"] = [first] + others[:1]
+    selected = st.multiselect("Sites comparés", facilities_list, key="_compared_facilities")
+
+    if not selected:
+        st.info("Choisissez au moins un site.")
+    else:
+        # Côte à côte : simple sélection de lignes dans les tables en cache
+        for column, facility_id in zip(st.columns(len(selected)), selected):
+            with column:
+                facility_card(facility_id)
+
+        table = per_facility.loc[selected, [
+            "access", "days_since_inspection", "max_enrichment", "strike", "inventory_kg",
+        ]].rename(columns={
+            "access": "Accès AIEA",
+            "days_since_inspection": "Jours sans inspection",
+            "max_enrichment": "Enrichissement max (%)",
+            "strike": "Frappes",
+            "inventory_kg": "Inventaire U 60% (kg)",
+        })
+        st.dataframe(table.T.astype(str), use_container_width=True)
+
+        if len(selected) > 1:
+            st.markdown("#### Écarts par paire de sites")
+            pair_table = select_pairs(pairs, selected).rename(columns={
+                "a": "Site A",
+                "b": "Site B",
+                "distance_km": "Distance (km)",
+                "delta_days_since_inspection": "Δ jours sans inspection (A - B)",
+                "delta_max_enrichment": "Δ enrichissement max (A - B)",
+                "delta_inventory_kg": "Δ inventaire (kg, A - B)",
+                "delta_access": "Δ restriction d'accès",
+                "delta_strike": "Δ gravité des frappes",
+                "same_access": "Même accès",
+            })
+            st.dataframe(pair_table, hide_index=True, use_container_width=True,
+                         column_config={"Distance (km)": st.column_config.NumberColumn(format="%.0f")})
+        st.caption("Inventaire estimé : stock national à 60% attribué aux sites de stockage "
+                   "lorsque le rapport ne le ventile pas par site.")
+
+
+# Carte : fenêtre pilotée par le centre, le zoom et les flèches ; seules les observations
+# visibles sont extraites de l'index spatial et envoyées au navigateur
+MAP_VIEW_IRAN = (32.5, 53.5)
+# Étendue (degrés de latitude, de longitude) au zoom 1
+MAP_SPAN = (16.0, 20.0)
+
+
+@fragment
+def map_section():
+    """Carte des sites et des couches d'observations ; chaque interaction ne relance que ce fragment"""
+    layers = layer_files()
+    col_center, col_zoom, col_layers = st.columns([2, 2, 3])
+    with col_center:
+        centers = {"Iran": MAP_VIEW_IRAN}
+        centers.update({fid: (row["lat"], row["lon"]) for fid, row in per_facility.iterrows()})
+        center_name = st.selectbox("Centrer sur", list(centers), key="_map_center_name")
+    with col_zoom:
+        zoom = st.select_slider("Zoom", options=list(range(1, 9)), value=1, key="_map_zoom")
+    with col_layers:
+        selected_layers = st.multiselect("Couches d'observations", list(layers), default=list(layers)[:1],
+                                         key="_map_layers")
+
+    # Centre : repris du sélecteur quand il change, puis déplacé par les flèches
+    if st.session_state.get("_map_center_from") != center_name:
+        st.session_state["_map_center_from"] = center_name
+        st.session_state["_map_center"] = centers[center_name]
+    lat_span, lon_span = MAP_SPAN[0] / 2 ** (zoom - 1), MAP_SPAN[1] / 2 ** (zoom - 1)
+
+    col_pan = st.columns(5)
+    moves = {"←": (0, -1), "↑": (1, 0), "↓": (-1, 0), "→": (0, 1)}
+    for column, (arrow, (d_lat, d_lon)) in zip(col_pan, moves.items()):
+        with column:
+            if st.button(arrow, key=f"_map_pan_{arrow}", use_container_width=True):
+                lat, lon = st.session_state["_map_center"]
+                st.session_state["_map_center"] = (lat + d_lat * lat_span / 2, lon + d_lon * lon_span / 2)
+    lat, lon = st.session_state["_map_center"]
+    bounds = (lat - lat_span / 2, lat + lat_span / 2, lon - lon_span / 2, lon + lon_span / 2)
+
+    layer_views = []
+    if selected_layers:
+        indexes = {name: load_layer(name) for name in selected_layers}
+        months = sorted(set().union(*(index.keys() for index in indexes.values())))
+        if not months:
+            st.info("Les couches sélectionnées ne contiennent aucune observation.")
+        else:
+            with col_pan[4]:
+                month = st.select_slider("Période", options=months, value=months[-1], key="_map_month") \
+                    if len(months) > 1 else months[0]
+            with span("map/viewport"):
+                for name, index in indexes.items():
+                    if month in index:
+                        kind, frame = index[month].viewport(bounds)
+                        layer_views.append((name, kind, frame))
+    elif not layers:
+        st.caption("Aucune couche d'observations dans data/observations "
+                   "(`python observations.py generate <nom>` crée une couche de test).")
+
+    with span("map/build"):
+        fig = build_map_figure(bounds, load_borders(), per_facility, layer_views)
+    st.plotly_chart(fig, use_container_width=True)
+    if layer_views:
+        st.caption(" · ".join(
+            f"{name} : {len(frame)} point(s)" if kind == "points"
+            else f"{name} : {int(frame['count'].sum())} observation(s) en {len(frame)} agrégat(s)"
+            for name, kind, frame in layer_views))
+
+
+st.markdown("### 🗺️ Carte des sites")
+map_section()
@@ -0,0 +1,196 @@
+# app_pages/main_dashboard.py - 📊 Tableau de bord principal
+from datetime import datetime
+
+import streamlit as st
+
+from alerts import acknowledge, badges, headline_alert, load_alert_states
+from dataset import get_dataset, kpis
+from figures import build_main_figure, build_timeline_figure
+from profiling import fragment, span
+from utils import format_date_fr, get_facility_status_color
+
+LATEST_IAEA_DATA, INSPECTION_HISTORY, DATA_VERSION = get_dataset()
+KPIS = kpis(LATEST_IAEA_DATA)
+
+# Badges contextuels : alimentés par l'état des alertes (évalué en arrière-plan, voir alerts.py)
+with span("badges"):
+    alert_states = load_alert_states()
+    badge_list = badges(alert_states)
+    for column, (css_class, text) in zip(st.columns(max(1, len(badge_list))), badge_list):
+        with column:
+            st.markdown(f"<span class='{css_class}'>{text}</span>", unsafe_allow_html=True)
+
+    active_alerts = [state for state in alert_states if state["active"]]
+    if active_alerts:
+        with st.expander(f"🔔 Alertes actives ({len(active_alerts)})"):
+            for state in active_alerts:
+                col_alert, col_ack = st.columns([4, 1])
+                with col_alert:
+                    st.markdown(f"**{state['label']}** — valeur {state['last_value']:g} (seuil {state['threshold']:g}), "
+                                f"active depuis le {state['active_since']}, "
+                                f"premier franchissement le {state['first_crossed']}")
+                with col_ack:
+                    if state["acknowledged_at"]:
+                        st.caption(f"Acquittée le {state['acknowledged_at'][:10]}")
+                    elif st.button("Acquitter", key=f"_ack_{state['rule_id']}"):
+                        acknowledge(state["rule_id"])
+                        st.rerun()
+
+# Alerte critique : l'alerte active la plus sévère, masquée si aucune règle n'est franchie
+with span("critical_alert"):
+    headline = headline_alert(alert_states)
+    if headline:
+        critical = headline["severity"] == "critical"
+        crossed_on = headline["first_crossed"] or headline["active_since"]
+        st.markdown(f"""
+        <div class='{"critical-box" if critical else "warning-box"}'>
+            <b>{"🚨 ALERTE CRITIQUE" if critical else "⚠️ ALERTE"} - {format_date_fr(crossed_on).upper()}</b><br>
+            {headline['label']} : valeur {headline['last_value']:g} (seuil {headline['threshold']:g}),
+            seuil franchi pour la première fois le {format_date_fr(crossed_on)}.
+        </div>
+        """, unsafe_allow_html=True)
+
+# KPIs principaux
+with span("kpis"):
+    st.markdown("### 📊 Indicateurs Clés")
+
+    col_kpi1, col_kpi2, col_kpi3, col_kpi4, col_kpi5 = st.columns(5)
+
+    with col_kpi1:
+        st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+        st.markdown(f"<div class='metric-value'>{KPIS['uranium_60_percent']} kg</div>", unsafe_allow_html=True)
+        st.markdown("<div class='metric-label'>Uranium enrichi à 60%</div>", unsafe_allow_html=True)
+        st.caption("Stock pré-attaque juin 2025")
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    with col_kpi2:
+        st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+        st.markdown(f"<div class='metric-value'>{KPIS['uranium_total']:.0f} kg</div>", unsafe_allow_html=True)
+        st.markdown("<div class='metric-label'>Uranium enrichi total</div>", unsafe_allow_html=True)
+        st.caption("45x limite JCPOA")
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    with col_kpi3:
+        st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+        st.markdown(f"<div class='metric-value'>{KPIS['weapons_potential']}</div>", unsafe_allow_html=True)
+        st.markdown("<div class='metric-label'>Bombes potentielles</div>", unsafe_allow_html=True)
+        st.caption("Selon yardstick AIEA")
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    with col_kpi4:
+        st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+        st.markdown(f"<div class='metric-value'>{KPIS['breakout_time']} jours</div>", unsafe_allow_html=True)
+        st.markdown("<div class='metric-label'>Temps de breakout</div>", unsafe_allow_html=True)
+        st.caption("Estimation pour arme")
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    with col_kpi5:
+        days_since_last = KPIS["days_since_last"]
+        st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+        st.markdown(f"<div class='metric-value'>{days_since_last} jours</div>", unsafe_allow_html=True)
+        st.markdown("<div class='metric-label'>Sans inspection AIEA</div>", unsafe_allow_html=True)
+        st.caption(f"Dernier accès: {format_date_fr(KPIS['last_verification'])}")
+        st.markdown("</div>", unsafe_allow_html=True)
+
+# Fragments : un changement de widget ne relance (et ne renvoie) que la section concernée
+
+@fragment
+def facility_section():
+    """Carte du site surveillé ; le choix du site ne relance que ce fragment"""
+    facilities_list = list(LATEST_IAEA_DATA["facilities"].keys())
+    current = st.session_state.selected_facility
+    selected_facility = st.selectbox(
+        "Site nucléaire à surveiller",
+        options=facilities_list,
+        index=facilities_list.index(current) if current in facilities_list else 0,
+        key="_selected_facility"
+    )
+    st.session_state.selected_facility = selected_facility
+
+    facility = LATEST_IAEA_DATA["facilities"][selected_facility]
+    access_color = get_facility_status_color(facility["iaea_access"])
+    days_without = (datetime.now() - datetime.strptime(facility["last_inspection"], "%Y-%m-%d")).days
+    st.markdown(f"""
+    <div class='facility-card'>
+        <b>{facility['name']}</b><br>
+        Statut : {facility['status']}<br>
+        Accès AIEA : <span style='color: {access_color}; font-weight: bold;'>{facility['iaea_access']}</span><br>
+        Dernière inspection : {facility['last_inspection']} ({days_without} jours)<br>
+        Enrichissement : {', '.join(facility['enrichment_levels'])}<br>
+        Frappé : {facility.get('bombed', 'N/A')}
+    </div>
+    """, unsafe_allow_html=True)
+
+
+@fragment
+def main_figure_section():
+    """Graphique principal ; l'option de seuil militaire et la fenêtre ne relancent que ce fragment"""
+    show_weapons_grade = st.checkbox(
+        "Afficher seuil militaire (90%)",
+        value=st.session_state.show_weapons_grade,
+        key="_show_weapons_grade"
+    )
+    st.session_state.show_weapons_grade = show_weapons_grade
+
+    # Fenêtre affichée : les séries sont réduites côté serveur, une fenêtre plus courte
+    # est recalculée à partir des données complètes (plus de détail)
+    df_history = LATEST_IAEA_DATA["frames"]["enrichment_history"]
+    series_min = min(df_history["date"].min(), INSPECTION_HISTORY["date"].min()).date()
+    series_max = max(df_history["date"].max(), INSPECTION_HISTORY["date"].max()).date()
+    series_start, series_end = st.slider(
+        "Fenêtre des séries",
+        min_value=series_min,
+        max_value=series_max,
+        value=(series_min, series_max),
+        format="YYYY-MM",
+        key="_main_figure_window"
+    )
+
+    # Graphique d'évolution de l'enrichissement (figure mise en cache, partagée entre sessions)
+    with span("main_figure/build"):
+        fig = build_main_figure(
+            DATA_VERSION,
+            show_weapons_grade,
+            df_history,
+            INSPECTION_HISTORY,
+            start=series_start,
+            end=series_end,
+        )
+
+    with span("main_figure/plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
+
+
+@fragment
+def timeline_section():
+    """Chronologie ; le choix de la période ne relance que ce fragment"""
+    df_timeline = LATEST_IAEA_DATA["frames"]["timeline_events"]
+
+    # Fenêtre affichée : les événements sont agrégés par période quand elle en contient trop
+    timeline_min = df_timeline['date'].min().date()
+    timeline_max = df_timeline['date'].max().date()
+    timeline_start, timeline_end = st.slider(
+        "Période affichée",
+        min_value=timeline_min,
+        max_value=timeline_max,
+        value=(timeline_min, timeline_max),
+        format="YYYY-MM"
+    )
+
+    # Trace unique (Scattergl pour les grands volumes), couleurs selon le type
+    with span("timeline/build"):
+        fig_timeline = build_timeline_figure(DATA_VERSION, timeline_start, timeline_end, df_timeline)
+
+    with span("timeline/plotly_chart"):
+        st.plotly_chart(fig_timeline, use_container_width=True)
+
+
+st.markdown("### 🏭 Site surveillé")
+facility_section()
+
+st.markdown("## 📈 Évolution du programme nucléaire iranien")
+main_figure_section()
+
+# Timeline des événements
+st.markdown("### 📅 Chronologie des événements clés")
+timeline_section()
@@ -0,0 +1,85 @@
+# app_pages/negotiations.py - 🌍 Négociations & Diplomatie
+import pandas as pd
+import streamlit as st
+
+from dataset import get_dataset
+from figures import build_network_figure
+from negotiation_graph import sync_graph
+from profiling import fragment, span
+from utils import format_date_fr
+
+LATEST_IAEA_DATA, INSPECTION_HISTORY, DATA_VERSION = get_dataset()
+
+st.markdown("## 🌍 Négociations & Diplomatie")
+
+# Graphe partagé entre sessions : seules les réunions absentes du graphe sont ajoutées
+with span("negotiations/sync"):
+    graph = sync_graph("reports", LATEST_IAEA_DATA["negotiations"])
+
+if not len(graph):
+    st.info("Aucune réunion de négociation dans le dernier rapport.")
+    st.stop()
+
+
+@fragment
+def network_section():
+    """Réseau, centralité et activité sur une fenêtre de dates ; seul ce fragment est relancé"""
+    _, days, _ = graph.incidence()
+    first, last = pd.to_datetime(days[[0, -1]], unit="D").date
+    if first < last:
+        start, end = st.slider("Période", min_value=first, max_value=last, value=(first, last),
+                               format="YYYY-MM", key="_negotiations_window")
+    else:
+        start, end = first, last
+
+    with span("negotiations/centrality"):
+        centrality = graph.centrality(start, end)
+        pairs = graph.pairs(start, end)
+    meetings = graph.meetings_frame(start, end)
+
+    col_kpi1, col_kpi2, col_kpi3, col_kpi4 = st.columns(4)
+    with col_kpi1:
+        st.metric("Réunions", len(meetings))
+    with col_kpi2:
+        st.metric("Parties", len(centrality))
+    with col_kpi3:
+        st.metric("Paires en contact", len(pairs))
+    with col_kpi4:
+        st.metric("Dernière réunion", format_date_fr(meetings["date"].iloc[0]) if len(meetings) else "N/A")
+
+    if centrality.empty:
+        st.info("Aucune réunion sur cette période.")
+        return
+
+    with span("negotiations/network"):
+        fig = build_network_figure(graph.version, start, end, graph)
+    st.plotly_chart(fig, use_container_width=True)
+
+    col_central, col_pairs = st.columns(2)
+    with col_central:
+        st.markdown("#### Centralité des parties")
+        st.dataframe(centrality.rename(columns={
+            "meetings": "Réunions",
+            "partners": "Partenaires",
+            "weighted_degree": "Degré pondéré",
+            "eigenvector": "Vecteur propre",
+        }).rename_axis("Partie").round(3), use_container_width=True)
+    with col_pairs:
+        st.markdown("#### Paires les plus fréquentes")
+        st.dataframe(pairs.head(50).rename(columns={"a": "Partie A", "b": "Partie B", "meetings": "Réunions"}),
+                     use_container_width=True, hide_index=True)
+
+    # Réunions par partie et par période (trimestre au-delà de deux ans de fenêtre)
+    freq = "Q" if (end - start).days > 730 else "M"
+    with span("negotiations/activity"):
+        activity = graph.activity_by_period(freq, start, end).loc[centrality.index[:20]]
+    st.markdown("#### Activité par période")
+    st.dataframe(activity.rename_axis("Partie"), use_container_width=True)
+
+    st.markdown("#### Réunions")
+    st.dataframe(meetings.assign(parties=meetings["parties"].map(", ".join)).rename(columns={
+        "date": "Date", "location": "Lieu", "parties": "Parties", "outcome": "Résultat",
+    }), use_container_width=True, hide_index=True)
+
+
+network_section()
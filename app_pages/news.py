@@ -0,0 +1,74 @@
+# app_pages/news.py - 📰 Actualités & Déclarations
+from datetime import date
+
+import streamlit as st
+
+from dataset import get_dataset
+from profiling import span
+from search_index import DOCUMENT_KINDS, PAGE_SIZE, facets, highlight, search, sync_report
+
+LATEST_IAEA_DATA = get_dataset()[0]
+
+st.markdown("## 📰 Actualités & Déclarations")
+
+# Index persistant : seuls les documents d'un nouveau rapport sont ajoutés
+with span("search/sync"):
+    sync_report(LATEST_IAEA_DATA)
+    filter_values = facets()
+
+query = st.text_input("Rechercher", placeholder="mots-clés, en français ou en persan (ex. dilution, Oman, غنی‌سازی)")
+
+col_filter1, col_filter2, col_filter3, col_filter4 = st.columns(4)
+with col_filter1:
+    kinds = st.multiselect("Type", list(DOCUMENT_KINDS), default=list(DOCUMENT_KINDS),
+                           format_func=DOCUMENT_KINDS.get)
+with col_filter2:
+    source = st.selectbox("Source / lieu", ["Toutes"] + filter_values["sources"])
+with col_filter3:
+    party = st.selectbox("Partie", ["Toutes"] + filter_values["parties"])
+with col_filter4:
+    first_date = date.fromisoformat(filter_values["first_date"] or "2015-01-01")
+    last_date = date.fromisoformat(filter_values["last_date"] or LATEST_IAEA_DATA["report_date"])
+    period = st.date_input("Période", value=(first_date, last_date), min_value=first_date, max_value=last_date)
+match_all = st.checkbox("Tous les mots", value=True)
+
+# Nouvelle recherche : retour à la première page
+criteria = (query, tuple(kinds), source, party, tuple(period), match_all)
+if st.session_state.get("_news_criteria") != criteria:
+    st.session_state["_news_criteria"] = criteria
+    st.session_state["_news_page"] = 1
+page = st.session_state.get("_news_page", 1)
+
+with span("search/query"):
+    response = search(
+        query,
+        kinds=kinds or None,
+        source=None if source == "Toutes" else source,
+        party=None if party == "Toutes" else party,
+        start=period[0] if len(period) > 0 else None,
+        end=period[1] if len(period) > 1 else None,
+        page=page,
+        match_all=match_all,
+    )
+
+n_pages = max(1, -(-response["total"] // PAGE_SIZE))
+st.caption(f"{response['total']} résultat(s) — page {page} / {n_pages}")
+
+for result in response["results"]:
+    header = f"**{result['date']}** · {DOCUMENT_KINDS[result['kind']]}"
+    if result["title"]:
+        header += f" · {result['title']}"
+    st.markdown(f"{header}  \n{highlight(result['body'], response['terms'])}")
+
+if n_pages > 1:
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        if st.button("← Précédente", disabled=page <= 1):
+            st.session_state["_news_page"] = page - 1
+            st.rerun()
+    with col_page:
+        st.caption(f"Page {page} sur {n_pages}")
+    with col_next:
+        if st.button("Suivante →", disabled=page >= n_pages):
+            st.session_state["_news_page"] = page + 1
+            st.rerun()
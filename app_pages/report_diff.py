@@ -0,0 +1,61 @@
+# app_pages/report_diff.py - 🔀 Changements entre rapports
+import pandas as pd
+import streamlit as st
+
+from data_store import list_snapshots
+from profiling import span
+from report_diff import SECTIONS, diff_reports
+
+st.markdown("## 🔀 Changements entre rapports")
+
+report_dates = list_snapshots()
+if len(report_dates) < 2:
+    st.info(f"Un seul rapport disponible ({report_dates[0] if report_dates else '—'}) : "
+            "les changements apparaîtront à l'import du suivant.")
+    st.stop()
+
+col_old, col_new = st.columns(2)
+with col_old:
+    old_date = st.selectbox("Rapport de référence", report_dates, index=len(report_dates) - 2)
+with col_new:
+    new_date = st.selectbox("Comparé à", report_dates, index=len(report_dates) - 1)
+
+with span("report_diff/diff"):
+    changes = diff_reports(old_date, new_date)
+
+if not changes:
+    st.success("Aucun changement entre ces deux rapports.")
+    st.stop()
+
+df_changes = pd.DataFrame(changes)
+counts = df_changes["section"].value_counts()
+counts = {section: counts[section] for section in SECTIONS if section in counts}
+for column, (section, count) in zip(st.columns(len(counts)), counts.items()):
+    with column:
+        st.metric(SECTIONS[section], int(count))
+
+
+def _display(value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ", ".join(str(v) for v in value)
+    return str(value)
+
+
+for section, label in SECTIONS.items():
+    section_changes = df_changes[df_changes["section"] == section]
+    if section_changes.empty:
+        continue
+    st.markdown(f"### {label}")
+    st.dataframe(
+        pd.DataFrame({
+            "Élément": section_changes["key"],
+            "Champ": section_changes["field"],
+            "Changement": section_changes["change"],
+            "Avant": section_changes["old"].map(_display),
+            "Après": section_changes["new"].map(_display),
+        }),
+        hide_index=True,
+        use_container_width=True,
+    )
@@ -0,0 +1,98 @@
+# app_pages/scenarios.py - ⚖️ Seuils & Scénarios
+import numpy as np
+import plotly.express as px
+import plotly.graph_objs as go
+import streamlit as st
+
+from breakout import CENTRIFUGE_SWU, DEFAULT_EFFICIENCY, DEFAULT_TAILS, breakout_grid, scenario_table
+from dataset import get_dataset
+from profiling import span
+
+LATEST_IAEA_DATA = get_dataset()[0]
+
+st.markdown("## ⚖️ Seuils & Scénarios de breakout")
+
+thresholds = LATEST_IAEA_DATA["thresholds"]
+st.markdown(f"""
+<div class='info-box'>
+    Temps nécessaire pour produire de l'uranium de qualité militaire ({thresholds['weapons_grade']}%)
+    à partir du stock déclaré : travail de séparation (UTS) requis divisé par la capacité des cascades.
+    Le stock à 60% ({LATEST_IAEA_DATA['uranium_60_percent']} kg) est utilisé en priorité, puis le reste
+    du stock total ({LATEST_IAEA_DATA['uranium_total']:.0f} kg, supposé faiblement enrichi).
+    Yardstick : {thresholds['significant_quantity']} kg à 60% par arme.
+</div>
+""", unsafe_allow_html=True)
+
+col_param1, col_param2, col_param3 = st.columns(3)
+with col_param1:
+    n_centrifuges = st.slider("Centrifugeuses opérationnelles", 0, 20000, 1000, step=100)
+    centrifuge_type = st.selectbox("Type de centrifugeuse", list(CENTRIFUGE_SWU.keys()),
+                                   index=list(CENTRIFUGE_SWU.keys()).index("IR-6"))
+with col_param2:
+    cascade_efficiency = st.slider("Rendement des cascades", 0.3, 1.0, DEFAULT_EFFICIENCY, step=0.05)
+    n_weapons = st.slider("Nombre d'armes visé", 1, 20, 1)
+with col_param3:
+    tails_assay = st.slider("Teneur des rejets 60% → 90% (%)", 2.0, 30.0, DEFAULT_TAILS * 100, step=1.0) / 100
+    st.caption(f"Capacité unitaire {centrifuge_type} : {CENTRIFUGE_SWU[centrifuge_type]} UTS/an")
+
+scenario = breakout_grid(
+    LATEST_IAEA_DATA["uranium_60_percent"], LATEST_IAEA_DATA["uranium_total"],
+    n_centrifuges, CENTRIFUGE_SWU[centrifuge_type],
+    efficiency=cascade_efficiency,
+    weapons_grade=thresholds["weapons_grade"],
+    significant_quantity=thresholds["significant_quantity"],
+    n_weapons=n_weapons, tails=tails_assay
+)
+breakout_days = float(scenario["breakout_days"])
+
+col_res1, col_res2, col_res3, col_res4 = st.columns(4)
+with col_res1:
+    st.metric("Temps de breakout", f"{breakout_days:.1f} jours" if np.isfinite(breakout_days) else "Impossible")
+with col_res2:
+    st.metric("Travail de séparation", f"{float(scenario['swu_total']):.0f} UTS")
+with col_res3:
+    st.metric("Alimentation 60% par arme", f"{float(scenario['feed_60_per_weapon_kg']):.1f} kg")
+with col_res4:
+    st.metric("Armes possibles (stock 60%)", f"{float(scenario['weapons_from_60_stock']):.1f}")
+
+if not np.isfinite(breakout_days):
+    st.markdown("<div class='warning-box'>Stock insuffisant (ou aucune centrifugeuse) pour la cible choisie.</div>",
+                unsafe_allow_html=True)
+
+# Grille de scénarios : évaluée en un seul appel vectorisé (types x rendements x nombres)
+grid_counts = tuple(np.linspace(100, 20000, 200))
+grid_efficiencies = tuple(np.round(np.linspace(0.3, 1.0, 15), 2))
+with span("scenario_grid"):
+    df_scenarios = scenario_table(
+        LATEST_IAEA_DATA["uranium_60_percent"], LATEST_IAEA_DATA["uranium_total"],
+        grid_counts, tuple(CENTRIFUGE_SWU.keys()), grid_efficiencies,
+        weapons_grade=thresholds["weapons_grade"],
+        significant_quantity=thresholds["significant_quantity"],
+        n_weapons=n_weapons, tails=tails_assay
+    )
+
+col_chart1, col_chart2 = st.columns(2)
+with col_chart1:
+    df_type = df_scenarios[df_scenarios["type"] == centrifuge_type]
+    heatmap = df_type.pivot(index="efficiency", columns="centrifuges", values="breakout_days")
+    fig_heatmap = go.Figure(go.Heatmap(
+        x=heatmap.columns, y=heatmap.index, z=heatmap.clip(upper=365).values,
+        colorscale="RdYlGn", colorbar=dict(title="Jours"),
+        hovertemplate="%{x:.0f} centrifugeuses<br>rendement %{y}<br>%{z:.1f} jours<extra></extra>"
+    ))
+    fig_heatmap.add_hline(y=cascade_efficiency, line_dash="dot", line_color="#333")
+    fig_heatmap.add_vline(x=n_centrifuges, line_dash="dot", line_color="#333")
+    fig_heatmap.update_layout(title=f"Temps de breakout ({centrifuge_type}, plafonné à 365 j)",
+                              xaxis_title="Centrifugeuses", yaxis_title="Rendement",
+                              height=420, template='plotly_white')
+    st.plotly_chart(fig_heatmap, use_container_width=True)
+with col_chart2:
+    nearest_efficiency = min(grid_efficiencies, key=lambda e: abs(e - cascade_efficiency))
+    df_eff = df_scenarios[np.isclose(df_scenarios["efficiency"], nearest_efficiency)]
+    fig_types = px.line(df_eff, x="centrifuges", y="breakout_days", color="type", log_y=True,
+                        labels={"centrifuges": "Centrifugeuses", "breakout_days": "Jours", "type": "Type"},
+                        title="Breakout selon le type de centrifugeuse")
+    fig_types.add_hline(y=thresholds["breakout_time"], line_dash="dash", line_color="#DA0000",
+                        annotation_text=f"Estimation publiée ({thresholds['breakout_time']} j)")
+    fig_types.update_layout(height=420, template='plotly_white')
+    st.plotly_chart(fig_types, use_container_width=True)
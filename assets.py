@@ -0,0 +1,128 @@
+# assets.py - Ressources statiques locales (drapeau, police Roboto, feuille de style)
+#
+# Aucune ressource n'est chargée depuis un hôte externe : le drapeau est rastérisé une fois
+# par processus avec Pillow, la police Roboto (sous-ensemble latin, woff2, Apache 2.0)
+# est livrée dans assets/fonts et intégrée à la feuille de style, et les frontières de la
+# carte (Natural Earth, domaine public) sont livrées dans assets/geo.
+import base64
+import io
+import json
+import os
+
+import streamlit as st
+from PIL import Image, ImageDraw
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+FONTS_DIR = os.path.join(ASSETS_DIR, "fonts")
+GEO_DIR = os.path.join(ASSETS_DIR, "geo")
+
+# Graisses de Roboto utilisées par style.css -> fichier woff2 livré
+ROBOTO_WEIGHTS = {400: "roboto-400-latin.woff2", 700: "roboto-700-latin.woff2"}
+
+# Drapeau de l'Iran : proportions 4:7, couleurs officielles
+FLAG_GREEN = "#239F40"
+FLAG_WHITE = "#FFFFFF"
+FLAG_RED = "#DA0000"
+FLAG_RATIO = 4 / 7
+# Largeur affichée dans la barre latérale ; rastérisé au double pour les écrans haute densité
+FLAG_DISPLAY_WIDTH = 100
+# Suréchantillonnage du dessin avant réduction (anticrénelage)
+SUPERSAMPLING = 4
+
+
+def _draw_emblem(draw, cx, cy, size):
+    """Emblème stylisé : épée centrale entourée de deux paires de croissants"""
+    stroke = max(1, int(size * 0.06))
+    # Épée
+    draw.polygon([(cx - size * 0.05, cy - size * 0.30), (cx + size * 0.05, cy - size * 0.30),
+                  (cx + size * 0.025, cy + size * 0.45), (cx - size * 0.025, cy + size * 0.45)], fill=FLAG_RED)
+    draw.ellipse([cx - size * 0.07, cy - size * 0.48, cx + size * 0.07, cy - size * 0.34], fill=FLAG_RED)
+    # Croissants intérieurs puis extérieurs, symétriques par rapport à l'épée
+    for rx, ry, arc in ((0.22, 0.36, 70), (0.40, 0.48, 60)):
+        box = [cx - size * rx, cy - size * ry, cx + size * rx, cy + size * ry]
+        draw.arc(box, 90 + 90 - arc, 90 + 90 + arc, fill=FLAG_RED, width=stroke)
+        draw.arc(box, -arc, arc, fill=FLAG_RED, width=stroke)
+
+
+def _draw_takbir_band(draw, width, y, height):
+    """Frise blanche stylisée (takbir) : 11 motifs répétés le long d'une bande"""
+    step = width / 11
+    stroke = max(1, int(height * 0.18))
+    for i in range(11):
+        x0 = i * step + step * 0.15
+        x1 = (i + 1) * step - step * 0.15
+        draw.rectangle([x0, y + height - stroke, x1, y + height], fill=FLAG_WHITE)
+        for k in range(4):
+            x = x0 + (x1 - x0) * (0.1 + 0.27 * k)
+            draw.rectangle([x, y + height * (0.2 if k % 2 else 0.45), x + stroke, y + height], fill=FLAG_WHITE)
+
+
+def _draw_flag(width):
+    """Dessine le drapeau (largeur en pixels) avec suréchantillonnage"""
+    w = width * SUPERSAMPLING
+    h = round(w * FLAG_RATIO)
+    stripe = h / 3
+    image = Image.new("RGB", (w, h), FLAG_WHITE)
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([0, 0, w, stripe], fill=FLAG_GREEN)
+    draw.rectangle([0, 2 * stripe, w, h], fill=FLAG_RED)
+    band = stripe * 0.18
+    _draw_takbir_band(draw, w, stripe - band * 1.2, band)
+    _draw_takbir_band(draw, w, 2 * stripe + band * 0.2, band)
+    _draw_emblem(draw, w / 2, h / 2, stripe * 0.95)
+    return image.resize((width, round(width * FLAG_RATIO)), Image.LANCZOS)
+
+
+@st.cache_resource(show_spinner=False)
+def flag_png(width=2 * FLAG_DISPLAY_WIDTH):
+    """Drapeau rastérisé en PNG (octets), calculé une fois par processus et par largeur"""
+    buffer = io.BytesIO()
+    _draw_flag(width).save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def _font_face_css():
+    rules = []
+    for weight, filename in sorted(ROBOTO_WEIGHTS.items()):
+        with open(os.path.join(FONTS_DIR, filename), "rb") as f:
+            encoded = base64.b64encode(f.read()).decode("ascii")
+        rules.append(
+            "@font-face {\n"
+            "    font-family: 'Roboto';\n"
+            "    font-style: normal;\n"
+            f"    font-weight: {weight};\n"
+            "    font-display: swap;\n"
+            f"    src: url(data:font/woff2;base64,{encoded}) format('woff2');\n"
+            "}\n"
+        )
+    return "\n".join(rules)
+
+
+@st.cache_resource(show_spinner=False)
+def load_css():
+    """Feuille de style du tableau de bord (polices intégrées), construite une fois par processus"""
+    with open(os.path.join(ASSETS_DIR, "style.css"), encoding="utf-8") as f:
+        return f"<style>\n{_font_face_css()}\n{f.read()}</style>"
+
+
+@st.cache_resource(show_spinner=False)
+def load_borders():
+    """Frontières de la région en (longitudes, latitudes), anneaux séparés par None (tracé unique)"""
+    with open(os.path.join(GEO_DIR, "borders.json"), encoding="utf-8") as f:
+        countries = json.load(f)
+    lons, lats = [], []
+    for country in countries.values():
+        for ring_lons, ring_lats in country["rings"]:
+            lons.extend(ring_lons + [None])
+            lats.extend(ring_lats + [None])
+    return lons, lats
+
+
+if __name__ == "__main__":
+    # Aperçu du drapeau : python assets.py drapeau.png
+    import sys
+
+    output = sys.argv[1] if len(sys.argv) > 1 else "flag_preview.png"
+    with open(output, "wb") as f:
+        f.write(flag_png())
+    print(f"{output} ({len(flag_png())} octets)")
@@ -0,0 +1,252 @@
+# bench_app.py - Benchmarks du tableau de bord (import à froid, premier rendu, reruns, taille des figures)
+#
+#   python bench_app.py                          # écrit bench_output.json
+#   python bench_app.py --compare ancien.json    # compare avec un résultat précédent
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(BASE_DIR, "Dashboard.py")
+PAGES_DIR = "app_pages"
+
+# Modules mesurés à l'import (chacun dans un processus neuf)
+IMPORT_MODULES = [
+    "streamlit",
+    "pandas",
+    "numpy",
+    "requests",
+    "plotly.graph_objs",
+    "plotly.express",
+    "plotly.subplots",
+    "data_store",
+    "inspection_log",
+    "dataset",
+    "ingestion",
+    "figures",
+    "downsample",
+    "search_index",
+    "breakout",
+    "monte_carlo",
+    "observations",
+    "ledger",
+    "negotiation_graph",
+    "alerts",
+]
+# Modules importés par le point d'entrée (coût d'import de l'application)
+ENTRYPOINT_MODULES = ["streamlit", "assets", "dataset", "ingestion", "profiling", "alerts"]
+
+# Au-delà de ce ratio, une mesure est signalée comme régression lors d'une comparaison
+REGRESSION_RATIO = 1.2
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(durations):
+    """Statistiques d'une série de mesures (secondes)"""
+    ordered = sorted(durations)
+    return {
+        "n": len(ordered),
+        "min": ordered[0],
+        "median": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+        "max": ordered[-1],
+    }
+
+
+def measure_import(modules, repeat):
+    """Temps d'import à froid (meilleur de `repeat` processus neufs)"""
+    code = ("import sys, time; sys.path.insert(0, {base!r}); t = time.perf_counter(); "
+            "{imports}; print(time.perf_counter() - t)")
+    imports = "; ".join(f"import {m}" for m in modules)
+    timings = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-c", code.format(base=BASE_DIR, imports=imports)],
+                                capture_output=True, text=True, cwd=BASE_DIR)
+        if result.returncode != 0:
+            return {"error": result.stderr.strip().splitlines()[-1]}
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return summarize(timings)
+
+
+def plotly_payloads(at):
+    """Taille (octets) du JSON Plotly envoyé au navigateur pour chaque graphique"""
+    return [len(el.proto.spec.encode("utf-8")) for el in at.get("plotly_chart")]
+
+
+def timed_run(at, action=None):
+    start = time.perf_counter()
+    if action is not None:
+        action(at)
+    at.run()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return elapsed
+
+
+def _narrowed(value):
+    """Valeur réduite d'un curseur : première moitié d'un intervalle, moitié d'une valeur numérique"""
+    if isinstance(value, tuple):
+        start, end = value
+        return start, start + (end - start) / 2
+    return value / 2 if value else 1
+
+
+def _toggle_slider(at, label, initial):
+    slider = next(s for s in at.slider if s.label == label)
+    slider.set_value(_narrowed(initial) if slider.value == initial else initial)
+
+
+def widget_actions(at):
+    """Interactions possibles avec les cases à cocher, listes et curseurs de la page (barre latérale comprise) :
+    (nom, action)"""
+    actions = []
+    for checkbox in at.checkbox:
+        if checkbox.key and checkbox.key.startswith("_profiling"):
+            continue
+        label = checkbox.label
+        actions.append((f"checkbox:{label}",
+                        lambda a, label=label: next(c for c in a.checkbox if c.label == label).set_value(
+                            not next(c for c in a.checkbox if c.label == label).value)))
+    for selectbox in at.selectbox:
+        label = selectbox.label
+        for option in selectbox.options:
+            actions.append((f"selectbox:{label}={option}",
+                            lambda a, label=label, option=option: next(
+                                s for s in a.selectbox if s.label == label).set_value(option)))
+    # Curseurs (fenêtres de dates des fragments, paramètres) : alternance valeur réduite / valeur initiale
+    for slider in at.slider:
+        label, initial = slider.label, slider.value
+        actions.append((f"slider:{label}",
+                        lambda a, label=label, initial=initial: _toggle_slider(a, label, initial)))
+    return actions
+
+
+def bench_pages(repeat):
+    from streamlit.testing.v1 import AppTest
+
+    results = {}
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    first_render = timed_run(at)
+
+    pages = sorted(f[:-3] for f in os.listdir(os.path.join(BASE_DIR, PAGES_DIR)) if f.endswith(".py"))
+    for page in pages:
+        page_path = f"{PAGES_DIR}/{page}.py"
+        entry = {"widgets": {}}
+        try:
+            entry["first_visit"] = timed_run(at, lambda a: a.switch_page(page_path))
+            entry["payload_bytes"] = plotly_payloads(at)
+            entry["rerun"] = summarize([timed_run(at) for _ in range(repeat)])
+            for name, action in widget_actions(at):
+                try:
+                    entry["widgets"][name] = summarize([timed_run(at, action) for _ in range(repeat)])
+                except Exception as exc:  # un widget en erreur ne doit pas arrêter la campagne
+                    entry["widgets"][name] = {"error": str(exc)}
+        except Exception as exc:
+            entry["error"] = str(exc)
+            at = AppTest.from_file(APP_PATH, default_timeout=120)
+            at.run()
+        results[page] = entry
+    return first_render, results
+
+
+def flatten(results, prefix=""):
+    """Aplatit les mesures en {chemin: valeur} (médianes pour les statistiques)"""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            if "median" in value:
+                flat[path] = value["median"]
+            else:
+                flat.update(flatten(value, path + "/"))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+        elif isinstance(value, list) and value and all(isinstance(v, (int, float)) for v in value):
+            flat[path] = sum(value)
+    return flat
+
+
+def compare(current, previous_path):
+    """Affiche les écarts avec un résultat précédent ; renvoie le nombre de régressions"""
+    with open(previous_path, encoding="utf-8") as f:
+        previous = json.load(f)
+    keys = ("imports", "first_render", "pages")
+    old = flatten({k: previous.get(k) for k in keys if k in previous})
+    new = flatten({k: current.get(k) for k in keys if k in current})
+    regressions = 0
+    print(f"\nComparaison avec {previous_path} ({previous['meta'].get('commit')} -> {current['meta'].get('commit')})")
+    for path in sorted(set(old) & set(new)):
+        if not old[path]:
+            continue
+        ratio = new[path] / old[path]
+        flag = ""
+        if ratio > REGRESSION_RATIO:
+            flag = "  <-- régression"
+            regressions += 1
+        print(f"{path:<90} {old[path]:>12.4f} {new[path]:>12.4f}  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks du tableau de bord Streamlit (AppTest)")
+    parser.add_argument("--repeat", type=int, default=5, help="mesures par scénario")
+    parser.add_argument("--import-repeat", type=int, default=3, help="processus neufs par mesure d'import")
+    parser.add_argument("--output", default=os.path.join(BASE_DIR, "bench_output.json"))
+    parser.add_argument("--compare", help="fichier de résultats précédent à comparer")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help=f"code de sortie 1 si une mesure est > x{REGRESSION_RATIO} l'ancienne")
+    args = parser.parse_args()
+
+    import pandas
+    import plotly
+    import streamlit
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "streamlit": streamlit.__version__,
+            "plotly": plotly.__version__,
+            "pandas": pandas.__version__,
+            "repeat": args.repeat,
+        },
+        "imports": {module: measure_import([module], args.import_repeat) for module in IMPORT_MODULES},
+    }
+    report["imports"]["<entrypoint>"] = measure_import(ENTRYPOINT_MODULES, args.import_repeat)
+    report["first_render"], report["pages"] = bench_pages(args.repeat)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Résultats écrits dans {args.output}")
+    print(f"Premier rendu : {report['first_render']:.3f} s")
+    for page, entry in report["pages"].items():
+        if "error" in entry:
+            print(f"  {page:<16} ERREUR {entry['error']}")
+            continue
+        print(f"  {page:<16} rerun médian {entry['rerun']['median'] * 1000:7.1f} ms, "
+              f"figures {sum(entry['payload_bytes']) / 1024:7.1f} Kio")
+
+    if args.compare:
+        regressions = compare(report, args.compare)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
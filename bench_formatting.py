@@ -0,0 +1,80 @@
+# bench_formatting.py - Micro-benchmark du formatage et de la classification par colonne
+#
+#   python bench_formatting.py                     # 10 000 et 1 000 000 lignes
+#   python bench_formatting.py --sizes 100000 --repeat 5
+#
+# Compare, pour chaque taille, Series.apply des fonctions scalaires de utils.py et leurs
+# versions vectorisées, après avoir vérifié que les sorties sont identiques.
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils import (facility_status_colors, format_uranium_kg, format_uranium_kg_array,
+                   get_facility_status_color, get_threat_level, threat_levels)
+
+ACCESS_STATUSES = ["Non autorisé", "Non autorisé depuis juin 2025", "Partiel", "Autorisé", "Accès partiel limité"]
+
+
+def sample_columns(n_rows, seed=0):
+    """Colonnes de test : quantités (kg, avec zéros et valeurs négatives), niveaux (%), statuts"""
+    rng = np.random.default_rng(seed)
+    # Décimales variables (0 à 3), comme des quantités saisies
+    scale = 10.0 ** rng.integers(0, 4, n_rows)
+    quantities = np.round(10 ** rng.uniform(-1, 4.5, n_rows) * scale) / scale
+    quantities[rng.random(n_rows) < 0.05] = 0
+    quantities[rng.random(n_rows) < 0.01] *= -1
+    return pd.DataFrame({
+        "quantity_kg": quantities,
+        "level": rng.choice([3.67, 4.5, 20, 60, 90], n_rows),
+        "iaea_access": pd.Series(rng.choice(ACCESS_STATUSES, n_rows), dtype=object),
+    })
+
+
+def best_of(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+CASES = {
+    "format_uranium_kg": (
+        lambda df: df["quantity_kg"].apply(format_uranium_kg),
+        lambda df: format_uranium_kg_array(df["quantity_kg"]),
+    ),
+    "get_threat_level": (
+        lambda df: df["level"].apply(lambda level: get_threat_level(level)[0]),
+        lambda df: threat_levels(df["level"])[0],
+    ),
+    "get_facility_status_color": (
+        lambda df: df["iaea_access"].apply(get_facility_status_color),
+        lambda df: facility_status_colors(df["iaea_access"]),
+    ),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark du formatage vectorisé (utils.py)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3, help="mesures par cas (meilleure retenue)")
+    args = parser.parse_args()
+
+    print(f"{'fonction':<28} {'lignes':>10} {'apply (ms)':>12} {'vectorisé (ms)':>15} {'gain':>7}")
+    for n_rows in args.sizes:
+        df = sample_columns(n_rows)
+        for name, (scalar, vectorized) in CASES.items():
+            scalar_time, expected = best_of(lambda: scalar(df), args.repeat)
+            vector_time, result = best_of(lambda: vectorized(df), args.repeat)
+            if not expected.equals(result.astype(object)):
+                mismatches = expected[expected != result]
+                raise AssertionError(f"{name} : {len(mismatches)} sortie(s) différente(s), ex. {mismatches.iloc[0]!r}")
+            print(f"{name:<28} {n_rows:>10,} {scalar_time * 1000:>12.1f} {vector_time * 1000:>15.1f} "
+                  f"{scalar_time / vector_time:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
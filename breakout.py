@@ -0,0 +1,113 @@
+# breakout.py - Modèle vectorisé de cascade d'enrichissement (travail de séparation et temps de breakout)
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Capacité de séparation par centrifugeuse (UTS/an), estimations publiques (ISIS, AIEA)
+CENTRIFUGE_SWU = {
+    "IR-1": 0.9,
+    "IR-2m": 4.0,
+    "IR-4": 3.3,
+    "IR-6": 6.0,
+}
+
+# Teneur des rejets (tails) lors de la montée 60% -> 90% et teneur supposée du stock restant
+DEFAULT_TAILS = 0.10
+DEFAULT_LOW_FEED = 0.05
+# Taux d'utilisation effectif des cascades (reconfiguration, pannes, recyclage)
+DEFAULT_EFFICIENCY = 0.8
+
+DAYS_PER_YEAR = 365.0
+
+
+def value_function(x):
+    """Fonction de valeur V(x) = (2x - 1) ln(x / (1 - x)) d'une teneur x (fraction)"""
+    x = np.asarray(x, dtype=float)
+    return (2 * x - 1) * np.log(x / (1 - x))
+
+
+def swu_per_kg_product(product, feed, tails):
+    """Travail de séparation (UTS) et masse d'alimentation par kg de produit (vectorisé)"""
+    product, feed, tails = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (product, feed, tails)))
+    feed_ratio = (product - tails) / (feed - tails)
+    swu = (value_function(product) + (feed_ratio - 1) * value_function(tails)
+           - feed_ratio * value_function(feed))
+    return swu, feed_ratio
+
+
+def breakout_grid(stock_60, stock_total, centrifuges, swu_per_machine,
+                  efficiency=DEFAULT_EFFICIENCY, weapons_grade=90, significant_quantity=42,
+                  n_weapons=1, tails=DEFAULT_TAILS, low_feed=DEFAULT_LOW_FEED):
+    """Évalue en un seul appel une grille de scénarios de breakout.
+
+    Tous les paramètres sont diffusables (broadcasting NumPy) : on peut passer
+    des tableaux de centrifugeuses, de rendements, de stocks, etc.
+    weapons_grade est en %, tails et low_feed en fraction. significant_quantity
+    est le yardstick AIEA en kg d'uranium à 60% par arme ; il fixe la masse
+    d'U-235 visée.
+
+    Le stock à 60% est utilisé en priorité ; si la cible dépasse ce qu'il permet,
+    le complément vient du reste du stock (uranium_total - stock_60) supposé à
+    low_feed, ce qui demande beaucoup plus de travail de séparation.
+
+    Renvoie un dict de tableaux de même forme.
+    """
+    (stock_60, stock_total, centrifuges, swu_per_machine, efficiency,
+     weapons_grade, significant_quantity, n_weapons, tails, low_feed) = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (stock_60, stock_total, centrifuges, swu_per_machine, efficiency,
+                                               weapons_grade, significant_quantity, n_weapons, tails, low_feed)))
+
+    product_grade = weapons_grade / 100.0
+    # Masse de produit à 90% par arme : même quantité d'U-235 que le yardstick à 60%
+    product_per_weapon = significant_quantity * 0.60 / product_grade
+    product_needed = product_per_weapon * n_weapons
+
+    # Voie 1 : stock à 60% -> qualité militaire
+    swu_60, feed_ratio_60 = swu_per_kg_product(product_grade, 0.60, tails)
+    product_from_60 = np.minimum(product_needed, stock_60 / feed_ratio_60)
+    # Voie 2 : complément depuis le stock faiblement enrichi (rejets à 0,3 %)
+    swu_low, feed_ratio_low = swu_per_kg_product(product_grade, low_feed, 0.003)
+    stock_low = np.maximum(stock_total - stock_60, 0.0)
+    product_from_low = np.minimum(product_needed - product_from_60, stock_low / feed_ratio_low)
+
+    swu_total = product_from_60 * swu_60 + product_from_low * swu_low
+    capacity_per_day = centrifuges * swu_per_machine * efficiency / DAYS_PER_YEAR
+    feasible = (product_from_60 + product_from_low) >= product_needed * (1 - 1e-9)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        breakout_days = np.where(feasible & (capacity_per_day > 0), swu_total / capacity_per_day, np.inf)
+
+    return {
+        "product_per_weapon_kg": product_per_weapon,
+        "feed_60_per_weapon_kg": product_per_weapon * feed_ratio_60,
+        "swu_per_weapon_from_60": product_per_weapon * swu_60,
+        "weapons_from_60_stock": stock_60 / (product_per_weapon * feed_ratio_60),
+        "swu_total": swu_total,
+        "capacity_swu_per_day": capacity_per_day,
+        "breakout_days": breakout_days,
+        "feasible": feasible,
+    }
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def scenario_table(stock_60, stock_total, centrifuge_counts, centrifuge_types, efficiencies,
+                   weapons_grade=90, significant_quantity=42, n_weapons=1, tails=DEFAULT_TAILS):
+    """Produit cartésien (nombre x type x rendement) évalué en un appel vectorisé, sous forme de DataFrame"""
+    counts = np.asarray(centrifuge_counts, dtype=float)
+    swu = np.array([CENTRIFUGE_SWU[t] for t in centrifuge_types])
+    eff = np.asarray(efficiencies, dtype=float)
+
+    # Axes : (type, rendement, nombre)
+    result = breakout_grid(stock_60, stock_total,
+                           counts[None, None, :], swu[:, None, None], eff[None, :, None],
+                           weapons_grade=weapons_grade, significant_quantity=significant_quantity,
+                           n_weapons=n_weapons, tails=tails)
+    shape = result["breakout_days"].shape
+    type_idx, eff_idx, count_idx = np.indices(shape)
+    return pd.DataFrame({
+        "type": np.asarray(centrifuge_types)[type_idx.ravel()],
+        "efficiency": eff[eff_idx.ravel()],
+        "centrifuges": counts[count_idx.ravel()],
+        "swu_total": result["swu_total"].ravel(),
+        "breakout_days": result["breakout_days"].ravel(),
+    })
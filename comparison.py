@@ -0,0 +1,185 @@
+# comparison.py - Métriques par site et par paire de sites pour le mode comparaison
+#
+# Les tables sont calculées une fois par version des données (et par jour, pour les
+# durées sans inspection) puis partagées entre sessions : ajouter ou retirer un site de
+# la comparaison ne fait que filtrer des lignes déjà calculées.
+import re
+from itertools import permutations
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils import compact_frame, facility_status_colors
+
+# Statut d'accès AIEA normalisé (ordre croissant de restriction)
+ACCESS_LEVELS = ["Autorisé", "Partiel", "Non autorisé"]
+
+# Gravité des frappes, d'après les champs « bombed » et « damage » (le premier motif trouvé l'emporte)
+STRIKE_LEVELS = ["Aucune", "Indirecte", "Frappé", "Sévère"]
+STRIKE_PATTERNS = [
+    (3, ("sévère", "détruit")),
+    (1, ("non directement", "indirect")),
+    (0, ("non",)),
+    (2, ("oui",)),
+]
+
+EARTH_RADIUS_KM = 6371.0
+
+_PERCENT = re.compile(r"(\d+(?:[.,]\d+)?)\s*%")
+
+
+def access_level(iaea_access):
+    """Statut d'accès normalisé (ACCESS_LEVELS) à partir du libellé du rapport"""
+    text = iaea_access.lower()
+    if "non" in text:
+        return "Non autorisé"
+    if "partiel" in text:
+        return "Partiel"
+    return "Autorisé"
+
+
+def max_enrichment(levels):
+    """Niveau d'enrichissement maximal (%) cité par le site, 0 si non enrichi"""
+    values = [float(m.replace(",", ".")) for level in levels for m in _PERCENT.findall(level)]
+    return max(values, default=0.0)
+
+
+def strike_severity(facility):
+    """Indice de gravité des frappes (index dans STRIKE_LEVELS)"""
+    text = f"{facility.get('bombed', '')} {facility.get('damage', '')}".lower()
+    if not text.strip():
+        return 0
+    for severity, words in STRIKE_PATTERNS:
+        if any(re.search(rf"\b{word}", text) for word in words):
+            return severity
+    return 2
+
+
+def estimate_inventory(facilities, uranium_60_percent, enrichment):
+    """Inventaire d'uranium à 60% estimé par site (kg) et indicateur d'estimation.
+
+    Un champ « inventory_kg » du rapport est repris tel quel. Sinon, le stock national
+    est attribué aux sites de stockage (statut « stockage »), à défaut réparti à parts
+    égales entre les sites enrichissant à 60% ou plus.
+    """
+    reported = {fid: f["inventory_kg"] for fid, f in facilities.items() if "inventory_kg" in f}
+    remaining = max(0.0, (uranium_60_percent or 0.0) - sum(reported.values()))
+    holders = [fid for fid, f in facilities.items()
+               if fid not in reported and "stockage" in f.get("status", "").lower()]
+    if not holders:
+        holders = [fid for fid in facilities if fid not in reported and enrichment[fid] >= 60]
+    inventory = {}
+    for fid in facilities:
+        if fid in reported:
+            inventory[fid] = (float(reported[fid]), False)
+        elif fid in holders:
+            inventory[fid] = (remaining / len(holders), True)
+        else:
+            inventory[fid] = (0.0, True)
+    return inventory
+
+
+def _activity(facility):
+    """Activité observée (véhicules, observations satellite) en une ligne"""
+    parts = []
+    if facility.get("vehicle_activity"):
+        parts.append(f"Véhicules : {facility['vehicle_activity']}")
+    if facility.get("observations"):
+        parts.append(f"Observations : {facility['observations']}")
+    return " · ".join(parts)
+
+
+def _haversine_km(lat, lon):
+    """Matrice des distances (km) entre tous les points"""
+    lat, lon = np.radians(lat), np.radians(lon)
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def facility_tables(data_version, reference_date, _facilities, uranium_60_percent):
+    """Tables (per_facility, pairs) pour tous les sites, mises en cache par (version, jour).
+
+    per_facility : une ligne par site (index facility_id).
+    pairs : une ligne par paire ordonnée (a, b), écarts exprimés en « a - b ».
+    Les tables sont partagées entre sessions : lecture seule.
+    """
+    ids = list(_facilities)
+    enrichment = {fid: max_enrichment(f["enrichment_levels"]) for fid, f in _facilities.items()}
+    inventory = estimate_inventory(_facilities, uranium_60_percent, enrichment)
+    last_inspection = pd.to_datetime([_facilities[fid]["last_inspection"] for fid in ids])
+
+    per_facility = pd.DataFrame({
+        "name": [_facilities[fid]["name"] for fid in ids],
+        "status": [_facilities[fid]["status"] for fid in ids],
+        "access": pd.Categorical([access_level(_facilities[fid]["iaea_access"]) for fid in ids],
+                                 categories=ACCESS_LEVELS, ordered=True),
+        "iaea_access": [_facilities[fid]["iaea_access"] for fid in ids],
+        "last_inspection": last_inspection,
+        "days_since_inspection": (pd.Timestamp(reference_date) - last_inspection).days.to_numpy(),
+        "enrichment_levels": [", ".join(_facilities[fid]["enrichment_levels"]) for fid in ids],
+        "max_enrichment": [enrichment[fid] for fid in ids],
+        "strike": pd.Categorical.from_codes([strike_severity(_facilities[fid]) for fid in ids],
+                                            categories=STRIKE_LEVELS, ordered=True),
+        "damage": [_facilities[fid].get("damage") or _facilities[fid].get("bombed", "") for fid in ids],
+        "inventory_kg": [inventory[fid][0] for fid in ids],
+        "inventory_estimated": [inventory[fid][1] for fid in ids],
+        "activity": [_activity(_facilities[fid]) for fid in ids],
+        "lat": [_facilities[fid]["coordinates"]["lat"] for fid in ids],
+        "lon": [_facilities[fid]["coordinates"]["lon"] for fid in ids],
+    }, index=pd.Index(ids, name="facility_id"))
+    per_facility["access_color"] = facility_status_colors(per_facility["iaea_access"])
+
+    # Paires ordonnées : écarts calculés par diffusion sur les colonnes numériques
+    position = {fid: i for i, fid in enumerate(ids)}
+    pair_ids = list(permutations(ids, 2))
+    a = np.array([position[p[0]] for p in pair_ids], dtype=np.intp)
+    b = np.array([position[p[1]] for p in pair_ids], dtype=np.intp)
+    distances = _haversine_km(per_facility["lat"].to_numpy(float), per_facility["lon"].to_numpy(float))
+    access_codes = per_facility["access"].cat.codes.to_numpy()
+    strike_codes = per_facility["strike"].cat.codes.to_numpy()
+
+    def delta(column):
+        values = per_facility[column].to_numpy(float)
+        return values[a] - values[b]
+
+    pairs = pd.DataFrame({
+        "a": [p[0] for p in pair_ids],
+        "b": [p[1] for p in pair_ids],
+        "distance_km": distances[a, b],
+        "delta_days_since_inspection": delta("days_since_inspection"),
+        "delta_max_enrichment": delta("max_enrichment"),
+        "delta_inventory_kg": delta("inventory_kg"),
+        "delta_access": access_codes[a] - access_codes[b],
+        "delta_strike": strike_codes[a] - strike_codes[b],
+        "same_access": access_codes[a] == access_codes[b],
+    })
+    return compact_frame(per_facility), compact_frame(pairs)
+
+
+def select_pairs(pairs, facility_ids):
+    """Paires non ordonnées (a avant b dans facility_ids) restreintes aux sites choisis"""
+    order = {fid: i for i, fid in enumerate(facility_ids)}
+    a_rank = pairs["a"].astype(object).map(order)
+    b_rank = pairs["b"].astype(object).map(order)
+    mask = a_rank.notna() & b_rank.notna() & (a_rank < b_rank)
+    return pairs[mask]
+
+
+def facility_card_html(row):
+    """Carte HTML d'un site (ligne de la table par site), affichée par la page des sites et les exports"""
+    inventory = f"{row['inventory_kg']:.0f} kg" + (" (estimation)" if row["inventory_estimated"] else "")
+    return f"""
+    <div class='facility-card'>
+        <b>{row['name']}</b><br>
+        Statut : {row['status']}<br>
+        Accès AIEA : <span style='color: {row['access_color']}; font-weight: bold;'>{row['iaea_access']}</span><br>
+        Dernière inspection : {row['last_inspection']:%Y-%m-%d} ({row['days_since_inspection']} jours)<br>
+        Enrichissement : {row['enrichment_levels']}<br>
+        Frappes : {row['strike']} — {row['damage']}<br>
+        Inventaire U 60% : {inventory}
+    </div>
+    """
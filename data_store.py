@@ -0,0 +1,344 @@
+# data_store.py - Stockage local versionné des rapports AIEA (un instantané immuable par date de rapport)
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from utils import compact_frame
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Base SQLite (générée, non versionnée) et répertoire des rapports JSON à importer
+DEFAULT_DB_PATH = os.environ.get("IAEA_DB_PATH", os.path.join(BASE_DIR, "data", "iaea_reports.sqlite"))
+DEFAULT_REPORTS_DIR = os.environ.get("IAEA_REPORTS_DIR", os.path.join(BASE_DIR, "data", "reports"))
+
+# Champs de facility stockés en colonnes ; les autres vont dans la colonne JSON "extra"
+FACILITY_COLUMNS = ["name", "status", "iaea_access", "last_inspection", "bombed"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    report_date TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    imported_at TEXT NOT NULL,
+    uranium_60_percent REAL,
+    uranium_total REAL,
+    weapons_potential INTEGER,
+    thresholds TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS facilities (
+    report_date TEXT NOT NULL REFERENCES snapshots(report_date),
+    facility_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT,
+    status TEXT,
+    iaea_access TEXT,
+    last_inspection TEXT,
+    bombed TEXT,
+    lat REAL,
+    lon REAL,
+    enrichment_levels TEXT,
+    extra TEXT,
+    PRIMARY KEY (report_date, facility_id)
+);
+CREATE TABLE IF NOT EXISTS timeline_events (
+    report_date TEXT NOT NULL REFERENCES snapshots(report_date),
+    date TEXT NOT NULL,
+    event TEXT NOT NULL,
+    type TEXT
+);
+CREATE TABLE IF NOT EXISTS enrichment_history (
+    report_date TEXT NOT NULL REFERENCES snapshots(report_date),
+    date TEXT NOT NULL,
+    level REAL,
+    stock REAL
+);
+CREATE TABLE IF NOT EXISTS negotiations (
+    report_date TEXT NOT NULL REFERENCES snapshots(report_date),
+    date TEXT NOT NULL,
+    location TEXT,
+    parties TEXT,
+    outcome TEXT
+);
+CREATE TABLE IF NOT EXISTS statements (
+    report_date TEXT NOT NULL REFERENCES snapshots(report_date),
+    date TEXT NOT NULL,
+    source TEXT,
+    statement TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_timeline_report ON timeline_events(report_date);
+CREATE INDEX IF NOT EXISTS idx_history_report ON enrichment_history(report_date);
+CREATE INDEX IF NOT EXISTS idx_negotiations_report ON negotiations(report_date);
+CREATE INDEX IF NOT EXISTS idx_statements_report ON statements(report_date);
+"""
+
+SNAPSHOT_TABLES = ["snapshots", "facilities", "timeline_events", "enrichment_history", "negotiations", "statements"]
+
+# Les instantanés sont immuables : toute modification ou suppression est refusée par SQLite
+IMMUTABILITY_TRIGGERS = "\n".join(
+    f"""
+CREATE TRIGGER IF NOT EXISTS {table}_no_update BEFORE UPDATE ON {table}
+BEGIN SELECT RAISE(ABORT, 'instantané immuable'); END;
+CREATE TRIGGER IF NOT EXISTS {table}_no_delete BEFORE DELETE ON {table}
+BEGIN SELECT RAISE(ABORT, 'instantané immuable'); END;"""
+    for table in SNAPSHOT_TABLES
+)
+
+# Mémo par processus de l'état du répertoire des rapports (évite de le rescanner à chaque rerun)
+_reports_dir_state = {}
+_sync_lock = threading.Lock()
+
+
+def connect(db_path=DEFAULT_DB_PATH):
+    """Ouvre une connexion SQLite et crée le schéma si nécessaire"""
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.executescript(SCHEMA + IMMUTABILITY_TRIGGERS)
+    return conn
+
+
+def snapshot_hash(snapshot):
+    """Empreinte du contenu d'un instantané (JSON canonique)"""
+    payload = json.dumps(snapshot, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def write_snapshot(snapshot, db_path=DEFAULT_DB_PATH):
+    """Enregistre un instantané de rapport dans une seule transaction.
+
+    Renvoie True si l'instantané a été ajouté, False s'il existait déjà à
+    l'identique. Lève ValueError si la date de rapport existe avec un contenu
+    différent : un rapport publié ne se réécrit pas, il faut une nouvelle date.
+    """
+    report_date = snapshot.get("report_date")
+    if not report_date:
+        raise ValueError("Instantané sans 'report_date'")
+    content_hash = snapshot_hash(snapshot)
+
+    conn = connect(db_path)
+    try:
+        row = conn.execute("SELECT content_hash FROM snapshots WHERE report_date = ?",
+                           (report_date,)).fetchone()
+        if row is not None:
+            if row[0] == content_hash:
+                return False
+            raise ValueError(f"Le rapport du {report_date} existe déjà avec un contenu différent")
+
+        with conn:
+            conn.execute(
+                "INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (report_date, content_hash, datetime.now().isoformat(timespec="seconds"),
+                 snapshot.get("uranium_60_percent"), snapshot.get("uranium_total"),
+                 snapshot.get("weapons_potential"),
+                 json.dumps(snapshot.get("thresholds", {}), ensure_ascii=False))
+            )
+            facility_rows = []
+            for position, (facility_id, facility) in enumerate(snapshot.get("facilities", {}).items()):
+                coordinates = facility.get("coordinates") or {}
+                extra = {k: v for k, v in facility.items()
+                         if k not in FACILITY_COLUMNS and k not in ("coordinates", "enrichment_levels")}
+                facility_rows.append((
+                    report_date, facility_id, position,
+                    *[facility.get(column) for column in FACILITY_COLUMNS],
+                    coordinates.get("lat"), coordinates.get("lon"),
+                    json.dumps(facility.get("enrichment_levels", []), ensure_ascii=False),
+                    json.dumps(extra, ensure_ascii=False),
+                ))
+            conn.executemany("INSERT INTO facilities VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", facility_rows)
+            conn.executemany(
+                "INSERT INTO timeline_events VALUES (?, ?, ?, ?)",
+                [(report_date, e["date"], e["event"], e.get("type")) for e in snapshot.get("timeline_events", [])]
+            )
+            conn.executemany(
+                "INSERT INTO enrichment_history VALUES (?, ?, ?, ?)",
+                [(report_date, h["date"], h.get("level"), h.get("stock")) for h in snapshot.get("enrichment_history", [])]
+            )
+            conn.executemany(
+                "INSERT INTO negotiations VALUES (?, ?, ?, ?, ?)",
+                [(report_date, n["date"], n.get("location"), json.dumps(n.get("parties", []), ensure_ascii=False),
+                  n.get("outcome")) for n in snapshot.get("negotiations", [])]
+            )
+            conn.executemany(
+                "INSERT INTO statements VALUES (?, ?, ?, ?)",
+                [(report_date, s["date"], s.get("source"), s.get("statement")) for s in snapshot.get("statements", [])]
+            )
+        return True
+    finally:
+        conn.close()
+
+
+def import_report_file(path, db_path=DEFAULT_DB_PATH):
+    """Importe un rapport JSON dans la base"""
+    with open(path, encoding="utf-8") as f:
+        return write_snapshot(json.load(f), db_path)
+
+
+def sync_reports_dir(db_path=DEFAULT_DB_PATH, reports_dir=DEFAULT_REPORTS_DIR):
+    """Importe les rapports JSON nouvellement déposés dans reports_dir.
+
+    Le répertoire n'est rescanné que si sa date de modification ou celle de la
+    base a changé depuis le dernier passage dans ce processus. Un fichier
+    illisible ou en conflit avec un rapport existant est journalisé et ignoré.
+    """
+    if not os.path.isdir(reports_dir):
+        return 0
+    state_key = (os.path.abspath(db_path), os.path.abspath(reports_dir))
+    signature = (os.stat(reports_dir).st_mtime_ns, store_signature(db_path))
+    if _reports_dir_state.get(state_key) == signature:
+        return 0
+
+    with _sync_lock:
+        imported = 0
+        conn = connect(db_path)
+        try:
+            known = {row[0] for row in conn.execute("SELECT report_date FROM snapshots")}
+        finally:
+            conn.close()
+        for entry in sorted(os.scandir(reports_dir), key=lambda e: e.name):
+            if not entry.name.endswith(".json") or entry.name[:-5] in known:
+                continue
+            try:
+                imported += import_report_file(entry.path, db_path)
+            except (OSError, ValueError) as exc:  # JSONDecodeError compris
+                logger.warning("Rapport %s ignoré : %s", entry.path, exc)
+        _reports_dir_state[state_key] = (os.stat(reports_dir).st_mtime_ns, store_signature(db_path))
+        return imported
+
+
+def store_signature(db_path=DEFAULT_DB_PATH):
+    """Signature (mtime, taille) de la base : change à chaque instantané ajouté"""
+    try:
+        stat = os.stat(db_path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _list_snapshots(db_path, signature):
+    """Liste (report_date, content_hash) des instantanés, mise en cache par signature de la base"""
+    conn = connect(db_path)
+    try:
+        return conn.execute("SELECT report_date, content_hash FROM snapshots ORDER BY report_date").fetchall()
+    finally:
+        conn.close()
+
+
+def list_snapshots(db_path=DEFAULT_DB_PATH):
+    """Dates de rapport disponibles, de la plus ancienne à la plus récente"""
+    sync_reports_dir(db_path)
+    return [report_date for report_date, _ in _list_snapshots(db_path, store_signature(db_path))]
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _load_snapshot(db_path, report_date, content_hash):
+    """Charge un instantané ; immuable, il est mis en cache par (date, empreinte) et jamais relu"""
+    conn = connect(db_path)
+    try:
+        report = conn.execute(
+            "SELECT uranium_60_percent, uranium_total, weapons_potential, thresholds "
+            "FROM snapshots WHERE report_date = ?", (report_date,)
+        ).fetchone()
+        if report is None:
+            raise KeyError(f"Aucun rapport pour la date {report_date}")
+        params = (report_date,)
+        facilities = pd.read_sql_query(
+            "SELECT * FROM facilities WHERE report_date = ? ORDER BY position", conn, params=params)
+        timeline = pd.read_sql_query(
+            "SELECT date, event, type FROM timeline_events WHERE report_date = ? ORDER BY rowid", conn, params=params)
+        history = pd.read_sql_query(
+            "SELECT date, level, stock FROM enrichment_history WHERE report_date = ? ORDER BY rowid", conn, params=params)
+        negotiations = pd.read_sql_query(
+            "SELECT date, location, parties, outcome FROM negotiations WHERE report_date = ? ORDER BY rowid",
+            conn, params=params)
+        statements = pd.read_sql_query(
+            "SELECT date, source, statement FROM statements WHERE report_date = ? ORDER BY rowid", conn, params=params)
+    finally:
+        conn.close()
+
+    facilities_dict = {}
+    for row in facilities.itertuples(index=False):
+        facility = {column: getattr(row, column) for column in FACILITY_COLUMNS if getattr(row, column) is not None}
+        facility["enrichment_levels"] = json.loads(row.enrichment_levels)
+        facility.update(json.loads(row.extra))
+        facility["coordinates"] = {"lat": row.lat, "lon": row.lon}
+        facilities_dict[row.facility_id] = facility
+    negotiations["parties"] = negotiations["parties"].map(json.loads)
+
+    # DataFrames prêts à l'emploi (dates converties, chronologie triée, types compacts)
+    frames = {
+        "enrichment_history": history.assign(date=pd.to_datetime(history["date"])),
+        "timeline_events": (timeline.assign(date=pd.to_datetime(timeline["date"]))
+                            .sort_values("date", kind="stable").reset_index(drop=True)),
+        "negotiations": negotiations.assign(date=pd.to_datetime(negotiations["date"])),
+        "statements": statements.assign(date=pd.to_datetime(statements["date"])),
+    }
+    frames = {name: compact_frame(frame) for name, frame in frames.items()}
+
+    return {
+        "report_date": report_date,
+        "data_version": content_hash[:16],
+        "uranium_60_percent": report[0],
+        "uranium_total": report[1],
+        "weapons_potential": report[2],
+        "facilities": facilities_dict,
+        "timeline_events": timeline.to_dict("records"),
+        "enrichment_history": history.to_dict("records"),
+        "thresholds": json.loads(report[3]),
+        "negotiations": negotiations.to_dict("records"),
+        "statements": statements.to_dict("records"),
+        "frames": frames,
+    }
+
+
+def load_snapshot(report_date=None, db_path=DEFAULT_DB_PATH):
+    """Renvoie l'instantané demandé (le plus récent par défaut).
+
+    L'objet renvoyé est partagé entre les sessions : il doit être traité en
+    lecture seule.
+    """
+    sync_reports_dir(db_path)
+    snapshots = _list_snapshots(db_path, store_signature(db_path))
+    if not snapshots:
+        raise LookupError(f"Aucun rapport dans {db_path}")
+    if report_date is None:
+        report_date, content_hash = snapshots[-1]
+    else:
+        content_hash = dict(snapshots).get(report_date)
+        if content_hash is None:
+            raise KeyError(f"Aucun rapport pour la date {report_date}")
+    return _load_snapshot(db_path, report_date, content_hash)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gestion du stockage local des rapports AIEA")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="chemin de la base SQLite")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub_import = sub.add_parser("import", help="importer un ou plusieurs rapports JSON")
+    sub_import.add_argument("paths", nargs="+")
+    sub.add_parser("list", help="lister les instantanés disponibles")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        for path in args.paths:
+            added = import_report_file(path, args.db)
+            print(f"{path}: {'importé' if added else 'déjà présent'}")
+    else:
+        conn = connect(args.db)
+        try:
+            for report_date, content_hash, imported_at in conn.execute(
+                    "SELECT report_date, content_hash, imported_at FROM snapshots ORDER BY report_date"):
+                print(f"{report_date}  {content_hash[:16]}  importé le {imported_at}")
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# dataset.py - Données partagées par toutes les pages (chargées une fois par processus)
+import hashlib
+import json
+import pickle
+import sys
+from datetime import date
+
+import pandas as pd
+import streamlit as st
+
+from data_store import load_snapshot
+from inspection_log import load_inspection_history, store_signature
+from utils import frame_bytes
+
+
+def compute_data_version(*objects):
+    """Calcule une empreinte stable des données utilisées par les figures mises en cache"""
+    digest = hashlib.sha1()
+    for obj in objects:
+        if isinstance(obj, pd.DataFrame):
+            digest.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+        else:
+            digest.update(json.dumps(obj, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _data_version(snapshot_version, history_signature, _inspection_history):
+    return compute_data_version(snapshot_version, _inspection_history)
+
+
+def get_dataset():
+    """Renvoie (LATEST_IAEA_DATA, INSPECTION_HISTORY, DATA_VERSION), partagés entre sessions et pages.
+
+    Les objets renvoyés sont communs à toutes les sessions : lecture seule.
+    """
+    latest = load_snapshot()
+    # Agrégé depuis le journal des inspections (data/inspections), seuls les ajouts sont relus
+    inspection_history = load_inspection_history()
+    data_version = _data_version(latest["data_version"], store_signature(), inspection_history)
+    return latest, inspection_history, data_version
+
+
+def kpis(latest, today=None):
+    """Chiffres des cartes KPI (partagés par le tableau de bord et l'API JSON).
+
+    La dernière vérification est l'inspection la plus récente des sites d'enrichissement à 60%.
+    """
+    today = today or date.today()
+    last_verification = max(
+        facility["last_inspection"] for facility in latest["facilities"].values()
+        if any("60%" in level for level in facility["enrichment_levels"])
+    )
+    return {
+        "report_date": latest["report_date"],
+        "uranium_60_percent": latest["uranium_60_percent"],
+        "uranium_total": latest["uranium_total"],
+        "weapons_potential": latest["weapons_potential"],
+        "breakout_time": latest["thresholds"]["breakout_time"],
+        "last_verification": last_verification,
+        "days_since_last": (today - date.fromisoformat(last_verification)).days,
+    }
+
+
+def _object_bytes(value):
+    """Taille approximative d'un objet de session (sérialisé si possible)"""
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+def _process_rss():
+    """Mémoire résidente du processus (octets), None si indisponible"""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except (ImportError, OSError):
+        return None
+
+
+def _active_sessions():
+    try:
+        from streamlit.runtime import Runtime
+        return Runtime.instance()._session_mgr.num_active_sessions()
+    except Exception:
+        return None
+
+
+def memory_report(session_state, n_sessions=200):
+    """Mémoire partagée (jeu de données, une fois par processus) et mémoire propre à la session.
+
+    Renvoie un dict : shared / session (octets par élément), totaux, estimation
+    pour n_sessions sessions simultanées, RSS du processus et sessions actives.
+    """
+    latest, inspection_history, _ = get_dataset()
+    shared = {f"frames/{name}": frame_bytes(frame) for name, frame in latest["frames"].items()}
+    shared["inspection_history"] = frame_bytes(inspection_history)
+    shared["snapshot (hors frames)"] = _object_bytes({k: v for k, v in latest.items() if k != "frames"})
+    session = {key: _object_bytes(session_state[key]) for key in session_state.keys()}
+    shared_total = sum(shared.values())
+    session_total = sum(session.values())
+    return {
+        "shared": shared,
+        "session": session,
+        "shared_total": shared_total,
+        "session_total": session_total,
+        "n_sessions": n_sessions,
+        "estimated_total": shared_total + n_sessions * session_total,
+        "process_rss": _process_rss(),
+        "active_sessions": _active_sessions(),
+    }
@@ -0,0 +1,98 @@
+# downsample.py - Réduction des longues séries temporelles avant affichage
+#
+# Les séries (stock, niveau d'accès...) peuvent être journalières ou horaires sur plusieurs
+# années : seuls quelques centaines de points par graphique sont envoyés au navigateur.
+# Deux méthodes, qui conservent toutes deux le premier et le dernier point :
+# - LTTB (Largest-Triangle-Three-Buckets) : fidèle à la forme générale de la courbe ;
+# - min-max par intervalle : conserve exactement les extrêmes (pics, chutes d'accès).
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+# Nombre de points visés par série (ordre de grandeur de la largeur d'un graphique en pixels)
+DOWNSAMPLE_POINTS = 800
+
+
+def _as_float(values):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[ns]").astype(np.int64).astype(float)
+    return values.astype(float)
+
+
+def lttb(x, y, n_out):
+    """Indices des n_out points retenus par l'algorithme LTTB (x croissant, sans NaN)"""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _as_float(x)
+    y = _as_float(y)
+
+    # n_out - 2 intervalles entre le premier et le dernier point
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[hi:next_hi].mean()
+        avg_y = y[hi:next_hi].mean()
+        # Aire du triangle (point précédent, candidat, moyenne de l'intervalle suivant)
+        area = np.abs((x[previous] - avg_x) * (y[lo:hi] - y[previous])
+                      - (x[previous] - x[lo:hi]) * (avg_y - y[previous]))
+        previous = lo + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def minmax(y, n_buckets):
+    """Indices du minimum et du maximum de chacun des n_buckets intervalles (sans NaN)"""
+    n = len(y)
+    if 2 * n_buckets + 2 >= n or n_buckets < 1:
+        return np.arange(n)
+    y = _as_float(y)
+
+    starts = np.linspace(0, n, n_buckets + 1).astype(np.int64)[:-1]
+    bucket = np.repeat(np.arange(n_buckets), np.diff(np.append(starts, n)))
+    # Tri par intervalle puis par valeur : le premier de chaque intervalle est le minimum, le dernier le maximum
+    order = np.lexsort((y, bucket))
+    ends = np.append(starts[1:], n) - 1
+    return np.unique(np.concatenate(([0, n - 1], order[starts], order[ends])))
+
+
+def window(df, x_col, start=None, end=None):
+    """Lignes de df dont x_col est dans [start, end] (bornes incluses, None = ouverte).
+
+    Une borne de fin de type date (sans heure) inclut toute la journée.
+    """
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= df[x_col] >= pd.Timestamp(start)
+    if end is not None:
+        if isinstance(end, date) and not isinstance(end, datetime):
+            mask &= df[x_col] < pd.Timestamp(end) + pd.Timedelta(days=1)
+        else:
+            mask &= df[x_col] <= pd.Timestamp(end)
+    return df[mask]
+
+
+def downsample_frame(df, x_col, y_cols, n_points=DOWNSAMPLE_POINTS, method="lttb"):
+    """Réduit df (trié selon x_col) à environ n_points lignes par colonne y_cols.
+
+    Les indices retenus pour chaque colonne sont réunis, de sorte que toutes les
+    séries tracées à partir du résultat partagent les mêmes abscisses.
+    """
+    if len(df) <= n_points:
+        return df
+    keep = []
+    for col in y_cols:
+        valid = np.flatnonzero(df[col].notna().to_numpy())
+        if method == "minmax":
+            indices = minmax(df[col].to_numpy()[valid], n_points // 2)
+        else:
+            indices = lttb(df[x_col].to_numpy()[valid], df[col].to_numpy()[valid], n_points)
+        keep.append(valid[indices])
+    return df.iloc[np.unique(np.concatenate(keep))]
@@ -0,0 +1,280 @@
+# export.py - Export statique des rapports (HTML autonome + CSV), sans navigateur
+#
+#   python export.py                                        # tous les rapports, tous les sites
+#   python export.py --dates 2026-02-27 --facilities Isfahan Natanz
+#   python export.py --workers 4 --output /tmp/archive --force
+#
+# Un dossier par date de rapport : report.html (figure 2x2 pour chaque option du seuil
+# militaire, chronologie, KPI et cartes des sites ; plotly.js et polices intégrés) et les
+# CSV des données affichées. Les rapports sont répartis sur un pool de processus.
+# Le JSON de chaque figure est conservé dans <sortie>/.cache, indexé par les données
+# d'entrée et le code des figures : il n'est reconstruit que si l'un d'eux change. Un
+# dossier dont les entrées n'ont pas changé (manifest.json) n'est pas réécrit.
+import argparse
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+from functools import lru_cache
+
+import pandas as pd
+
+import data_store
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT_DIR = os.environ.get("IAEA_EXPORT_DIR", os.path.join(BASE_DIR, "exports"))
+# Sources dont dépend le contenu des figures : les modifier invalide le cache
+FIGURE_SOURCES = ["figures.py", "downsample.py"]
+# Sources dont dépend le contenu d'un dossier exporté
+BUNDLE_SOURCES = FIGURE_SOURCES + ["export.py", "comparison.py", "dataset.py", "assets/style.css"]
+# Options du seuil militaire exportées (figure principale)
+WEAPONS_GRADE_OPTIONS = {"on": [True], "off": [False], "both": [False, True]}
+
+# Colonnes du CSV des sites (table par site de comparison.py)
+FACILITY_CSV_COLUMNS = ["name", "status", "iaea_access", "access", "last_inspection", "days_since_inspection",
+                        "enrichment_levels", "max_enrichment", "strike", "damage", "inventory_kg",
+                        "inventory_estimated", "lat", "lon"]
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="fr">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+{css}
+<script type="text/javascript">{plotlyjs}</script>
+</head>
+<body style="font-family: Roboto, sans-serif; max-width: 1200px; margin: 1rem auto;">
+{body}
+</body>
+</html>
+"""
+
+FIGURE_TEMPLATE = """<div id="{div_id}"></div>
+<script type="text/javascript">
+(function () {{
+    var figure = {figure_json};
+    Plotly.newPlot("{div_id}", figure.data, figure.layout, {{"responsive": true, "displaylogo": false}});
+}})();
+</script>"""
+
+
+def sources_hash(paths):
+    digest = hashlib.sha1()
+    for path in paths:
+        with open(os.path.join(BASE_DIR, path), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def _key(*parts):
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:20]
+
+
+@lru_cache(maxsize=1)
+def _plotlyjs():
+    from plotly.offline import get_plotlyjs
+
+    return get_plotlyjs()
+
+
+def _cached_figure(cache_dir, key, build):
+    """JSON d'une figure : lu dans le cache si présent, sinon construit puis enregistré ; (json, réutilisé)"""
+    path = os.path.join(cache_dir, f"{key}.json")
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return f.read(), True
+    figure_json = build().to_json()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(figure_json)
+    os.replace(tmp_path, path)
+    return figure_json, False
+
+
+def _embed(div_id, figure_json):
+    # Un « </script> » dans un libellé fermerait la balise : on échappe « </ »
+    return FIGURE_TEMPLATE.format(div_id=div_id, figure_json=figure_json.replace("</", "<\\/"))
+
+
+def _kpi_cards(values):
+    cards = [
+        (f"{values['uranium_60_percent']} kg", "Uranium enrichi à 60%"),
+        (f"{values['uranium_total']:.0f} kg", "Uranium enrichi total"),
+        (f"{values['weapons_potential']}", "Bombes potentielles"),
+        (f"{values['breakout_time']} jours", "Temps de breakout"),
+        (f"{values['days_since_last']} jours", "Sans inspection AIEA (à la date du rapport)"),
+    ]
+    return "<div style='display: flex; gap: 1rem;'>" + "".join(
+        f"<div class='metric-card' style='flex: 1;'><div class='metric-value'>{value}</div>"
+        f"<div class='metric-label'>{label}</div></div>" for value, label in cards) + "</div>"
+
+
+def export_report(job):
+    """Exporte le dossier d'une date de rapport (exécuté dans un worker) ; renvoie un résumé"""
+    from assets import load_css
+    from comparison import facility_card_html, facility_tables
+    from dataset import compute_data_version, kpis
+    from figures import build_main_figure, build_timeline_figure
+    from utils import format_date_fr
+
+    start = time.perf_counter()
+    report_date = job["report_date"]
+    bundle_dir = os.path.join(job["output_dir"], report_date)
+    manifest_path = os.path.join(bundle_dir, "manifest.json")
+    if not job["force"] and os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("key") == job["bundle_key"] and all(
+                os.path.exists(os.path.join(bundle_dir, name)) for name in manifest["files"]):
+            return {"report_date": report_date, "skipped": True, "built": 0, "reused": 0,
+                    "seconds": time.perf_counter() - start}
+
+    snapshot = data_store.load_snapshot(report_date, job["db_path"])
+    frames = snapshot["frames"]
+    inspection_history = job["inspection_history"]
+    # Historique des inspections tel qu'il était connu à la date du rapport
+    inspection_history = inspection_history[inspection_history["date"] <= report_date].reset_index(drop=True)
+    # Versions du contenu de chaque figure (historique filtré compris) : une figure dont les
+    # données sont identiques d'une date à l'autre est réutilisée
+    main_version = compute_data_version(frames["enrichment_history"], inspection_history)
+    timeline_version = compute_data_version(frames["timeline_events"])
+    cache_dir = os.path.join(job["output_dir"], ".cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    os.makedirs(bundle_dir, exist_ok=True)
+
+    built = reused = 0
+    sections = []
+    for show_weapons_grade in job["weapons_grade"]:
+        figure_json, was_cached = _cached_figure(
+            cache_dir, _key("main", main_version, show_weapons_grade, job["figures_version"]),
+            lambda: build_main_figure(main_version, show_weapons_grade,
+                                      frames["enrichment_history"], inspection_history))
+        built, reused = built + (not was_cached), reused + was_cached
+        title = "avec seuil militaire (90%)" if show_weapons_grade else "sans seuil militaire"
+        sections.append(f"<h3>Évolution du programme nucléaire — {title}</h3>"
+                        + _embed(f"main-{int(show_weapons_grade)}", figure_json))
+    figure_json, was_cached = _cached_figure(
+        cache_dir, _key("timeline", timeline_version, job["figures_version"]),
+        lambda: build_timeline_figure(timeline_version, None, None, frames["timeline_events"]))
+    built, reused = built + (not was_cached), reused + was_cached
+    sections.append("<h3>📅 Chronologie des événements clés</h3>" + _embed("timeline", figure_json))
+
+    per_facility, _ = facility_tables(snapshot["data_version"], report_date, snapshot["facilities"],
+                                      snapshot["uranium_60_percent"])
+    # Sites demandés présents dans ce rapport (validés sur l'ensemble des rapports exportés)
+    selected = [fid for fid in per_facility.index if not job["facilities"] or fid in job["facilities"]]
+    per_facility = per_facility.loc[selected]
+    sections.append("<h3>🏭 Sites</h3>" + "".join(facility_card_html(row) for _, row in per_facility.iterrows()))
+
+    values = kpis(snapshot, date.fromisoformat(report_date))
+    body = (f"<h1>Programme nucléaire iranien — rapport AIEA du {format_date_fr(report_date)}</h1>"
+            + _kpi_cards(values) + "\n".join(sections))
+    files = {
+        "report.html": PAGE_TEMPLATE.format(title=f"Rapport AIEA {report_date}", css=load_css(),
+                                            plotlyjs=_plotlyjs(), body=body),
+    }
+    csv_frames = {
+        "kpis.csv": pd.DataFrame([values]),
+        "facilities.csv": per_facility[FACILITY_CSV_COLUMNS],
+        "enrichment_history.csv": frames["enrichment_history"],
+        "timeline_events.csv": frames["timeline_events"],
+        "inspection_history.csv": inspection_history,
+    }
+    for name, frame in csv_frames.items():
+        files[name] = frame.to_csv(index=name == "facilities.csv", date_format="%Y-%m-%d")
+    for name, content in files.items():
+        with open(os.path.join(bundle_dir, name), "w", encoding="utf-8") as f:
+            f.write(content)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"key": job["bundle_key"], "report_date": report_date, "facilities": selected,
+                   "files": sorted(files)}, f, ensure_ascii=False, indent=2)
+    return {"report_date": report_date, "skipped": False, "built": built, "reused": reused,
+            "seconds": time.perf_counter() - start}
+
+
+def _init_worker():
+    # Fonctions mises en cache hors du serveur Streamlit : avertissements sans objet
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+
+def export_reports(dates=None, facilities=None, weapons_grade="both", output_dir=DEFAULT_OUTPUT_DIR,
+                   workers=None, force=False, db_path=data_store.DEFAULT_DB_PATH):
+    """Exporte un dossier par date de rapport (toutes par défaut) ; renvoie la liste des résumés"""
+    from dataset import compute_data_version
+    from inspection_log import load_inspection_history
+
+    _init_worker()
+    available = data_store.list_snapshots(db_path)
+    dates = dates or available
+    missing = sorted(set(dates) - set(available))
+    if missing:
+        raise KeyError(f"Aucun rapport pour : {', '.join(missing)}")
+    inspection_history = load_inspection_history()
+    inspection_version = compute_data_version(inspection_history)
+    figures_version = sources_hash(FIGURE_SOURCES)
+    bundle_version = sources_hash(BUNDLE_SOURCES)
+    conn = data_store.connect(db_path)
+    try:
+        content_hashes = dict(conn.execute("SELECT report_date, content_hash FROM snapshots"))
+        known_facilities = {row[0] for row in conn.execute(
+            f"SELECT DISTINCT facility_id FROM facilities WHERE report_date IN ({', '.join('?' * len(dates))})",
+            list(dates))}
+    finally:
+        conn.close()
+    unknown = sorted(set(facilities or []) - known_facilities)
+    if unknown:
+        raise KeyError(f"Site(s) absent(s) des rapports exportés : {', '.join(unknown)}")
+
+    jobs = [{
+        "report_date": report_date,
+        "db_path": db_path,
+        "output_dir": os.path.abspath(output_dir),
+        "facilities": sorted(facilities or []),
+        "weapons_grade": WEAPONS_GRADE_OPTIONS[weapons_grade],
+        "inspection_history": inspection_history,
+        "figures_version": figures_version,
+        "bundle_key": _key(content_hashes[report_date], inspection_version, sorted(facilities or []),
+                           weapons_grade, bundle_version),
+        "force": force,
+    } for report_date in sorted(dates)]
+
+    workers = workers or min(len(jobs), max(1, (os.cpu_count() or 1) - 1))
+    if workers <= 1 or len(jobs) <= 1:
+        return [export_report(job) for job in jobs]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker) as executor:
+        futures = [executor.submit(export_report, job) for job in jobs]
+        for future in as_completed(futures):
+            results.append(future.result())
+    return sorted(results, key=lambda result: result["report_date"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export statique des rapports (HTML autonome et CSV)")
+    parser.add_argument("--db", default=data_store.DEFAULT_DB_PATH, help="chemin de la base SQLite des rapports")
+    parser.add_argument("--dates", nargs="+", help="dates de rapport (toutes par défaut)")
+    parser.add_argument("--facilities", nargs="+", help="identifiants des sites (tous par défaut)")
+    parser.add_argument("--weapons-grade", choices=sorted(WEAPONS_GRADE_OPTIONS), default="both",
+                        help="option « seuil militaire » de la figure principale")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, help="processus (par défaut : un par cœur, moins un)")
+    parser.add_argument("--force", action="store_true", help="réécrire les dossiers inchangés")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = export_reports(args.dates, args.facilities, args.weapons_grade, args.output,
+                             args.workers, args.force, args.db)
+    for result in results:
+        status = "inchangé" if result["skipped"] else (
+            f"{result['built']} figure(s) construite(s), {result['reused']} réutilisée(s)")
+        print(f"{result['report_date']}: {status} ({result['seconds']:.2f} s)")
+    print(f"{len(results)} rapport(s) exporté(s) dans {args.output} en {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
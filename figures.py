@@ -0,0 +1,349 @@
+# figures.py - Construction des figures Plotly du tableau de bord (avec cache partagé)
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+import streamlit as st
+from plotly.subplots import make_subplots
+
+from downsample import DOWNSAMPLE_POINTS, downsample_frame, window
+
+# Nombre de figures conservées en mémoire (toutes sessions confondues)
+FIGURE_CACHE_ENTRIES = 32
+# Durée de vie d'une figure en cache (secondes)
+FIGURE_CACHE_TTL = 6 * 3600
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES, ttl=FIGURE_CACHE_TTL, show_spinner=False)
+def build_main_figure(data_version, show_weapons_grade, _enrichment_history, _inspection_history,
+                      start=None, end=None, n_points=DOWNSAMPLE_POINTS):
+    """Construit la figure 2x2 du tableau de bord principal.
+
+    La clé de cache est (data_version, show_weapons_grade, start, end, n_points) :
+    les arguments préfixés par « _ » ne sont pas hachés par Streamlit. Les séries
+    du stock et de l'accès sont restreintes à la fenêtre [start, end] puis réduites
+    à environ n_points points : réduire la fenêtre affiche plus de détail.
+    La figure est partagée entre toutes les sessions et ne doit donc pas être
+    modifiée par l'appelant.
+    """
+    fig = make_subplots(
+        rows=2, cols=2,
+        subplot_titles=("Évolution du stock d'uranium enrichi",
+                        "Niveaux d'enrichissement",
+                        "Accès AIEA aux sites",
+                        "Inspections réalisées"),
+        specs=[[{"secondary_y": True}, {"type": "domain"}],
+               [{"type": "scatter"}, {"type": "bar"}]]
+    )
+
+    # Graphique 1: Évolution du stock
+    df_hist = downsample_frame(window(_enrichment_history, 'date', start, end), 'date', ['stock', 'level'], n_points)
+    # Accès : min-max par intervalle, pour ne perdre aucune chute ni reprise
+    df_access = downsample_frame(window(_inspection_history, 'date', start, end), 'date', ['access_level'],
+                                 n_points, method="minmax")
+
+    fig.add_trace(
+        go.Scatter(x=df_hist['date'], y=df_hist['stock'],
+                   name="Stock total (kg)", line=dict(color='#DA0000', width=3),
+                   fill='tozeroy'),
+        row=1, col=1
+    )
+
+    fig.add_trace(
+        go.Scatter(x=df_hist['date'], y=df_hist['level'],
+                   name="Niveau enrichissement (%)", line=dict(color='#FFA500', width=2, dash='dash'),
+                   yaxis="y2"),
+        row=1, col=1, secondary_y=True
+    )
+
+    # Seuils
+    if show_weapons_grade:
+        fig.add_hline(y=90, line_dash="dash", line_color="#DA0000",
+                      annotation_text="Seuil militaire (90%)", row=1, col=1)
+
+    fig.add_hline(y=60, line_dash="dash", line_color="#FFA500",
+                  annotation_text="Niveau actuel (60%)", row=1, col=1)
+    fig.add_hline(y=3.67, line_dash="dash", line_color="#239F40",
+                  annotation_text="Limite JCPOA", row=1, col=1)
+
+    # Graphique 2: Niveaux d'enrichissement (camembert)
+    enrichment_data = pd.DataFrame({
+        'Niveau': ['3.67% (JCPOA)', '20%', '60%', '90% (militaire)'],
+        'Statut': ['Dépassé', 'Atteint', 'Atteint', 'Non atteint']
+    })
+
+    fig.add_trace(
+        go.Pie(labels=enrichment_data['Niveau'], values=[1, 1, 1, 0],
+               marker=dict(colors=['#239F40', '#FFA500', '#DA0000', '#666666']),
+               textinfo='label'),
+        row=1, col=2
+    )
+
+    # Graphique 3: Accès AIEA
+    fig.add_trace(
+        go.Scatter(x=df_access['date'], y=df_access['access_level'],
+                   name="Niveau d'accès (%)", line=dict(color='#2196f3', width=3),
+                   fill='tozeroy'),
+        row=2, col=1
+    )
+
+    # add_shape au lieu de add_vline pour éviter les problèmes de timezone
+    fig.add_shape(
+        type="line",
+        x0="2025-06-15",
+        y0=0,
+        x1="2025-06-15",
+        y1=1,
+        yref="paper",
+        line=dict(color="#DA0000", width=2, dash="dash"),
+        row=2, col=1
+    )
+
+    fig.add_annotation(
+        x="2025-06-15",
+        y=df_access['access_level'].max() * 0.9 if len(df_access) else 90,
+        text="Frappes juin 2025",
+        showarrow=True,
+        arrowhead=1,
+        ax=0,
+        ay=-40,
+        row=2, col=1
+    )
+
+    # Graphique 4: Inspections
+    fig.add_trace(
+        go.Bar(x=_inspection_history['date'].iloc[-24:],
+               y=_inspection_history['inspections_conducted'].iloc[-24:],
+               name="Inspections mensuelles", marker_color='#2196f3'),
+        row=2, col=2
+    )
+
+    fig.update_layout(height=800, showlegend=True, template='plotly_white',
+                      title_text="Analyse chronologique du programme nucléaire iranien")
+    fig.update_xaxes(title_text="Date", row=1, col=1)
+    fig.update_xaxes(title_text="Date", row=2, col=1)
+    fig.update_yaxes(title_text="Stock (kg)", row=1, col=1)
+    fig.update_yaxes(title_text="Niveau d'enrichissement (%)", secondary_y=True, row=1, col=1)
+    fig.update_yaxes(title_text="Niveau d'accès (%)", row=2, col=1)
+    fig.update_yaxes(title_text="Nombre d'inspections", row=2, col=2)
+    if start is not None and end is not None:
+        # Fenêtre fixe : les repères hors fenêtre (frappes de juin 2025) n'élargissent pas l'axe
+        fig.update_xaxes(range=[pd.Timestamp(start), pd.Timestamp(end)], row=1, col=1)
+        fig.update_xaxes(range=[pd.Timestamp(start), pd.Timestamp(end)], row=2, col=1)
+
+    return fig
+
+
+# Couleurs de la chronologie par type d'événement
+TIMELINE_COLORS = {'accord': '#239F40', 'crise': '#FFA500', 'escalade': '#DA0000',
+                   'attaque': '#DA0000', 'seuil': '#FFA500', 'nouvelle': '#2196f3', 'rapport': '#2196f3'}
+TIMELINE_DEFAULT_COLOR = '#666666'
+
+# Nombre maximal de marqueurs affichés avant agrégation par période
+TIMELINE_MAX_MARKERS = 200
+# Au-delà de ce nombre de points, la trace passe en WebGL (Scattergl)
+TIMELINE_WEBGL_THRESHOLD = 1000
+# Au-delà de ce nombre de marqueurs, les libellés ne sont plus affichés (survol uniquement)
+TIMELINE_MAX_LABELS = 30
+
+# Périodes d'agrégation, de la plus fine à la plus grossière
+TIMELINE_PERIODS = [("D", "jour"), ("W", "semaine"), ("M", "mois"), ("Q", "trimestre"), ("Y", "année")]
+
+
+def aggregate_timeline(df_timeline, start=None, end=None, max_markers=TIMELINE_MAX_MARKERS):
+    """Restreint la chronologie à la fenêtre [start, end] et l'agrège si nécessaire.
+
+    Renvoie (df, période) : si la fenêtre contient au plus max_markers événements,
+    ils sont renvoyés tels quels (période None). Sinon, les événements sont
+    regroupés par la période la plus fine donnant au plus max_markers marqueurs ;
+    chaque groupe porte le nombre d'événements et le type dominant.
+    """
+    events = window(df_timeline, 'date', start, end)
+
+    if len(events) <= max_markers:
+        return events.assign(count=1), None
+
+    for freq, label in TIMELINE_PERIODS:
+        periods = events['date'].dt.to_period(freq)
+        if periods.nunique() <= max_markers or freq == TIMELINE_PERIODS[-1][0]:
+            break
+
+    grouped = events.groupby(periods.values, sort=True)
+    # Type dominant de chaque période (le plus fréquent)
+    dominant = (events.groupby([periods.values, 'type'], sort=False, observed=True).size()
+                .sort_values(ascending=False, kind='stable')
+                .reset_index(level=1)
+                .groupby(level=0)['type'].first())
+    aggregated = pd.DataFrame({
+        'date': grouped['date'].min(),
+        'count': grouped.size(),
+        'event': grouped['event'].first(),
+    })
+    aggregated['type'] = dominant.reindex(aggregated.index).values
+    aggregated['event'] = (aggregated['count'].astype(str) + " événements (" + label + ") — "
+                           + aggregated['event'])
+    return aggregated.reset_index(drop=True), label
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES, ttl=FIGURE_CACHE_TTL, show_spinner=False)
+def build_timeline_figure(data_version, start, end, _df_timeline, max_markers=TIMELINE_MAX_MARKERS):
+    """Construit la chronologie sous forme d'une trace unique (niveau de détail adaptatif)"""
+    df_plot, period = aggregate_timeline(_df_timeline, start, end, max_markers)
+
+    colors = df_plot['type'].astype(object).map(TIMELINE_COLORS).fillna(TIMELINE_DEFAULT_COLOR)
+    show_labels = len(df_plot) <= TIMELINE_MAX_LABELS
+    if period is None:
+        sizes = 15
+    else:
+        # Taille des marqueurs proportionnelle (log) au nombre d'événements agrégés
+        sizes = (8 + 4 * np.log2(df_plot['count'].to_numpy(dtype=float))).clip(8, 30)
+
+    scatter_cls = go.Scattergl if len(df_plot) > TIMELINE_WEBGL_THRESHOLD else go.Scatter
+    fig_timeline = go.Figure(scatter_cls(
+        x=df_plot['date'], y=np.ones(len(df_plot)),
+        mode='markers+text' if show_labels else 'markers',
+        marker=dict(size=sizes, color=colors),
+        text=df_plot['event'],
+        textposition="top center",
+        hovertemplate="%{x|%Y-%m-%d}<br>%{text}<extra></extra>",
+        showlegend=False
+    ))
+
+    title = "Chronologie des événements"
+    if len(df_plot):
+        title += f" ({df_plot['date'].min():%Y}-{df_plot['date'].max():%Y})"
+    if period is not None:
+        title += f" — agrégée par {period}"
+
+    fig_timeline.update_layout(
+        title=title,
+        xaxis_title="Date",
+        yaxis=dict(showticklabels=False, showgrid=False, range=[0.5, 1.5]),
+        height=300,
+        hovermode='closest',
+        template='plotly_white'
+    )
+    return fig_timeline
+
+
+# Couleurs successives des couches d'observations sur la carte
+MAP_LAYER_COLORS = ["#FF7F0E", "#9467BD", "#17BECF", "#BCBD22", "#E377C2"]
+
+
+def build_map_figure(bounds, borders, per_facility, layer_views):
+    """Carte des sites et des couches d'observations restreinte à la fenêtre bounds.
+
+    Axes cartésiens longitude / latitude (aucun fond de carte distant) : frontières
+    livrées localement, points bruts ou agrégats déjà limités à la fenêtre par l'index.
+    layer_views : liste de (nom, "points" | "clusters", DataFrame).
+    """
+    lat_min, lat_max, lon_min, lon_max = bounds
+    fig = go.Figure(go.Scatter(
+        x=borders[0], y=borders[1], mode="lines",
+        line=dict(color="#adb5bd", width=1), hoverinfo="skip", showlegend=False,
+    ))
+
+    for (name, kind, frame), color in zip(layer_views, MAP_LAYER_COLORS * len(layer_views)):
+        if kind == "points":
+            fig.add_trace(go.Scattergl(
+                x=frame["lon"], y=frame["lat"], mode="markers", name=name,
+                marker=dict(size=4, color=color, opacity=0.6),
+                hovertemplate="%{y:.3f}, %{x:.3f}<extra>" + name + "</extra>",
+            ))
+        else:
+            counts = frame["count"].to_numpy(dtype=float)
+            fig.add_trace(go.Scattergl(
+                x=frame["lon"], y=frame["lat"], mode="markers", name=f"{name} (agrégé)",
+                marker=dict(size=(4 + 3 * np.log2(np.maximum(counts, 1))).clip(4, 28), color=color, opacity=0.5),
+                customdata=counts,
+                hovertemplate="%{customdata:.0f} observations<extra>" + name + "</extra>",
+            ))
+
+    visible = per_facility[per_facility["lat"].between(lat_min, lat_max) & per_facility["lon"].between(lon_min, lon_max)]
+    fig.add_trace(go.Scatter(
+        x=visible["lon"], y=visible["lat"], mode="markers+text", name="Sites",
+        marker=dict(size=14, color="#DA0000", symbol="diamond", line=dict(color="white", width=1)),
+        text=visible.index, textposition="top center",
+        customdata=np.stack([visible["name"].astype(str), visible["iaea_access"].astype(str),
+                             visible["activity"].astype(str)], axis=-1) if len(visible) else None,
+        hovertemplate="<b>%{customdata[0]}</b><br>Accès AIEA : %{customdata[1]}<br>%{customdata[2]}<extra></extra>",
+    ))
+
+    # Échelle égale en km sur les deux axes à la latitude du centre
+    fig.update_layout(
+        xaxis=dict(range=[lon_min, lon_max], title="Longitude", showgrid=False, constrain="domain"),
+        yaxis=dict(range=[lat_min, lat_max], title="Latitude", showgrid=False,
+                   scaleanchor="x", scaleratio=1 / np.cos(np.radians((lat_min + lat_max) / 2))),
+        height=600,
+        dragmode=False,
+        legend=dict(orientation="h", y=-0.12),
+        template="plotly_white",
+        margin=dict(l=40, r=20, t=20, b=40),
+    )
+    return fig
+
+
+# Parties et liens affichés au plus dans la vue réseau (les plus actifs / les plus forts)
+NETWORK_MAX_PARTIES = 60
+NETWORK_MAX_EDGES = 300
+# Classes d'épaisseur des liens : une trace par classe (séparateurs None)
+NETWORK_EDGE_CLASSES = 4
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES, ttl=FIGURE_CACHE_TTL, show_spinner=False)
+def build_network_figure(graph_version, start, end, _graph, max_parties=NETWORK_MAX_PARTIES,
+                         max_edges=NETWORK_MAX_EDGES):
+    """Vue réseau des parties aux négociations sur la fenêtre [start, end].
+
+    Taille des nœuds : réunions ; couleur : centralité de vecteur propre ; épaisseur des
+    liens : réunions communes. Seules les parties les plus actives sont dessinées.
+    graph_version : NegotiationGraph.version, unique dans le processus (reconstructions comprises).
+    """
+    # Import différé : scipy n'est chargé que par la page des négociations
+    from negotiation_graph import eigenvector_centrality, force_layout
+
+    cooccurrence = _graph.cooccurrence(start, end)
+    meetings = np.diag(cooccurrence)
+    shown = np.argsort(-meetings, kind="stable")[:max_parties]
+    shown = shown[meetings[shown] > 0]
+    weights = cooccurrence[np.ix_(shown, shown)]
+    np.fill_diagonal(weights, 0)
+    names = np.array(_graph.party_names(len(cooccurrence)), dtype=object)[shown]
+    positions = force_layout(weights)
+    centrality = eigenvector_centrality(weights)
+
+    fig = go.Figure()
+    a, b = np.nonzero(np.triu(weights, k=1))
+    strength = weights[a, b]
+    keep = np.argsort(-strength, kind="stable")[:max_edges]
+    a, b, strength = a[keep], b[keep], strength[keep]
+    if len(strength):
+        # Classes d'épaisseur en quantiles de la force des liens
+        edges = np.unique(np.quantile(strength, np.linspace(0, 1, NETWORK_EDGE_CLASSES + 1)))
+        classes = np.clip(np.searchsorted(edges, strength, side="right") - 1, 0, max(len(edges) - 2, 0))
+        for level in np.unique(classes):
+            selected = classes == level
+            n = int(selected.sum())
+            xs = np.full(3 * n, None, dtype=object)
+            ys = np.full(3 * n, None, dtype=object)
+            xs[0::3], xs[1::3] = positions[a[selected], 0], positions[b[selected], 0]
+            ys[0::3], ys[1::3] = positions[a[selected], 1], positions[b[selected], 1]
+            fig.add_trace(go.Scatter(
+                x=xs, y=ys, mode="lines", hoverinfo="skip", showlegend=False,
+                line=dict(color="rgba(108, 117, 125, 0.45)", width=1 + 2 * float(level)),
+            ))
+
+    fig.add_trace(go.Scatter(
+        x=positions[:, 0], y=positions[:, 1], mode="markers+text",
+        text=names, textposition="top center", showlegend=False,
+        marker=dict(size=(10 + 4 * np.log2(np.maximum(meetings[shown], 1))).clip(10, 40),
+                    color=centrality, colorscale="Reds", cmin=0, cmax=1,
+                    colorbar=dict(title="Centralité"), line=dict(color="white", width=1)),
+        customdata=np.column_stack((meetings[shown], (weights > 0).sum(axis=1))) if len(shown) else None,
+        hovertemplate="<b>%{text}</b><br>%{customdata[0]} réunion(s)<br>%{customdata[1]} partenaire(s)<extra></extra>",
+    ))
+    fig.update_layout(
+        xaxis=dict(visible=False), yaxis=dict(visible=False, scaleanchor="x"),
+        height=550, hovermode="closest", template="plotly_white",
+        margin=dict(l=20, r=20, t=20, b=20),
+    )
+    return fig
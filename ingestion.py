@@ -0,0 +1,204 @@
+# ingestion.py - Ingestion en arrière-plan des rapports AIEA (HTTP mutualisé + requêtes conditionnelles)
+import io
+import json
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import requests
+import streamlit as st
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import data_store
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Sources séparées par des virgules (flux JSON de rapports complets ou CSV d'une section)
+SOURCES_ENV = "IAEA_SOURCES"
+POLL_INTERVAL_ENV = "IAEA_POLL_INTERVAL"
+DEFAULT_POLL_INTERVAL = 900  # secondes
+REQUEST_TIMEOUT = (5, 30)  # (connexion, lecture) en secondes
+
+# Sections d'un instantané alimentables par un CSV, reconnues à leurs colonnes
+CSV_SECTIONS = {
+    "enrichment_history": {"date", "level", "stock"},
+    "timeline_events": {"date", "event", "type"},
+    "statements": {"date", "source", "statement"},
+    "negotiations": {"date", "location", "parties", "outcome"},
+}
+
+
+def build_session(pool_size=4, retries=3):
+    """Crée une session HTTP avec pool de connexions et relances sur erreurs transitoires"""
+    session = requests.Session()
+    retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=("GET",))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = "Dashboard-Uranium-Iran/ingestion"
+    return session
+
+
+def configured_sources():
+    """Liste des URLs de sources configurées (variable d'environnement ou fichier .env)"""
+    raw = os.environ.get(SOURCES_ENV, "")
+    return [url.strip() for url in raw.split(",") if url.strip()]
+
+
+def parse_payload(url, content, content_type=""):
+    """Analyse une réponse : renvoie ("report", dict) ou (section, liste d'enregistrements)"""
+    is_csv = "csv" in content_type or url.lower().split("?")[0].endswith(".csv")
+    if not is_csv:
+        report = json.loads(content)
+        if "report_date" not in report:
+            raise ValueError(f"{url}: rapport JSON sans 'report_date'")
+        return "report", report
+
+    df = pd.read_csv(io.BytesIO(content), dtype=str, keep_default_na=False)
+    columns = set(df.columns) - {"report_date"}
+    for section, expected in CSV_SECTIONS.items():
+        if columns == expected:
+            break
+    else:
+        raise ValueError(f"{url}: colonnes CSV non reconnues {sorted(df.columns)}")
+
+    if section == "enrichment_history":
+        df["level"] = df["level"].astype(float)
+        df["stock"] = df["stock"].astype(float)
+    elif section == "negotiations":
+        df["parties"] = df["parties"].str.split(";")
+    return section, df.to_dict("records")
+
+
+def merge_section(base_snapshot, section, records, today=None):
+    """Construit un nouvel instantané à partir du dernier en remplaçant une section.
+
+    La date du nouveau rapport est prise dans la colonne report_date si elle
+    existe ; elle ne peut pas précéder le dernier rapport. Sans cette colonne,
+    le rapport est daté du jour (au plus tôt le lendemain du dernier rapport).
+    Renvoie None si la section est identique à celle du dernier rapport.
+    """
+    report_dates = {r.pop("report_date") for r in records if "report_date" in r}
+    if len(report_dates) > 1:
+        raise ValueError(f"Plusieurs report_date dans un même CSV : {sorted(report_dates)}")
+    base_date = base_snapshot["report_date"]
+    if report_dates:
+        report_date = report_dates.pop()
+        if report_date < base_date:
+            raise ValueError(f"report_date {report_date} antérieure au dernier rapport ({base_date})")
+    elif records == base_snapshot.get(section):
+        return None
+    else:
+        # Jamais la date d'un rapport existant ni une date passée (alertes et tableau
+        # de bord ne lisent que le rapport le plus récent)
+        following = date.fromisoformat(base_date[:10]) + timedelta(days=1)
+        report_date = max(today or date.today(), following).isoformat()
+
+    snapshot = {key: value for key, value in base_snapshot.items()
+                if key not in ("frames", "data_version")}
+    snapshot[section] = records
+    snapshot["report_date"] = report_date
+    return snapshot
+
+
+class IngestionWorker(threading.Thread):
+    """Thread d'arrière-plan qui interroge les sources et enregistre les nouveaux instantanés.
+
+    Toutes les E/S réseau et l'analyse ont lieu dans ce thread : les reruns
+    Streamlit ne lisent que la base locale, où chaque instantané est écrit en
+    une transaction (bascule atomique vers les nouvelles données).
+    """
+
+    def __init__(self, sources, db_path=data_store.DEFAULT_DB_PATH, interval=DEFAULT_POLL_INTERVAL, session=None):
+        super().__init__(name="iaea-ingestion", daemon=True)
+        self.sources = list(sources)
+        self.db_path = db_path
+        self.interval = interval
+        self.session = session or build_session(pool_size=max(1, len(self.sources)))
+        # Validateurs HTTP par source (ETag / Last-Modified)
+        self.validators = {url: {} for url in self.sources}
+        self.status = {url: {"last_check": None, "last_change": None, "error": None} for url in self.sources}
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.poll_once()
+            self._stop_event.wait(self.interval)
+
+    def poll_once(self):
+        """Interroge chaque source une fois ; renvoie le nombre d'instantanés ajoutés"""
+        added = 0
+        for url in self.sources:
+            status = self.status[url]
+            status["last_check"] = datetime.now().isoformat(timespec="seconds")
+            try:
+                added += self._poll_source(url)
+                status["error"] = None
+            except Exception as exc:  # une source en erreur ne doit pas arrêter les autres
+                logger.warning("Ingestion %s en échec : %s", url, exc)
+                status["error"] = str(exc)
+        return added
+
+    def _poll_source(self, url):
+        validators = self.validators[url]
+        headers = {}
+        if "etag" in validators:
+            headers["If-None-Match"] = validators["etag"]
+        if "last_modified" in validators:
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        response = self.session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        if response.status_code == 304:
+            return 0
+        response.raise_for_status()
+
+        kind, payload = parse_payload(url, response.content, response.headers.get("Content-Type", ""))
+        if kind == "report":
+            snapshot = payload
+        else:
+            snapshot = merge_section(data_store.load_snapshot(db_path=self.db_path), kind, payload)
+        added = snapshot is not None and data_store.write_snapshot(snapshot, self.db_path)
+
+        # Les validateurs ne sont retenus qu'une fois la réponse enregistrée
+        if response.headers.get("ETag"):
+            validators["etag"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            validators["last_modified"] = response.headers["Last-Modified"]
+        if added:
+            self.status[url]["last_change"] = datetime.now().isoformat(timespec="seconds")
+            logger.info("Nouveau rapport %s ingéré depuis %s", snapshot["report_date"], url)
+        return int(added)
+
+
+@st.cache_resource(show_spinner=False)
+def start_ingestion():
+    """Démarre (une fois par processus) le worker d'ingestion si des sources sont configurées"""
+    sources = configured_sources()
+    if not sources:
+        return None
+    interval = float(os.environ.get(POLL_INTERVAL_ENV, DEFAULT_POLL_INTERVAL))
+    worker = IngestionWorker(sources, interval=interval)
+    worker.start()
+    return worker
+
+
+if __name__ == "__main__":
+    # Ingestion ponctuelle en ligne de commande : python ingestion.py
+    logging.basicConfig(level=logging.INFO)
+    sources = configured_sources()
+    if not sources:
+        raise SystemExit(f"Aucune source configurée ({SOURCES_ENV})")
+    start = time.perf_counter()
+    count = IngestionWorker(sources).poll_once()
+    print(f"{count} nouvel(s) instantané(s) en {time.perf_counter() - start:.2f} s")
@@ -0,0 +1,345 @@
+# inspection_log.py - Agrégation incrémentale du journal brut des inspections AIEA
+#
+# Le journal (data/inspections/*.csv ou *.parquet) contient une ligne par enregistrement :
+#   timestamp, facility, kind, value
+# avec kind = "visit" (inspection réalisée), "access" (niveau d'accès en %, value)
+# ou "stock" (estimation du stock à 60% en kg, value).
+#
+# Les fichiers sont lus par blocs et agrégés par mois dans une base SQLite locale.
+# Un fichier CSV est supposé n'être complété qu'en fin de fichier : seuls les octets
+# ajoutés depuis le dernier passage sont lus, et seuls les mois concernés sont mis à jour.
+# Une ligne n'est prise en compte qu'une fois terminée par un saut de ligne.
+# Un fichier Parquet modifié (ou un CSV tronqué/remplacé) est réagrégé entièrement.
+import argparse
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils import compact_frame
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB_PATH = os.environ.get("IAEA_INSPECTIONS_DB", os.path.join(BASE_DIR, "data", "inspection_log.sqlite"))
+DEFAULT_LOG_DIR = os.environ.get("IAEA_INSPECTIONS_DIR", os.path.join(BASE_DIR, "data", "inspections"))
+
+LOG_COLUMNS = ["timestamp", "facility", "kind", "value"]
+# Taille des blocs lus (CSV, octets) et des lots (Parquet, lignes)
+CSV_BLOCK_BYTES = 16 * 1024 * 1024
+PARQUET_BATCH_ROWS = 500_000
+# Octets de tête servant à reconnaître un CSV remplacé par un autre fichier
+PREFIX_BYTES = 4096
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS log_sources (
+    path TEXT PRIMARY KEY,
+    identity TEXT NOT NULL,
+    header TEXT,
+    processed_bytes INTEGER NOT NULL,
+    processed_rows INTEGER NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS monthly_aggregates (
+    source TEXT NOT NULL,
+    month TEXT NOT NULL,
+    visits INTEGER NOT NULL,
+    access_sum REAL NOT NULL,
+    access_count INTEGER NOT NULL,
+    stock_time TEXT,
+    stock_value REAL,
+    PRIMARY KEY (source, month)
+);
+"""
+
+# Fusion d'un agrégat partiel : sommes additionnées, stock conservé s'il est plus récent
+UPSERT_MONTH = """
+INSERT INTO monthly_aggregates VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(source, month) DO UPDATE SET
+    visits = visits + excluded.visits,
+    access_sum = access_sum + excluded.access_sum,
+    access_count = access_count + excluded.access_count,
+    stock_value = CASE WHEN excluded.stock_time IS NOT NULL
+                            AND (stock_time IS NULL OR excluded.stock_time >= stock_time)
+                       THEN excluded.stock_value ELSE stock_value END,
+    stock_time = CASE WHEN excluded.stock_time IS NOT NULL
+                           AND (stock_time IS NULL OR excluded.stock_time >= stock_time)
+                      THEN excluded.stock_time ELSE stock_time END
+"""
+
+# Mémo par processus de l'état des fichiers du journal (évite de les relire à chaque rerun)
+_log_dir_state = {}
+_sync_lock = threading.Lock()
+
+
+def connect(db_path=DEFAULT_DB_PATH):
+    """Ouvre une connexion SQLite et crée le schéma si nécessaire"""
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def aggregate_chunk(df):
+    """Agrège un bloc du journal par mois : [(mois, visites, somme accès, nb accès, date stock, stock)]"""
+    timestamps = pd.to_datetime(df["timestamp"], errors="coerce", format="ISO8601")
+    valid = timestamps.notna().to_numpy()
+    if not valid.any():
+        return []
+    timestamps = timestamps[valid]
+    kind = df["kind"].to_numpy()[valid]
+    values = pd.to_numeric(df["value"], errors="coerce").to_numpy()[valid]
+    # Clés numériques (mois, instant) : les chaînes ne sont produites que pour les lignes agrégées
+    chunk = pd.DataFrame({
+        "month": timestamps.dt.year.to_numpy() * 12 + timestamps.dt.month.to_numpy() - 1,
+        "time": timestamps.to_numpy().astype("datetime64[s]").astype("int64"),
+        "visit": kind == "visit",
+        "access": np.where(kind == "access", values, np.nan),
+        "stock": np.where(kind == "stock", values, np.nan),
+    })
+
+    by_month = chunk.groupby("month", sort=True)
+    result = pd.DataFrame({
+        "visits": by_month["visit"].sum(),
+        "access_sum": by_month["access"].sum(),
+        "access_count": by_month["access"].count(),
+    })
+    stocks = chunk[chunk["stock"].notna()]
+    latest = stocks.loc[stocks.groupby("month")["time"].idxmax()].set_index("month")
+    result["stock_time"] = latest["time"]
+    result["stock_value"] = latest["stock"]
+    return [
+        (f"{month // 12:04d}-{month % 12 + 1:02d}", int(row.visits), float(row.access_sum), int(row.access_count),
+         None if pd.isna(row.stock_time) else pd.Timestamp(int(row.stock_time), unit="s").isoformat(),
+         None if pd.isna(row.stock_value) else float(row.stock_value))
+        for month, row in result.iterrows()
+    ]
+
+
+def _merge(conn, source, rows):
+    conn.executemany(UPSERT_MONTH, [(source, *row) for row in rows])
+
+
+def _record_source(conn, path, identity, header, processed_bytes, processed_rows):
+    conn.execute(
+        "INSERT OR REPLACE INTO log_sources VALUES (?, ?, ?, ?, ?, ?)",
+        (path, identity, header, processed_bytes, processed_rows, datetime.now().isoformat(timespec="seconds"))
+    )
+
+
+def _reset_source(conn, path):
+    conn.execute("DELETE FROM monthly_aggregates WHERE source = ?", (path,))
+    conn.execute("DELETE FROM log_sources WHERE path = ?", (path,))
+
+
+def _prefix_hash(path, length):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read(length)).hexdigest()
+
+
+def _ingest_csv(conn, path, source, known):
+    """Lit les octets ajoutés depuis le dernier passage ; renvoie le nombre de lignes agrégées"""
+    size = os.path.getsize(path)
+    if known is not None:
+        _, identity, header, processed, rows_done, _ = known
+        prefix_length = min(processed, PREFIX_BYTES)
+        if size < processed or identity != _prefix_hash(path, prefix_length):
+            # Fichier tronqué ou remplacé : ses agrégats sont recalculés depuis le début
+            with conn:
+                _reset_source(conn, source)
+            known = None
+    if known is None:
+        header, processed, rows_done = None, 0, 0
+    if processed >= size:
+        return 0
+
+    added = 0
+    with open(path, "rb") as f:
+        f.seek(processed)
+        pending = b""
+        while True:
+            block = f.read(CSV_BLOCK_BYTES)
+            data = pending + block
+            # Seules les lignes complètes sont traitées ; la dernière, peut-être en cours d'écriture, attend
+            cut = data.rfind(b"\n") + 1
+            if not block:
+                break
+            if cut == 0:
+                pending = data
+                continue
+            complete, pending = data[:cut], data[cut:]
+            if header is None:
+                first_line, _, complete = complete.partition(b"\n")
+                header = first_line.decode("utf-8").strip()
+            if complete.strip():
+                frame = pd.read_csv(io.BytesIO(complete), header=None, names=header.split(","),
+                                    usecols=LOG_COLUMNS, dtype={"facility": str, "kind": str})
+            else:
+                frame = pd.DataFrame(columns=LOG_COLUMNS)
+            processed += cut
+            rows_done += len(frame)
+            added += len(frame)
+            with conn:
+                _merge(conn, source, aggregate_chunk(frame))
+                _record_source(conn, source, _prefix_hash(path, min(processed, PREFIX_BYTES)), header,
+                               processed, rows_done)
+    return added
+
+
+def _ingest_parquet(conn, path, source, known):
+    """Réagrège un fichier Parquet nouveau ou modifié, par lots ; renvoie le nombre de lignes agrégées"""
+    import pyarrow.parquet as pq
+
+    stat = os.stat(path)
+    identity = f"{stat.st_mtime_ns}:{stat.st_size}"
+    if known is not None and known[1] == identity:
+        return 0
+
+    added = 0
+    with conn:
+        _reset_source(conn, source)
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=PARQUET_BATCH_ROWS, columns=LOG_COLUMNS):
+            frame = batch.to_pandas()
+            added += len(frame)
+            _merge(conn, source, aggregate_chunk(frame))
+        _record_source(conn, source, identity, None, stat.st_size, added)
+    return added
+
+
+def source_name(path, log_dir=DEFAULT_LOG_DIR):
+    """Clé d'un fichier dans la base : chemin relatif au répertoire du journal (indépendant du clone)"""
+    return os.path.relpath(os.path.abspath(path), os.path.abspath(log_dir)).replace(os.sep, "/")
+
+
+def ingest_file(path, db_path=DEFAULT_DB_PATH, log_dir=DEFAULT_LOG_DIR):
+    """Agrège les nouvelles lignes d'un fichier du journal ; renvoie le nombre de lignes lues"""
+    source = source_name(path, log_dir)
+    conn = connect(db_path)
+    try:
+        known = conn.execute("SELECT * FROM log_sources WHERE path = ?", (source,)).fetchone()
+        if path.endswith(".parquet"):
+            return _ingest_parquet(conn, path, source, known)
+        return _ingest_csv(conn, path, source, known)
+    finally:
+        conn.close()
+
+
+def _log_files(log_dir):
+    return sorted((entry for entry in os.scandir(log_dir)
+                   if entry.is_file() and entry.name.endswith((".csv", ".parquet"))), key=lambda e: e.name)
+
+
+def sync_log_dir(db_path=DEFAULT_DB_PATH, log_dir=DEFAULT_LOG_DIR):
+    """Agrège les fichiers du journal nouveaux ou complétés.
+
+    Rien n'est relu si aucun fichier n'a changé (taille, date de modification)
+    depuis le dernier passage dans ce processus. Les agrégats des fichiers
+    supprimés ou renommés sont retirés.
+    """
+    if not os.path.isdir(log_dir):
+        return 0
+    state_key = (os.path.abspath(db_path), os.path.abspath(log_dir))
+    signature = tuple((e.name, e.stat().st_size, e.stat().st_mtime_ns) for e in _log_files(log_dir))
+    if _log_dir_state.get(state_key) == signature:
+        return 0
+
+    with _sync_lock:
+        entries = _log_files(log_dir)
+        present = {source_name(entry.path, log_dir) for entry in entries}
+        conn = connect(db_path)
+        try:
+            stale = [row[0] for row in conn.execute("SELECT path FROM log_sources")
+                     if row[0] not in present]
+            stale += [row[0] for row in conn.execute("SELECT DISTINCT source FROM monthly_aggregates")
+                      if row[0] not in present and row[0] not in stale]
+            with conn:
+                for source in stale:
+                    _reset_source(conn, source)
+        finally:
+            conn.close()
+        added = sum(ingest_file(entry.path, db_path, log_dir) for entry in entries)
+        _log_dir_state[state_key] = signature
+        return added
+
+
+def store_signature(db_path=DEFAULT_DB_PATH):
+    """Signature (mtime, taille) de la base : change à chaque agrégation"""
+    try:
+        stat = os.stat(db_path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _monthly_history(db_path, signature):
+    """Historique mensuel reconstruit depuis les agrégats, mis en cache par signature de la base"""
+    conn = connect(db_path)
+    try:
+        rows = pd.read_sql_query("SELECT * FROM monthly_aggregates", conn)
+    finally:
+        conn.close()
+    columns = ["date", "inspections_conducted", "access_level", "stock_60pct"]
+    if rows.empty:
+        return pd.DataFrame(columns=columns)
+
+    by_month = rows.groupby("month")
+    totals = by_month[["visits", "access_sum", "access_count"]].sum()
+    stocks = rows[rows["stock_time"].notna()]
+    latest_stock = stocks.loc[stocks.groupby("month")["stock_time"].idxmax()].set_index("month")["stock_value"]
+
+    months = pd.period_range(totals.index.min(), totals.index.max(), freq="M")
+    totals.index = pd.PeriodIndex(totals.index, freq="M")
+    latest_stock.index = pd.PeriodIndex(latest_stock.index, freq="M")
+    totals = totals.reindex(months)
+    # Mois sans mesure : le dernier niveau d'accès et le dernier stock connus sont reportés
+    access = (totals["access_sum"] / totals["access_count"].where(totals["access_count"] > 0)).ffill()
+    return compact_frame(pd.DataFrame({
+        # Date de fin de mois, comme l'ancien historique saisi à la main
+        "date": months.to_timestamp(how="end").normalize(),
+        "inspections_conducted": totals["visits"].fillna(0).astype(int).to_numpy(),
+        "access_level": access.to_numpy(),
+        "stock_60pct": latest_stock.reindex(months).ffill().to_numpy(),
+    }))
+
+
+def load_inspection_history(db_path=DEFAULT_DB_PATH, log_dir=DEFAULT_LOG_DIR):
+    """Historique mensuel des inspections (date, inspections_conducted, access_level, stock_60pct).
+
+    L'objet renvoyé est partagé entre les sessions : lecture seule.
+    """
+    sync_log_dir(db_path, log_dir)
+    return _monthly_history(db_path, store_signature(db_path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agrégation du journal des inspections AIEA")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="chemin de la base SQLite des agrégats")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub_ingest = sub.add_parser("ingest", help="agréger les nouvelles lignes (répertoire du journal par défaut)")
+    sub_ingest.add_argument("paths", nargs="*")
+    sub.add_parser("sources", help="lister les fichiers agrégés")
+    sub.add_parser("show", help="afficher l'historique mensuel")
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        paths = args.paths or [entry.path for entry in _log_files(DEFAULT_LOG_DIR)]
+        for path in paths:
+            print(f"{path}: {ingest_file(path, args.db)} ligne(s) agrégée(s)")
+    elif args.command == "sources":
+        conn = connect(args.db)
+        try:
+            for path, _, _, processed, rows, updated_at in conn.execute("SELECT * FROM log_sources ORDER BY path"):
+                print(f"{path}  {rows} lignes, {processed} octets  (mis à jour le {updated_at})")
+        finally:
+            conn.close()
+    else:
+        print(_monthly_history(args.db, store_signature(args.db)).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+# ledger.py - Comptabilité des matières nucléaires par site et par niveau d'enrichissement
+#
+# Les rapports ne donnent que des totaux nationaux ; le registre attribue les mouvements
+# aux sites. Chaque écriture (table ledger_entries, en ajout seul) est éclatée en
+# mouvements signés (table postings) par (site, niveau d'enrichissement) :
+# - production : +quantité au site ;
+# - transfer   : -quantité au site d'origine, +quantité au site de destination ;
+# - dilution   : -quantité au niveau d'origine, +quantité produite au niveau cible ;
+# - loss       : -quantité (pertes dues aux frappes) ;
+# - adjustment : correction signée (ouverture, écart d'inventaire).
+# Les soldes de fin de mois (table checkpoints) sont recalculés par sommes cumulées à
+# partir du premier mois touché par un ajout. Un solde à une date = point de contrôle du
+# mois précédent + mouvements du mois en cours, sans rejouer tout le registre.
+import argparse
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import data_store
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB_PATH = os.environ.get("IAEA_LEDGER_DB", os.path.join(BASE_DIR, "data", "material_ledger.sqlite"))
+
+ENTRY_KINDS = ["production", "transfer", "dilution", "loss", "adjustment"]
+ENTRY_COLUMNS = ["date", "kind", "facility", "level", "quantity_kg", "to_facility", "to_level", "to_quantity_kg",
+                 "source", "note"]
+# Site des quantités que les rapports ne ventilent pas
+UNALLOCATED = "Non ventilé"
+# Teneur du diluant (uranium naturel, % U-235)
+NATURAL_ASSAY = 0.711
+# Niveau conventionnel du stock enrichi hors 60% quand sa ventilation est inconnue
+LOW_LEVEL_DEFAULT = 5.0
+# Écart toléré entre registre et totaux déclarés (kg)
+RECONCILIATION_TOLERANCE_KG = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ledger_entries (
+    entry_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    facility TEXT NOT NULL,
+    level REAL NOT NULL,
+    quantity_kg REAL NOT NULL,
+    to_facility TEXT,
+    to_level REAL,
+    to_quantity_kg REAL,
+    source TEXT,
+    note TEXT,
+    recorded_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    entry_id INTEGER NOT NULL REFERENCES ledger_entries(entry_id),
+    date TEXT NOT NULL,
+    facility TEXT NOT NULL,
+    level REAL NOT NULL,
+    delta REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    month TEXT NOT NULL,
+    facility TEXT NOT NULL,
+    level REAL NOT NULL,
+    balance REAL NOT NULL,
+    PRIMARY KEY (month, facility, level)
+);
+CREATE INDEX IF NOT EXISTS idx_postings_date ON postings(date);
+CREATE TRIGGER IF NOT EXISTS ledger_entries_no_update BEFORE UPDATE ON ledger_entries
+BEGIN SELECT RAISE(ABORT, 'registre en ajout seul : passer une écriture de correction'); END;
+CREATE TRIGGER IF NOT EXISTS ledger_entries_no_delete BEFORE DELETE ON ledger_entries
+BEGIN SELECT RAISE(ABORT, 'registre en ajout seul : passer une écriture de correction'); END;
+"""
+
+_write_lock = threading.Lock()
+
+
+def connect(db_path=DEFAULT_DB_PATH):
+    """Ouvre une connexion SQLite et crée le schéma si nécessaire"""
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def diluted_quantity(quantity_kg, level, to_level):
+    """Masse produite en diluant quantity_kg de level à to_level avec de l'uranium naturel"""
+    return quantity_kg * (level - NATURAL_ASSAY) / (to_level - NATURAL_ASSAY)
+
+
+def postings_for(entry):
+    """Mouvements signés [(site, niveau, delta)] d'une écriture (dict de ENTRY_COLUMNS)"""
+    kind, facility, level, quantity = entry["kind"], entry["facility"], entry["level"], entry["quantity_kg"]
+    if kind not in ENTRY_KINDS:
+        raise ValueError(f"Type d'écriture inconnu : {kind}")
+    if kind == "adjustment":
+        return [(facility, level, quantity)]
+    if quantity < 0:
+        raise ValueError(f"Quantité négative pour une écriture {kind} : {quantity}")
+    if kind == "production":
+        return [(facility, level, quantity)]
+    if kind == "loss":
+        return [(facility, level, -quantity)]
+    if kind == "transfer":
+        if not entry.get("to_facility"):
+            raise ValueError("Transfert sans site de destination")
+        return [(facility, level, -quantity), (entry["to_facility"], level, quantity)]
+    to_level = entry.get("to_level")
+    if not to_level or not NATURAL_ASSAY < to_level < level:
+        raise ValueError(f"Niveau cible de dilution invalide : {to_level}")
+    produced = entry.get("to_quantity_kg") or diluted_quantity(quantity, level, to_level)
+    return [(facility, level, -quantity), (entry.get("to_facility") or facility, to_level, produced)]
+
+
+def _rebuild_checkpoints(conn, from_month):
+    """Recalcule les soldes de fin de mois à partir de from_month ('AAAA-MM')"""
+    opening = pd.read_sql_query(
+        "SELECT facility, level, balance FROM checkpoints "
+        "WHERE month = (SELECT MAX(month) FROM checkpoints WHERE month < ?)", conn, params=(from_month,))
+    postings = pd.read_sql_query(
+        "SELECT substr(date, 1, 7) AS month, facility, level, delta FROM postings WHERE substr(date, 1, 7) >= ?",
+        conn, params=(from_month,))
+    conn.execute("DELETE FROM checkpoints WHERE month >= ?", (from_month,))
+    if postings.empty:
+        return 0
+
+    # Matrice mois x (site, niveau) des mouvements nets, puis sommes cumulées depuis l'ouverture
+    monthly = postings.pivot_table(index="month", columns=["facility", "level"], values="delta",
+                                   aggfunc="sum", fill_value=0.0)
+    months = pd.period_range(from_month, monthly.index.max(), freq="M").astype(str)
+    opening = opening.set_index(["facility", "level"])["balance"]
+    columns = monthly.columns.union(opening.index)
+    balances = (monthly.reindex(index=months, columns=columns, fill_value=0.0).cumsum()
+                + opening.reindex(columns, fill_value=0.0).to_numpy())
+
+    values = balances.to_numpy(dtype=float)
+    month_idx, column_idx = np.indices(values.shape)
+    facilities = columns.get_level_values(0).to_numpy()
+    levels = columns.get_level_values(1).to_numpy()
+    conn.executemany("INSERT INTO checkpoints VALUES (?, ?, ?, ?)", zip(
+        np.asarray(months)[month_idx.ravel()].tolist(), facilities[column_idx.ravel()].tolist(),
+        levels[column_idx.ravel()].astype(float).tolist(), np.round(values.ravel(), 6).tolist()))
+    return len(months)
+
+
+def add_entries(entries, db_path=DEFAULT_DB_PATH):
+    """Ajoute des écritures (dicts de ENTRY_COLUMNS) ; renvoie le nombre d'écritures ajoutées.
+
+    Les points de contrôle sont recalculés à partir du mois de l'écriture la plus ancienne.
+    """
+    rows = []
+    for entry in entries:
+        entry = {column: entry.get(column) for column in ENTRY_COLUMNS}
+        entry["date"] = pd.Timestamp(entry["date"]).date().isoformat()
+        entry["level"] = float(entry["level"])
+        entry["quantity_kg"] = float(entry["quantity_kg"])
+        for column in ("to_level", "to_quantity_kg"):
+            entry[column] = None if entry[column] in (None, "") or pd.isna(entry[column]) else float(entry[column])
+        for column in ("to_facility", "source", "note"):
+            entry[column] = None if entry[column] in (None, "") or pd.isna(entry[column]) else str(entry[column])
+        rows.append((entry, postings_for(entry)))
+    if not rows:
+        return 0
+
+    recorded_at = datetime.now().isoformat(timespec="seconds")
+    with _write_lock:
+        conn = connect(db_path)
+        try:
+            with conn:
+                for entry, postings in rows:
+                    cursor = conn.execute(
+                        f"INSERT INTO ledger_entries ({', '.join(ENTRY_COLUMNS)}, recorded_at) "
+                        f"VALUES ({', '.join('?' * (len(ENTRY_COLUMNS) + 1))})",
+                        [entry[column] for column in ENTRY_COLUMNS] + [recorded_at])
+                    conn.executemany("INSERT INTO postings VALUES (?, ?, ?, ?, ?)",
+                                     [(cursor.lastrowid, entry["date"], *posting) for posting in postings])
+                _rebuild_checkpoints(conn, min(entry["date"][:7] for entry, _ in rows))
+        finally:
+            conn.close()
+    return len(rows)
+
+
+def import_entries(path, db_path=DEFAULT_DB_PATH):
+    """Importe un fichier CSV d'écritures (colonnes de ENTRY_COLUMNS, to_* et source/note facultatives)"""
+    frame = pd.read_csv(path, dtype={"facility": str, "to_facility": str, "kind": str})
+    return add_entries(frame.to_dict("records"), db_path)
+
+
+def store_signature(db_path=DEFAULT_DB_PATH):
+    """Signature (mtime, taille) de la base : change à chaque écriture"""
+    try:
+        stat = os.stat(db_path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def balance_as_of(as_of, db_path=DEFAULT_DB_PATH):
+    """Soldes (site, niveau, solde en kg) à la date as_of incluse, depuis le dernier point de contrôle"""
+    as_of = pd.Timestamp(as_of).date().isoformat()
+    conn = connect(db_path)
+    try:
+        checkpoint = conn.execute("SELECT MAX(month) FROM checkpoints WHERE month < ?", (as_of[:7],)).fetchone()[0]
+        # Mouvements postérieurs au point de contrôle : plage de dates, servie par l'index
+        start = "" if checkpoint is None else (pd.Period(checkpoint, freq="M") + 1).start_time.date().isoformat()
+        frame = pd.read_sql_query(
+            "SELECT facility, level, SUM(balance) AS balance FROM ("
+            "  SELECT facility, level, balance FROM checkpoints WHERE month = ?"
+            "  UNION ALL"
+            "  SELECT facility, level, delta FROM postings WHERE date >= ? AND date <= ?"
+            ") GROUP BY facility, level ORDER BY facility, level",
+            conn, params=(checkpoint, start, as_of))
+    finally:
+        conn.close()
+    frame["balance"] = frame["balance"].astype(float).round(6)
+    return frame[frame["balance"] != 0].reset_index(drop=True)
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _balances(db_path, signature, as_of):
+    return balance_as_of(as_of, db_path)
+
+
+def load_balances(as_of, db_path=DEFAULT_DB_PATH):
+    """Soldes à une date, mis en cache par signature du registre (partagés entre sessions : lecture seule)"""
+    return _balances(db_path, store_signature(db_path), pd.Timestamp(as_of).date().isoformat())
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _national_series(db_path, signature):
+    """Soldes nationaux cumulés après chaque date de mouvement : (dates, stock à 60%, stock enrichi total)"""
+    conn = connect(db_path)
+    try:
+        postings = pd.read_sql_query(
+            "SELECT date, SUM(CASE WHEN level >= 60 THEN delta ELSE 0 END) AS delta_60, "
+            f"SUM(CASE WHEN level > {NATURAL_ASSAY} THEN delta ELSE 0 END) AS delta_total "
+            "FROM postings GROUP BY date ORDER BY date", conn)
+    finally:
+        conn.close()
+    return (pd.to_datetime(postings["date"]).to_numpy(), np.cumsum(postings["delta_60"].to_numpy()),
+            np.cumsum(postings["delta_total"].to_numpy()))
+
+
+def reconcile(db_path=DEFAULT_DB_PATH, reports_db_path=data_store.DEFAULT_DB_PATH):
+    """Rapproche le registre des totaux déclarés (rapports et historique d'enrichissement).
+
+    DataFrame date, source, reported_60, ledger_60, gap_60, reported_total, ledger_total,
+    gap_total, reconciled. L'historique n'est rapproché qu'à partir de la première écriture.
+    """
+    dates, cumulative_60, cumulative_total = _national_series(db_path, store_signature(db_path))
+    columns = ["date", "source", "reported_60", "ledger_60", "gap_60", "reported_total", "ledger_total",
+               "gap_total", "reconciled"]
+    if not len(dates):
+        return pd.DataFrame(columns=columns)
+
+    points = []
+    for report_date in data_store.list_snapshots(reports_db_path):
+        snapshot = data_store.load_snapshot(report_date, reports_db_path)
+        points.append((report_date, f"Rapport {report_date}", snapshot["uranium_60_percent"],
+                       snapshot["uranium_total"]))
+    latest = data_store.load_snapshot(db_path=reports_db_path)
+    points.extend((row["date"], "Historique d'enrichissement", np.nan, row["stock"])
+                  for row in latest["enrichment_history"])
+    frame = pd.DataFrame(points, columns=["date", "source", "reported_60", "reported_total"])
+    frame["date"] = pd.to_datetime(frame["date"])
+    frame = frame[frame["date"] >= dates[0]].sort_values(["date", "source"], kind="stable").reset_index(drop=True)
+
+    # Solde à chaque date : dernier cumul dont la date est <= date (recherche dichotomique vectorisée)
+    positions = np.searchsorted(dates, frame["date"].to_numpy(), side="right") - 1
+    frame["ledger_60"] = cumulative_60[positions].round(3)
+    frame["ledger_total"] = cumulative_total[positions].round(3)
+    frame["gap_60"] = (frame["ledger_60"] - frame["reported_60"]).round(3)
+    frame["gap_total"] = (frame["ledger_total"] - frame["reported_total"]).round(3)
+    frame["reconciled"] = ((frame["gap_60"].abs().fillna(0) <= RECONCILIATION_TOLERANCE_KG)
+                           & (frame["gap_total"].abs().fillna(0) <= RECONCILIATION_TOLERANCE_KG))
+    return frame[columns]
+
+
+def bootstrap_entries(snapshot, db_path=DEFAULT_DB_PATH):
+    """Écritures d'ajustement amenant le registre national aux totaux d'un rapport (site UNALLOCATED).
+
+    Le stock hors 60% est placé au niveau LOW_LEVEL_DEFAULT, sa ventilation n'étant pas publiée.
+    """
+    balances = balance_as_of(snapshot["report_date"], db_path)
+    held_60 = balances.loc[balances["level"] >= 60, "balance"].sum()
+    held_total = balances.loc[balances["level"] > NATURAL_ASSAY, "balance"].sum()
+    gap_60 = snapshot["uranium_60_percent"] - held_60
+    gap_low = (snapshot["uranium_total"] - snapshot["uranium_60_percent"]) - (held_total - held_60)
+    source = f"Rapport AIEA {snapshot['report_date']}"
+    return [
+        {"date": snapshot["report_date"], "kind": "adjustment", "facility": UNALLOCATED, "level": level,
+         "quantity_kg": round(gap, 3), "source": source, "note": "Ouverture sur le total déclaré"}
+        for level, gap in ((60.0, gap_60), (LOW_LEVEL_DEFAULT, gap_low)) if abs(gap) > 1e-9
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comptabilité des matières nucléaires par site")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="chemin de la base SQLite du registre")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub_add = sub.add_parser("add", help="ajouter une écriture")
+    sub_add.add_argument("kind", choices=ENTRY_KINDS)
+    sub_add.add_argument("facility")
+    sub_add.add_argument("level", type=float, help="niveau d'enrichissement (%%)")
+    sub_add.add_argument("quantity_kg", type=float)
+    sub_add.add_argument("--date", default=date.today().isoformat())
+    sub_add.add_argument("--to", dest="to_facility", help="site de destination (transfert)")
+    sub_add.add_argument("--to-level", type=float, help="niveau cible (dilution)")
+    sub_add.add_argument("--to-quantity", dest="to_quantity_kg", type=float,
+                         help="masse produite (dilution ; calculée par défaut)")
+    sub_add.add_argument("--source")
+    sub_add.add_argument("--note")
+    sub_import = sub.add_parser("import", help="importer des écritures depuis un CSV")
+    sub_import.add_argument("paths", nargs="+")
+    sub.add_parser("bootstrap", help="ajuster le registre aux totaux du dernier rapport")
+    sub_balance = sub.add_parser("balance", help="soldes par site et niveau à une date")
+    sub_balance.add_argument("--date", default=date.today().isoformat())
+    sub.add_parser("reconcile", help="rapprocher le registre des totaux déclarés")
+    args = parser.parse_args()
+
+    if args.command == "add":
+        entry = {column: getattr(args, column, None) for column in ENTRY_COLUMNS}
+        add_entries([entry], args.db)
+        print(f"Écriture {args.kind} ajoutée ({args.facility}, {args.level:g}%, {args.quantity_kg:g} kg)")
+    elif args.command == "import":
+        for path in args.paths:
+            print(f"{path}: {import_entries(path, args.db)} écriture(s)")
+    elif args.command == "bootstrap":
+        entries = bootstrap_entries(data_store.load_snapshot(), args.db)
+        add_entries(entries, args.db)
+        print(f"{len(entries)} écriture(s) d'ajustement")
+    elif args.command == "balance":
+        print(balance_as_of(args.date, args.db).to_string(index=False))
+    else:
+        print(reconcile(args.db).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+# load_test.py - Test de charge : N sessions simultanées sur un serveur Streamlit local
+#
+#   python load_test.py --sessions 50 --duration 60            # écrit load_output.json
+#   python load_test.py --sessions 200 --ramp 30 --think 2
+#   python load_test.py --url http://localhost:8501 --pid 1234  # serveur déjà lancé
+#
+# Chaque session virtuelle parle le protocole du navigateur (websocket /_stcore/stream,
+# messages protobuf BackMsg/ForwardMsg) : changement de page du menu, choix du site
+# (fragment), case « seuil militaire » (fragment). La latence d'un rerun est mesurée de
+# l'envoi de la demande à la réception du message script_finished.
+#
+# Hors ligne : le serveur est lancé sans source d'ingestion (IAEA_SOURCES vide) et sur des
+# bases SQLite temporaires ; polices et drapeau sont servis localement (assets/).
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(BASE_DIR, "Dashboard.py")
+
+# Clés des widgets manipulés (app_pages/main_dashboard.py)
+FACILITY_KEY = "_selected_facility"
+WEAPONS_GRADE_KEY = "_show_weapons_grade"
+
+# Poids des actions tirées à chaque pas d'une session
+ACTION_WEIGHTS = {"page": 1, "facility": 2, "weapons_grade": 2}
+
+SAMPLE_INTERVAL = 0.5
+STARTUP_TIMEOUT = 60
+RERUN_TIMEOUT = 120
+PROFILING_ENV = "DASHBOARD_PROFILING"
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def percentiles(values):
+    """p50/p95/p99 (rang le plus proche) d'une série de mesures"""
+    if not values:
+        return {"n": 0}
+    ordered = sorted(values)
+
+    def rank(q):
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    return {"n": len(ordered), "p50": rank(0.50), "p95": rank(0.95), "p99": rank(0.99), "max": ordered[-1]}
+
+
+# ---------------------------------------------------------------------------
+# Serveur
+# ---------------------------------------------------------------------------
+
+def offline_env(work_dir):
+    """Environnement du serveur : aucune source distante, bases dans un répertoire temporaire"""
+    env = dict(os.environ)
+    env.update({
+        "IAEA_SOURCES": "",
+        "IAEA_DB_PATH": os.path.join(work_dir, "iaea_reports.sqlite"),
+        "IAEA_INSPECTIONS_DB": os.path.join(work_dir, "inspection_log.sqlite"),
+        "IAEA_SEARCH_DB": os.path.join(work_dir, "search_index.sqlite"),
+        "IAEA_ALERTS_DB": os.path.join(work_dir, "alerts.sqlite"),
+        "IAEA_ALERTS_LOG": os.path.join(work_dir, "alerts.jsonl"),
+        "IAEA_ALERTS_WEBHOOK": "",
+        "IAEA_OBSERVATIONS_DIR": os.path.join(work_dir, "observations"),
+        "IAEA_LEDGER_DB": os.path.join(work_dir, "material_ledger.sqlite"),
+        "STREAMLIT_BROWSER_GATHER_USAGE_STATS": "false",
+        "STREAMLIT_SERVER_HEADLESS": "true",
+        "STREAMLIT_SERVER_FILE_WATCHER_TYPE": "none",
+    })
+    env.pop(PROFILING_ENV, None)
+    return env
+
+
+def wait_healthy(base_url, process=None, timeout=STARTUP_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"le serveur s'est arrêté (code {process.returncode})")
+        try:
+            with urllib.request.urlopen(f"{base_url}/_stcore/health", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.3)
+    raise RuntimeError(f"serveur injoignable après {timeout} s : {base_url}")
+
+
+def start_server(port, work_dir):
+    """Lance `streamlit run Dashboard.py` sur le port donné ; renvoie le processus"""
+    log = open(os.path.join(work_dir, "server.log"), "w", encoding="utf-8")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP_PATH, "--server.port", str(port),
+         "--server.address", "127.0.0.1"],
+        cwd=BASE_DIR, env=offline_env(work_dir), stdout=log, stderr=subprocess.STDOUT,
+    )
+    try:
+        wait_healthy(f"http://127.0.0.1:{port}", process)
+    except Exception:
+        process.terminate()
+        raise
+    return process
+
+
+class ProcessSampler(threading.Thread):
+    """Échantillonne CPU (%) et RSS d'un processus via /proc (Linux)"""
+
+    def __init__(self, pid, interval=SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._stopped = threading.Event()
+        self._ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    def _cpu_seconds(self):
+        with open(f"/proc/{self.pid}/stat") as f:
+            # Le nom du processus (2e champ) peut contenir des espaces : on repart de la parenthèse fermante
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / self._ticks
+
+    def _rss_bytes(self):
+        with open(f"/proc/{self.pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+        return None
+
+    def run(self):
+        start = time.monotonic()
+        try:
+            previous = (start, self._cpu_seconds())
+        except OSError:
+            return
+        while not self._stopped.wait(self.interval):
+            try:
+                now, cpu = time.monotonic(), self._cpu_seconds()
+                rss = self._rss_bytes()
+            except OSError:
+                return
+            cpu_percent = 100 * (cpu - previous[1]) / (now - previous[0])
+            previous = (now, cpu)
+            self.samples.append({"t": round(now - start, 2), "cpu_percent": round(cpu_percent, 1), "rss": rss})
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+# ---------------------------------------------------------------------------
+# Sessions virtuelles
+# ---------------------------------------------------------------------------
+
+class VirtualSession:
+    """Un onglet de navigateur : état des widgets, page courante, reruns chronométrés"""
+
+    def __init__(self, ws_url):
+        self.ws_url = ws_url
+        self.ws = None
+        self.pages = {}          # page_script_hash -> nom
+        self.page_hash = ""
+        self.widgets = {}        # clé utilisateur -> (proto du widget, fragment_id)
+        self.widget_states = {}  # id -> WidgetState
+        self.exceptions = 0
+
+    async def connect(self):
+        import websockets
+
+        self.ws = await websockets.connect(self.ws_url, subprotocols=["streamlit"], max_size=None)
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def rerun(self, page_hash=None, fragment_id=""):
+        """Envoie une demande de rerun et attend script_finished ; renvoie (secondes, octets reçus)"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        message = BackMsg()
+        client_state = message.rerun_script
+        client_state.page_script_hash = self.page_hash if page_hash is None else page_hash
+        client_state.fragment_id = fragment_id
+        client_state.widget_states.widgets.extend(self.widget_states.values())
+        if not fragment_id:
+            self.widgets = {}
+
+        start = time.perf_counter()
+        received = 0
+        await self.ws.send(message.SerializeToString())
+        while True:
+            raw = await asyncio.wait_for(self.ws.recv(), RERUN_TIMEOUT)
+            received += len(raw)
+            forward = ForwardMsg()
+            forward.ParseFromString(raw)
+            kind = forward.WhichOneof("type")
+            if kind == "new_session":
+                self.page_hash = forward.new_session.page_script_hash
+            elif kind == "navigation":
+                self.pages = {p.page_script_hash: p.page_name or p.url_pathname
+                              for p in forward.navigation.app_pages}
+                self.page_hash = forward.navigation.page_script_hash or self.page_hash
+            elif kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                self._record_element(forward.delta.new_element, forward.delta.fragment_id)
+            elif kind == "script_finished":
+                if forward.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return time.perf_counter() - start, received
+
+    def _record_element(self, element, fragment_id):
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            self.exceptions += 1
+        elif kind in ("selectbox", "checkbox"):
+            widget = getattr(element, kind)
+            key = widget.id.rsplit("-", 1)[-1]
+            self.widgets[key] = (widget, fragment_id)
+
+    def _set_state(self, widget, **value):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        state = WidgetState(id=widget.id, **value)
+        self.widget_states[widget.id] = state
+
+    def available_actions(self):
+        actions = ["page"] if len(self.pages) > 1 else []
+        if FACILITY_KEY in self.widgets:
+            actions.append("facility")
+        if WEAPONS_GRADE_KEY in self.widgets:
+            actions.append("weapons_grade")
+        return actions
+
+    async def act(self, action, rng):
+        """Exécute une action utilisateur ; renvoie (secondes, octets reçus)"""
+        if action == "page":
+            target = rng.choice([h for h in self.pages if h != self.page_hash])
+            return await self.rerun(page_hash=target)
+        if action == "facility":
+            selectbox, fragment_id = self.widgets[FACILITY_KEY]
+            current = self.widget_states.get(selectbox.id)
+            current = current.string_value if current is not None else selectbox.options[selectbox.default]
+            self._set_state(selectbox, string_value=rng.choice([o for o in selectbox.options if o != current]))
+            return await self.rerun(fragment_id=fragment_id)
+        if action == "weapons_grade":
+            checkbox, fragment_id = self.widgets[WEAPONS_GRADE_KEY]
+            current = self.widget_states.get(checkbox.id)
+            current = current.bool_value if current is not None else checkbox.default
+            self._set_state(checkbox, bool_value=not current)
+            return await self.rerun(fragment_id=fragment_id)
+        raise ValueError(action)
+
+
+async def run_session(index, ws_url, args, deadline, results):
+    """Une session : connexion, premier rendu, puis actions espacées d'un temps de réflexion"""
+    rng = random.Random(args.seed + index)
+    await asyncio.sleep(args.ramp * index / max(1, args.sessions))
+    session = VirtualSession(ws_url)
+    try:
+        await session.connect()
+        elapsed, size = await session.rerun()
+        results.append({"action": "load", "seconds": elapsed, "bytes": size, "at": time.monotonic()})
+        done = 0
+        while time.monotonic() < deadline and (args.actions is None or done < args.actions):
+            await asyncio.sleep(rng.uniform(0, 2 * args.think))
+            actions = session.available_actions()
+            action = rng.choices(actions, weights=[ACTION_WEIGHTS[a] for a in actions])[0]
+            elapsed, size = await session.act(action, rng)
+            results.append({"action": action, "seconds": elapsed, "bytes": size, "at": time.monotonic()})
+            done += 1
+    except Exception as exc:  # une session en échec est comptée, les autres continuent
+        results.append({"action": "error", "error": f"{type(exc).__name__}: {exc}", "at": time.monotonic()})
+    finally:
+        await session.close()
+    return session.exceptions
+
+
+async def run_load(ws_url, args):
+    results = []
+    deadline = time.monotonic() + args.ramp + args.duration
+    exceptions = await asyncio.gather(*(run_session(i, ws_url, args, deadline, results)
+                                        for i in range(args.sessions)))
+    return results, sum(exceptions)
+
+
+# ---------------------------------------------------------------------------
+# Rapport
+# ---------------------------------------------------------------------------
+
+def build_report(results, app_exceptions, samples, wall_time, args):
+    reruns = [r for r in results if "seconds" in r]
+    errors = [r["error"] for r in results if r["action"] == "error"]
+    latency = {action: percentiles([r["seconds"] for r in reruns if r["action"] == action])
+               for action in ["load", *ACTION_WEIGHTS]}
+    latency["all_interactions"] = percentiles([r["seconds"] for r in reruns if r["action"] != "load"])
+    cpu = [s["cpu_percent"] for s in samples]
+    rss = [s["rss"] for s in samples if s["rss"]]
+
+    import streamlit
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "streamlit": streamlit.__version__,
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {k: getattr(args, k) for k in ("sessions", "duration", "ramp", "think", "actions", "seed")},
+        "wall_time": wall_time,
+        "reruns": len(reruns),
+        "throughput": len(reruns) / wall_time if wall_time else None,
+        "errors": errors,
+        "app_exceptions": app_exceptions,
+        "latency": latency,
+        "payload_bytes": percentiles([r["bytes"] for r in reruns]),
+        "resources": {
+            "cpu_percent": {"mean": sum(cpu) / len(cpu), "max": max(cpu)} if cpu else None,
+            "rss_max": max(rss) if rss else None,
+            "samples": samples,
+        },
+    }
+
+
+def print_report(report):
+    print(f"{report['config']['sessions']} sessions, {report['reruns']} reruns en {report['wall_time']:.1f} s "
+          f"({report['throughput']:.1f} reruns/s), {len(report['errors'])} session(s) en erreur, "
+          f"{report['app_exceptions']} exception(s) applicative(s)")
+    print(f"{'action':<18} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for action, stats in report["latency"].items():
+        if stats["n"]:
+            print(f"{action:<18} {stats['n']:>6} " + " ".join(
+                f"{stats[q] * 1000:>9.1f}" for q in ("p50", "p95", "p99", "max")))
+    samples = report["resources"]["samples"]
+    if samples:
+        print(f"\n{'t (s)':>7} {'CPU %':>7} {'RSS Mio':>9}")
+        step = max(1, len(samples) // 20)
+        for sample in samples[::step]:
+            rss = f"{sample['rss'] / 2 ** 20:9.1f}" if sample["rss"] else f"{'—':>9}"
+            print(f"{sample['t']:>7.1f} {sample['cpu_percent']:>7.1f} {rss}")
+    for error in report["errors"][:5]:
+        print(f"erreur : {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge du tableau de bord (sessions websocket simultanées)")
+    parser.add_argument("--sessions", type=int, default=20, help="nombre de sessions simultanées")
+    parser.add_argument("--duration", type=float, default=30, help="durée (s) après la montée en charge")
+    parser.add_argument("--ramp", type=float, default=5, help="durée (s) de la montée en charge")
+    parser.add_argument("--think", type=float, default=1.0, help="temps de réflexion moyen (s) entre deux actions")
+    parser.add_argument("--actions", type=int, help="nombre maximal d'actions par session")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8599, help="port du serveur lancé par le test")
+    parser.add_argument("--url", help="serveur déjà lancé (ex. http://localhost:8501) au lieu d'en démarrer un")
+    parser.add_argument("--pid", type=int, help="processus à échantillonner avec --url")
+    parser.add_argument("--output", default=os.path.join(BASE_DIR, "load_output.json"))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="load_test_") as work_dir:
+        process = None
+        if args.url:
+            base_url = args.url.rstrip("/")
+            wait_healthy(base_url)
+            pid = args.pid
+        else:
+            base_url = f"http://127.0.0.1:{args.port}"
+            process = start_server(args.port, work_dir)
+            pid = process.pid
+        ws_url = base_url.replace("http", "ws", 1) + "/_stcore/stream"
+
+        sampler = ProcessSampler(pid) if pid and os.path.exists(f"/proc/{pid}") else None
+        try:
+            if sampler is not None:
+                sampler.start()
+            start = time.monotonic()
+            results, app_exceptions = asyncio.run(run_load(ws_url, args))
+            wall_time = time.monotonic() - start
+        finally:
+            if sampler is not None:
+                sampler.stop()
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=10)
+
+    report = build_report(results, app_exceptions, sampler.samples if sampler else [], wall_time, args)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print_report(report)
+    print(f"\nRésultats écrits dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# monte_carlo.py - Projection Monte Carlo du stock non vérifié depuis la dernière inspection AIEA
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Percentiles renvoyés pour les bandes d'incertitude
+PERCENTILES = (5, 25, 50, 75, 95)
+# Nombre de trajectoires simulées par lot (un lot = une tâche du pool de processus)
+BATCH_SIZE = 25_000
+# Pas de temps de la projection (jours)
+STEP_DAYS = 30
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _init_worker():
+    # Fonctions mises en cache hors du serveur Streamlit : avertissements sans objet
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+
+def _get_executor():
+    """Pool de processus partagé (démarré en « spawn » : le serveur Streamlit est multithread).
+
+    Les workers réimportent le script de l'application sous le nom __mp_main__ : il est
+    protégé par `if __name__ == "__main__"` (Dashboard.py) et n'y est pas exécuté.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = max(1, min(4, (os.cpu_count() or 1) - 1))
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                            initializer=_init_worker)
+        return _executor
+
+
+def _reset_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def production_prior(dates, stock, before, window=12):
+    """Moyenne et écart-type de la production mensuelle (kg/mois) avant la date donnée.
+
+    Calculés sur les `window` derniers intervalles de croissance de la série
+    (les plateaux, où la valeur a été reconduite faute de vérification, sont ignorés).
+    """
+    series = pd.Series(np.asarray(stock, dtype=float), index=pd.to_datetime(dates)).sort_index()
+    series = series[series.index < pd.Timestamp(before)]
+    months = series.index.to_series().diff().dt.days.to_numpy()[1:] / 30.4375
+    rates = np.diff(series.to_numpy()) / months
+    rates = rates[rates > 0][-window:]
+    if len(rates) == 0:
+        return 0.0, 0.0
+    return float(rates.mean()), float(rates.std(ddof=1)) if len(rates) > 1 else 0.0
+
+
+def _beta_parameters(mean, concentration):
+    mean = min(max(mean, 1e-3), 1 - 1e-3)
+    return mean * concentration, (1 - mean) * concentration
+
+
+def simulate_batch(seed, n_paths, n_steps, params):
+    """Simule un lot de trajectoires (vectorisé) ; renvoie les stocks 60% et total (float32, n_paths x n_steps+1)"""
+    rng = np.random.default_rng(seed)
+    a, b = _beta_parameters(params["loss_mean"], params["loss_concentration"])
+
+    # Incertitudes propres à chaque trajectoire
+    loss = rng.beta(a, b, size=(n_paths, 1))
+    capacity = rng.uniform(params["capacity_low"], params["capacity_high"], size=(n_paths, 1))
+    resumed = rng.random((n_paths, 1)) < params["resume_probability"]
+    resume_step = rng.integers(0, n_steps + 1, size=(n_paths, 1))
+    active = resumed & (np.arange(1, n_steps + 1)[None, :] > resume_step)
+
+    step_months = STEP_DAYS / 30.4375
+    prod_60 = np.maximum(rng.normal(params["rate_60_mean"], params["rate_60_std"], size=(n_paths, n_steps)), 0.0)
+    prod_total = np.maximum(rng.normal(params["rate_total_mean"], params["rate_total_std"], size=(n_paths, n_steps)), 0.0)
+    prod_60 *= capacity * active * step_months
+    prod_total *= capacity * active * step_months
+
+    start_60 = params["stock_60"] * (1 - loss)
+    start_total = params["stock_total"] * (1 - loss)
+    stock_60 = np.concatenate([start_60, start_60 + np.cumsum(prod_60, axis=1)], axis=1)
+    # Le stock total inclut le stock à 60%
+    stock_total = np.concatenate([start_total, start_total + np.cumsum(np.maximum(prod_total, prod_60), axis=1)], axis=1)
+    return stock_60.astype(np.float32), stock_total.astype(np.float32)
+
+
+def run_simulation(params, n_paths, n_steps, seed=0, parallel=True):
+    """Exécute n_paths trajectoires par lots, répartis sur le pool de processus si parallel"""
+    batches = [BATCH_SIZE] * (n_paths // BATCH_SIZE)
+    if n_paths % BATCH_SIZE:
+        batches.append(n_paths % BATCH_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(batches))
+
+    results = None
+    if parallel and len(batches) > 1:
+        try:
+            executor = _get_executor()
+            futures = [executor.submit(simulate_batch, s, n, n_steps, params) for s, n in zip(seeds, batches)]
+            results = [f.result() for f in futures]
+        except BrokenProcessPool:
+            # Worker tué (mémoire, arrêt du serveur...) : nouveau pool au prochain appel, calcul local ici
+            _reset_executor()
+    if results is None:
+        results = [simulate_batch(s, n, n_steps, params) for s, n in zip(seeds, batches)]
+
+    return (np.concatenate([r[0] for r in results]),
+            np.concatenate([r[1] for r in results]))
+
+
+@st.cache_data(max_entries=32, show_spinner="Simulation Monte Carlo en cours...")
+def project_unverified_stock(start_date, end_date, stock_60, stock_total,
+                             rate_60_mean, rate_60_std, rate_total_mean, rate_total_std,
+                             loss_mean=0.3, loss_concentration=10.0,
+                             capacity_low=0.0, capacity_high=0.3, resume_probability=0.5,
+                             n_paths=100_000, seed=0):
+    """Projette les stocks plausibles entre la dernière inspection et end_date.
+
+    Chaque trajectoire tire une perte due aux frappes de juin 2025 (loi Bêta de
+    moyenne loss_mean), une capacité résiduelle (fraction uniforme de la
+    production d'avant-frappes), et une éventuelle reprise de l'enrichissement à
+    une date aléatoire. Mis en cache par jeu de paramètres.
+
+    Renvoie un DataFrame (date, series, percentile, value) et les probabilités
+    finales de dépasser le stock vérifié.
+    """
+    start = pd.Timestamp(start_date)
+    n_steps = max(1, int(np.ceil((pd.Timestamp(end_date) - start).days / STEP_DAYS)))
+    params = {
+        "stock_60": stock_60, "stock_total": stock_total,
+        "rate_60_mean": rate_60_mean, "rate_60_std": rate_60_std,
+        "rate_total_mean": rate_total_mean, "rate_total_std": rate_total_std,
+        "loss_mean": loss_mean, "loss_concentration": loss_concentration,
+        "capacity_low": capacity_low, "capacity_high": capacity_high,
+        "resume_probability": resume_probability,
+    }
+    paths_60, paths_total = run_simulation(params, n_paths, n_steps, seed=seed)
+
+    dates = start + pd.to_timedelta(np.arange(n_steps + 1) * STEP_DAYS, unit="D")
+    frames = []
+    for name, paths in (("stock_60pct", paths_60), ("stock_total", paths_total)):
+        bands = np.percentile(paths, PERCENTILES, axis=0)
+        for p, values in zip(PERCENTILES, bands):
+            frames.append(pd.DataFrame({"date": dates, "series": name, "percentile": p, "value": values}))
+
+    summary = {
+        "n_paths": n_paths,
+        "prob_60_above_verified": float((paths_60[:, -1] > stock_60).mean()),
+        "prob_total_above_verified": float((paths_total[:, -1] > stock_total).mean()),
+        "median_60_final": float(np.median(paths_60[:, -1])),
+    }
+    return pd.concat(frames, ignore_index=True), summary
@@ -0,0 +1,318 @@
+# negotiation_graph.py - Graphe des parties aux négociations (matrice d'incidence creuse)
+#
+# Chaque réunion (date, lieu, parties, résultat) est une colonne de la matrice d'incidence
+# A (parties x réunions, scipy.sparse). On en déduit :
+# - la co-occurrence C = A Aᵀ (réunions communes à deux parties ; diagonale = réunions
+#   de chaque partie), tenue à jour à chaque ajout sans recalcul complet ;
+# - la centralité (degré pondéré, nombre de partenaires, vecteur propre) ;
+# - les comptes sur une fenêtre de dates (colonnes triées par date : tranche contiguë de A)
+#   et par période (A multipliée par l'indicatrice réunion x période).
+import argparse
+import itertools
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+# Itérations maximales et tolérance du calcul de la centralité de vecteur propre
+EIGENVECTOR_MAX_ITER = 200
+EIGENVECTOR_TOL = 1e-9
+# Itérations de la disposition par forces (vue réseau)
+LAYOUT_ITERATIONS = 60
+
+_graphs = {}
+_graphs_lock = threading.Lock()
+# Versions uniques dans le processus (un graphe reconstruit ne reprend jamais une version déjà vue)
+_versions = itertools.count(1)
+
+
+def meeting_key(meeting):
+    return (str(meeting["date"])[:10], meeting.get("location"), tuple(sorted(meeting["parties"])))
+
+
+class NegotiationGraph:
+    """Parties x réunions ; ajout incrémental, requêtes sur fenêtre de dates"""
+
+    def __init__(self):
+        self.parties = []
+        self.party_index = {}
+        self.meetings = []
+        self.keys = set()
+        # Incidence au format COO (réunion, partie), agrandie par blocs
+        self._days = np.empty(0, dtype=np.int64)
+        self._coo_meeting = np.empty(0, dtype=np.int64)
+        self._coo_party = np.empty(0, dtype=np.int64)
+        self._nnz = 0
+        # Co-occurrence dense (quelques centaines de parties), agrandie par doublement
+        self._cooccurrence = np.zeros((0, 0), dtype=np.int64)
+        self._sorted = None
+        self.version = next(_versions)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.meetings)
+
+    @staticmethod
+    def _grow(array, size, fill=0):
+        if size <= len(array):
+            return array
+        grown = np.full(max(size, 2 * len(array), 64), fill, dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    def append(self, meetings):
+        """Ajoute des réunions (dicts date, location, parties, outcome) ; renvoie le nombre ajouté"""
+        with self._lock:
+            first_column, first_nnz = len(self.meetings), self._nnz
+            new_days, new_meetings, new_parties = [], [], []
+            for meeting in meetings:
+                key = meeting_key(meeting)
+                if key in self.keys or not meeting["parties"]:
+                    continue
+                column = len(self.meetings)
+                for party in set(meeting["parties"]):
+                    if party not in self.party_index:
+                        self.party_index[party] = len(self.parties)
+                        self.parties.append(party)
+                    new_meetings.append(column)
+                    new_parties.append(self.party_index[party])
+                new_days.append(np.datetime64(key[0], "D").astype(np.int64))
+                self.meetings.append({"date": key[0], "location": meeting.get("location"),
+                                      "parties": list(meeting["parties"]), "outcome": meeting.get("outcome")})
+                self.keys.add(key)
+            added = len(self.meetings) - first_column
+            if not added:
+                return 0
+
+            self._days = self._grow(self._days, len(self.meetings))
+            self._days[first_column:len(self.meetings)] = new_days
+            self._nnz = first_nnz + len(new_parties)
+            self._coo_meeting = self._grow(self._coo_meeting, self._nnz)
+            self._coo_party = self._grow(self._coo_party, self._nnz)
+            self._coo_meeting[first_nnz:self._nnz] = new_meetings
+            self._coo_party[first_nnz:self._nnz] = new_parties
+
+            # C += B Bᵀ, B = colonnes ajoutées : seules les nouvelles réunions sont parcourues
+            n_parties = len(self.parties)
+            if n_parties > len(self._cooccurrence):
+                size = max(n_parties, 2 * len(self._cooccurrence), 16)
+                grown = np.zeros((size, size), dtype=np.int64)
+                grown[:len(self._cooccurrence), :len(self._cooccurrence)] = self._cooccurrence
+                self._cooccurrence = grown
+            batch = sp.csc_matrix((np.ones(len(new_parties), dtype=np.int32),
+                                   (new_parties, np.asarray(new_meetings) - first_column)),
+                                  shape=(n_parties, added))
+            self._cooccurrence[:n_parties, :n_parties] += (batch @ batch.T).toarray()
+            self._sorted = None
+            self.version = next(_versions)
+            return added
+
+    def incidence(self):
+        """Matrice d'incidence creuse (parties x réunions, CSC) avec colonnes triées par date, et ces dates"""
+        with self._lock:
+            if self._sorted is None:
+                n_meetings = len(self.meetings)
+                days = self._days[:n_meetings]
+                order = np.argsort(days, kind="stable")
+                # Position de chaque réunion dans l'ordre chronologique
+                rank = np.empty(n_meetings, dtype=np.int64)
+                rank[order] = np.arange(n_meetings)
+                matrix = sp.csc_matrix(
+                    (np.ones(self._nnz, dtype=np.int32),
+                     (self._coo_party[:self._nnz], rank[self._coo_meeting[:self._nnz]])),
+                    shape=(len(self.parties), n_meetings))
+                self._sorted = (matrix, days[order], order)
+            return self._sorted
+
+    def party_names(self, n_parties):
+        """Les n_parties premières parties (liste en ajout seul : cohérente avec une matrice de cette taille)"""
+        with self._lock:
+            return self.parties[:n_parties]
+
+    def _window(self, start=None, end=None):
+        matrix, days, _ = self.incidence()
+        lo = 0 if start is None else np.searchsorted(days, np.datetime64(str(start)[:10], "D").astype(np.int64))
+        hi = len(days) if end is None else np.searchsorted(
+            days, np.datetime64(str(end)[:10], "D").astype(np.int64), side="right")
+        return matrix[:, lo:hi], days[lo:hi]
+
+    def cooccurrence(self, start=None, end=None):
+        """Co-occurrence (parties x parties, dense) : totale (tenue à jour) ou sur une fenêtre de dates"""
+        if start is None and end is None:
+            with self._lock:
+                n_parties = len(self.parties)
+                return self._cooccurrence[:n_parties, :n_parties].copy()
+        window, _ = self._window(start, end)
+        return (window @ window.T).toarray().astype(np.int64)
+
+    def centrality(self, start=None, end=None):
+        """Par partie : réunions, partenaires, degré pondéré et centralité de vecteur propre (DataFrame)"""
+        cooccurrence = self.cooccurrence(start, end)
+        meetings = np.diag(cooccurrence).copy()
+        links = cooccurrence - np.diag(meetings)
+        weighted_degree = links.sum(axis=1)
+        frame = pd.DataFrame({
+            "meetings": meetings,
+            "partners": (links > 0).sum(axis=1),
+            "weighted_degree": weighted_degree,
+            "eigenvector": eigenvector_centrality(links),
+        }, index=pd.Index(self.party_names(len(cooccurrence)), name="party"))
+        return frame[frame["meetings"] > 0].sort_values(["eigenvector", "meetings"], ascending=False)
+
+    def pairs(self, start=None, end=None):
+        """Paires de parties et nombre de réunions communes, par ordre décroissant (DataFrame)"""
+        cooccurrence = self.cooccurrence(start, end)
+        a, b = np.nonzero(np.triu(cooccurrence, k=1))
+        parties = np.array(self.party_names(len(cooccurrence)), dtype=object)
+        frame = pd.DataFrame({"a": parties[a], "b": parties[b], "meetings": cooccurrence[a, b]})
+        return frame.sort_values("meetings", ascending=False, kind="stable").reset_index(drop=True)
+
+    def activity_by_period(self, freq="M", start=None, end=None):
+        """Réunions par partie et par période : A x (réunions x périodes), DataFrame parties x périodes"""
+        window, days = self._window(start, end)
+        index = pd.Index(self.party_names(window.shape[0]), name="party")
+        if not len(days):
+            return pd.DataFrame(index=index)
+        periods = pd.PeriodIndex(pd.to_datetime(days, unit="D"), freq=freq)
+        codes, uniques = pd.factorize(periods, sort=True)
+        indicator = sp.csr_matrix((np.ones(len(codes), dtype=np.int32), (np.arange(len(codes)), codes)),
+                                  shape=(len(codes), len(uniques)))
+        counts = (window @ indicator).toarray()
+        return pd.DataFrame(counts, index=index, columns=uniques.astype(str))
+
+    def meetings_frame(self, start=None, end=None):
+        """Réunions de la fenêtre, de la plus récente à la plus ancienne"""
+        _, _, order = self.incidence()
+        frame = pd.DataFrame([self.meetings[i] for i in order[::-1]],
+                             columns=["date", "location", "parties", "outcome"])
+        if start is not None:
+            frame = frame[frame["date"] >= str(start)[:10]]
+        if end is not None:
+            frame = frame[frame["date"] <= str(end)[:10]]
+        return frame.reset_index(drop=True)
+
+
+def eigenvector_centrality(weights, max_iter=EIGENVECTOR_MAX_ITER, tol=EIGENVECTOR_TOL):
+    """Centralité de vecteur propre (itération de puissance, normalisée à 1 pour le maximum)"""
+    n = len(weights)
+    if n == 0 or not weights.any():
+        return np.zeros(n)
+    weights = weights.astype(float)
+    # Décalage par l'identité : convergence même pour un graphe biparti
+    vector = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        following = weights @ vector + vector
+        following /= np.abs(following).max()
+        if np.abs(following - vector).max() < tol:
+            vector = following
+            break
+        vector = following
+    return vector / vector.max()
+
+
+def force_layout(weights, iterations=LAYOUT_ITERATIONS, seed=0):
+    """Positions (n x 2) par forces (Fruchterman-Reingold vectorisé) ; départ en cercle, déterministe"""
+    n = len(weights)
+    if n == 0:
+        return np.zeros((0, 2))
+    angles = 2 * np.pi * np.arange(n) / n
+    rng = np.random.default_rng(seed)
+    positions = np.column_stack((np.cos(angles), np.sin(angles))) + rng.normal(0, 0.01, (n, 2))
+    if n == 1:
+        return positions
+    strength = weights.astype(float) / max(weights.max(), 1)
+    k = 1.0 / np.sqrt(n)
+    temperature = 0.1
+    for _ in range(iterations):
+        delta = positions[:, None, :] - positions[None, :, :]
+        distance = np.maximum(np.linalg.norm(delta, axis=2), 1e-3)
+        # Répulsion entre toutes les parties, attraction le long des liens (pondérée)
+        force = k * k / distance - strength * distance * distance / k
+        displacement = (delta / distance[..., None] * force[..., None]).sum(axis=1)
+        length = np.maximum(np.linalg.norm(displacement, axis=1), 1e-9)
+        positions += displacement / length[:, None] * np.minimum(length, temperature)[:, None]
+        temperature *= 0.95
+    positions -= positions.mean(axis=0)
+    return positions / max(np.abs(positions).max(), 1e-9)
+
+
+def sync_graph(source, meetings):
+    """Graphe partagé d'une source (ex. base des rapports) : seules les nouvelles réunions sont ajoutées.
+
+    Si des réunions déjà vues ont disparu (rapport remplacé), le graphe est reconstruit.
+    Le graphe est partagé entre les sessions : lecture seule hors de ce module.
+    """
+    keys = {meeting_key(meeting) for meeting in meetings}
+    with _graphs_lock:
+        graph = _graphs.get(source)
+        if graph is None or not graph.keys <= keys:
+            graph = _graphs[source] = NegotiationGraph()
+    graph.append(meetings)
+    return graph
+
+
+def synthetic_meetings(n_meetings, n_parties, seed=0, start="2015-01-01", end="2026-12-31"):
+    """Réunions synthétiques (tests de charge) : 2 à 6 parties, popularité en loi de puissance"""
+    rng = np.random.default_rng(seed)
+    popularity = 1.0 / np.arange(1, n_parties + 1) ** 0.8
+    popularity /= popularity.sum()
+    days = rng.integers(np.datetime64(start, "D").astype(np.int64), np.datetime64(end, "D").astype(np.int64),
+                        n_meetings)
+    meetings = []
+    for i, day in enumerate(days):
+        size = rng.integers(2, 7)
+        parties = rng.choice(n_parties, size=size, replace=False, p=popularity)
+        meetings.append({"date": str(np.datetime64(int(day), "D")), "location": f"Lieu {i % 50}",
+                         "parties": [f"Partie {p}" for p in parties], "outcome": ""})
+    return meetings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Graphe des parties aux négociations")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("show", help="centralité et paires du dernier rapport")
+    sub_bench = sub.add_parser("bench", help="mesurer construction, ajout et requêtes sur données synthétiques")
+    sub_bench.add_argument("--meetings", type=int, default=50_000)
+    sub_bench.add_argument("--parties", type=int, default=300)
+    args = parser.parse_args()
+
+    if args.command == "show":
+        from data_store import load_snapshot
+
+        graph = NegotiationGraph()
+        graph.append(load_snapshot()["negotiations"])
+        print(graph.centrality().to_string())
+        print()
+        print(graph.pairs().to_string(index=False))
+        return
+
+    meetings = synthetic_meetings(args.meetings + 100, args.parties)
+    graph = NegotiationGraph()
+    timings = {}
+    start = time.perf_counter()
+    graph.append(meetings[:args.meetings])
+    timings["construction"] = time.perf_counter() - start
+    start = time.perf_counter()
+    graph.append(meetings[args.meetings:])
+    timings["ajout de 100 réunions"] = time.perf_counter() - start
+    start = time.perf_counter()
+    graph.incidence()
+    timings["matrice d'incidence (tri)"] = time.perf_counter() - start
+    for name, query in (
+            ("co-occurrence totale", lambda: graph.cooccurrence()),
+            ("co-occurrence sur 1 an", lambda: graph.cooccurrence("2024-01-01", "2024-12-31")),
+            ("centralité sur 1 an", lambda: graph.centrality("2024-01-01", "2024-12-31")),
+            ("activité mensuelle", lambda: graph.activity_by_period("M")),
+            ("disposition (60 parties)", lambda: force_layout(graph.cooccurrence()[:60, :60]))):
+        start = time.perf_counter()
+        query()
+        timings[name] = time.perf_counter() - start
+    print(f"{len(graph)} réunions, {len(graph.parties)} parties, {graph._nnz} participations")
+    for name, seconds in timings.items():
+        print(f"  {name:<30} {seconds * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+# observations.py - Couches d'observations satellite et index spatial en grille
+#
+# Chaque couche est un fichier de data/observations (<couche>.parquet ou <couche>.csv)
+# avec les colonnes timestamp, lat, lon et, en option, intensity. Les points d'une couche
+# sont découpés par mois ; chaque mois est indexé par une grille hiérarchique :
+# - niveau fin (GRID_BASE_DEG) : points triés par cellule (ordre ligne par ligne), si bien
+#   que les points d'une rangée de cellules visibles forment une plage contiguë ;
+# - niveaux agrégés (cellules 2x, 4x... plus grandes) : effectif et barycentre par cellule.
+# Une requête sur la fenêtre affichée ne lit que les rangées visibles : points bruts s'ils
+# sont peu nombreux, sinon agrégats du niveau adapté au zoom.
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OBSERVATIONS_DIR = os.environ.get("IAEA_OBSERVATIONS_DIR", os.path.join(BASE_DIR, "data", "observations"))
+
+# Taille (degrés) des cellules du niveau fin et nombre de niveaux agrégés (taille doublée à chaque niveau)
+GRID_BASE_DEG = 0.02
+GRID_LEVELS = 10
+# Au-delà de ce nombre de points visibles, les points sont regroupés
+MAX_RAW_POINTS = 5000
+# Nombre visé d'agrégats sur la largeur de la fenêtre
+CLUSTERS_ACROSS = 48
+
+
+def _ranges(starts, ends):
+    """Concaténation des intervalles [starts[i], ends[i])"""
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+    return np.arange(total, dtype=np.int64) + offsets
+
+
+class GridIndex:
+    """Index en grille hiérarchique d'un ensemble de points (lat, lon)"""
+
+    def __init__(self, lat, lon, intensity=None, base_deg=GRID_BASE_DEG, levels=GRID_LEVELS):
+        self.base_deg = base_deg
+        self.levels = []
+        rows = np.floor((np.asarray(lat, dtype=float) + 90) / base_deg).astype(np.int64)
+        cols = np.floor((np.asarray(lon, dtype=float) + 180) / base_deg).astype(np.int64)
+        width = int(np.ceil(360 / base_deg)) + 1
+        order = np.argsort(rows * width + cols, kind="stable")
+        self.lat = np.asarray(lat, dtype=np.float32)[order]
+        self.lon = np.asarray(lon, dtype=np.float32)[order]
+        self.intensity = None if intensity is None else np.asarray(intensity, dtype=np.float32)[order]
+        rows, cols = rows[order], cols[order]
+
+        for level in range(levels):
+            factor = 2 ** level
+            size = base_deg * factor
+            level_width = int(np.ceil(360 / size)) + 1
+            keys = (rows // factor) * level_width + cols // factor
+            # Clés déjà triées au niveau fin ; aux niveaux agrégés, on regroupe par clé
+            level_order = None
+            if level > 0:
+                level_order = np.argsort(keys, kind="stable")
+                keys = keys[level_order]
+            unique, first, counts = np.unique(keys, return_index=True, return_counts=True)
+            lat_sorted = self.lat if level_order is None else self.lat[level_order]
+            lon_sorted = self.lon if level_order is None else self.lon[level_order]
+            self.levels.append({
+                "size": size,
+                "width": level_width,
+                "keys": unique,
+                # Effectifs cumulés : au niveau fin, ce sont aussi les bornes des plages de points
+                "cumulative": np.concatenate(([0], np.cumsum(counts))),
+                "lat": np.add.reduceat(lat_sorted, first) / counts if len(first) else np.empty(0),
+                "lon": np.add.reduceat(lon_sorted, first) / counts if len(first) else np.empty(0),
+            })
+
+    def __len__(self):
+        return len(self.lat)
+
+    def _cell_slices(self, level, bounds):
+        """Bornes [début, fin) dans les cellules du niveau, une par rangée visible"""
+        lat_min, lat_max, lon_min, lon_max = bounds
+        grid = self.levels[level]
+        size, width = grid["size"], grid["width"]
+        row_min = int(np.floor((lat_min + 90) / size))
+        row_max = int(np.floor((lat_max + 90) / size))
+        col_min = max(0, int(np.floor((lon_min + 180) / size)))
+        col_max = int(np.floor((lon_max + 180) / size))
+        rows = np.arange(row_min, row_max + 1, dtype=np.int64)
+        starts = np.searchsorted(grid["keys"], rows * width + col_min, side="left")
+        ends = np.searchsorted(grid["keys"], rows * width + col_max, side="right")
+        return starts, ends
+
+    def count(self, bounds):
+        """Nombre de points dans les cellules fines recouvrant la fenêtre (majorant)"""
+        starts, ends = self._cell_slices(0, bounds)
+        cumulative = self.levels[0]["cumulative"]
+        return int((cumulative[ends] - cumulative[starts]).sum())
+
+    def points(self, bounds):
+        """Indices (dans l'ordre de l'index) des points strictement dans la fenêtre"""
+        starts, ends = self._cell_slices(0, bounds)
+        cumulative = self.levels[0]["cumulative"]
+        candidates = _ranges(cumulative[starts], cumulative[ends])
+        lat_min, lat_max, lon_min, lon_max = bounds
+        lat, lon = self.lat[candidates], self.lon[candidates]
+        return candidates[(lat >= lat_min) & (lat <= lat_max) & (lon >= lon_min) & (lon <= lon_max)]
+
+    def clusters(self, bounds, cell_deg):
+        """Agrégats (lat, lon, effectif) du niveau dont les cellules approchent cell_deg"""
+        level = int(np.clip(np.floor(np.log2(max(cell_deg, self.base_deg) / self.base_deg)), 0, len(self.levels) - 1))
+        grid = self.levels[level]
+        starts, ends = self._cell_slices(level, bounds)
+        cells = _ranges(starts, ends)
+        counts = grid["cumulative"][cells + 1] - grid["cumulative"][cells]
+        return pd.DataFrame({"lat": grid["lat"][cells], "lon": grid["lon"][cells], "count": counts})
+
+    def viewport(self, bounds, max_points=MAX_RAW_POINTS, clusters_across=CLUSTERS_ACROSS):
+        """Contenu de la fenêtre : ("points", DataFrame lat/lon/intensity) ou ("clusters", DataFrame)"""
+        if self.count(bounds) <= max_points:
+            selected = self.points(bounds)
+            frame = pd.DataFrame({"lat": self.lat[selected], "lon": self.lon[selected]})
+            if self.intensity is not None:
+                frame["intensity"] = self.intensity[selected]
+            if len(frame) <= max_points:
+                return "points", frame
+        lon_span = bounds[3] - bounds[2]
+        return "clusters", self.clusters(bounds, lon_span / clusters_across)
+
+
+def layer_files(observations_dir=DEFAULT_OBSERVATIONS_DIR):
+    """{nom de couche: chemin} des fichiers d'observations disponibles"""
+    if not os.path.isdir(observations_dir):
+        return {}
+    return {
+        os.path.splitext(entry.name)[0]: entry.path
+        for entry in sorted(os.scandir(observations_dir), key=lambda e: e.name)
+        if entry.name.endswith((".parquet", ".csv"))
+    }
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_layer(path):
+    """Lit un fichier de couche : DataFrame timestamp, lat, lon (et intensity si présente)"""
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601")
+    return df
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _layer_index(path, signature):
+    """Index par mois d'une couche, mis en cache par signature du fichier (partagé entre sessions)"""
+    df = read_layer(path)
+    months = df["timestamp"].dt.to_period("M")
+    intensity = df["intensity"] if "intensity" in df else None
+    indexes = {}
+    for month, positions in months.groupby(months, observed=True).indices.items():
+        indexes[str(month)] = GridIndex(
+            df["lat"].to_numpy()[positions], df["lon"].to_numpy()[positions],
+            None if intensity is None else intensity.to_numpy()[positions],
+        )
+    return indexes
+
+
+def load_layer(name, observations_dir=DEFAULT_OBSERVATIONS_DIR):
+    """{mois 'AAAA-MM': GridIndex} d'une couche ; lecture seule"""
+    path = layer_files(observations_dir)[name]
+    return _layer_index(path, file_signature(path))
+
+
+def generate_layer(path, centers, n_points, months, spread_deg=0.15, background=0.2, seed=0):
+    """Écrit une couche synthétique (tests de charge, démonstration) : points autour des centres (lat, lon)"""
+    rng = np.random.default_rng(seed)
+    n_background = int(n_points * background)
+    n_clustered = n_points - n_background
+    center_ids = rng.integers(0, len(centers), n_clustered)
+    centers = np.asarray(centers, dtype=float)
+    lat = np.concatenate((centers[center_ids, 0] + rng.normal(0, spread_deg, n_clustered),
+                          rng.uniform(25, 40, n_background)))
+    lon = np.concatenate((centers[center_ids, 1] + rng.normal(0, spread_deg, n_clustered),
+                          rng.uniform(44, 63, n_background)))
+    end = pd.Timestamp.today().normalize()
+    start = end - pd.DateOffset(months=months)
+    seconds = rng.uniform(0, (end - start).total_seconds(), n_points)
+    df = pd.DataFrame({
+        "timestamp": start + pd.to_timedelta(seconds, unit="s"),
+        "lat": lat.astype(np.float32),
+        "lon": lon.astype(np.float32),
+        "intensity": rng.gamma(2.0, 1.0, n_points).astype(np.float32),
+    }).sort_values("timestamp")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    df.to_parquet(path, index=False)
+    return len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Couches d'observations satellite")
+    parser.add_argument("--dir", default=DEFAULT_OBSERVATIONS_DIR, help="répertoire des couches")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("layers", help="lister les couches et leurs mois")
+    sub_generate = sub.add_parser("generate", help="écrire une couche synthétique autour des sites")
+    sub_generate.add_argument("name")
+    sub_generate.add_argument("--points", type=int, default=300_000)
+    sub_generate.add_argument("--months", type=int, default=6)
+    sub_generate.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        from data_store import load_snapshot
+
+        facilities = load_snapshot()["facilities"].values()
+        centers = [(f["coordinates"]["lat"], f["coordinates"]["lon"]) for f in facilities]
+        path = os.path.join(args.dir, f"{args.name}.parquet")
+        count = generate_layer(path, centers, args.points, args.months, seed=args.seed)
+        print(f"{path}: {count} points synthétiques")
+    else:
+        for name, path in layer_files(args.dir).items():
+            months = _layer_index(path, file_signature(path))
+            print(f"{name}: " + ", ".join(f"{month} ({len(index)})" for month, index in months.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+# profiling.py - Chronométrage des sections du tableau de bord et panneau de profilage (opt-in)
+#
+# Activation : variable d'environnement DASHBOARD_PROFILING=1 (toutes les sessions)
+# ou paramètre d'URL ?debug=1 (session courante, avec panneau dans la barre latérale).
+# Désactivé, span() renvoie un gestionnaire de contexte vide partagé : coût quasi nul.
+import cProfile
+import functools
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import nullcontext
+from datetime import datetime
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+logger = logging.getLogger("dashboard.profiling")
+
+PROFILING_ENV = "DASHBOARD_PROFILING"
+PROFILING_LOG_ENV = "DASHBOARD_PROFILING_LOG"
+# Nombre de reruns conservés par session pour le panneau
+HISTORY_SIZE = 20
+
+_NULL_SPAN = nullcontext()
+# Rerun en cours, propre au thread d'exécution du script (un thread par session) ;
+# _local.in_script : exécution complète du script en cours (les fragments y sont mesurés)
+_local = threading.local()
+
+
+class _Span:
+    __slots__ = ("run", "name", "start", "depth")
+
+    def __init__(self, run, name):
+        self.run = run
+        self.name = name
+
+    def __enter__(self):
+        self.depth = self.run["depth"]
+        self.run["depth"] += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.run["depth"] -= 1
+        self.run["spans"].append({
+            "name": self.name,
+            "depth": self.depth,
+            "start_ms": round((self.start - self.run["t0"]) * 1000, 3),
+            "duration_ms": round((end - self.start) * 1000, 3),
+        })
+        return False
+
+
+def span(name):
+    """Chronomètre une section : `with span("kpis"): ...`"""
+    run = getattr(_local, "run", None)
+    if run is None:
+        return _NULL_SPAN
+    return _Span(run, name)
+
+
+def fragment(func):
+    """st.fragment mesuré : un rerun du seul fragment ouvre et clôt sa propre mesure.
+
+    Lors d'une exécution complète, le fragment est chronométré dans la mesure du script.
+    """
+    name = f"fragment:{func.__name__}"
+
+    @functools.wraps(func)
+    def measured(*args, **kwargs):
+        if getattr(_local, "in_script", False):
+            with span(name):
+                return func(*args, **kwargs)
+        start_run()
+        try:
+            with span(name):
+                return func(*args, **kwargs)
+        finally:
+            end_run(name)
+
+    return st.fragment(measured)
+
+
+def debug_requested():
+    """Panneau de profilage demandé par l'URL (?debug=1)"""
+    return st.query_params.get("debug") == "1"
+
+
+def start_run():
+    """Ouvre la mesure d'un rerun si le profilage est actif ; à appeler en tête de script"""
+    _local.run = None
+    _local.in_script = True
+    if os.environ.get(PROFILING_ENV) != "1" and not debug_requested():
+        return
+
+    ctx = get_script_run_ctx()
+    run = {
+        "run_id": uuid.uuid4().hex[:12],
+        "session_id": ctx.session_id if ctx else None,
+        "timestamp": datetime.now().isoformat(timespec="milliseconds"),
+        "t0": time.perf_counter(),
+        "depth": 0,
+        "spans": [],
+        "profiler": None,
+        "tracemalloc": False,
+    }
+    if st.session_state.get("_profiling_cprofile"):
+        run["profiler"] = cProfile.Profile()
+        run["profiler"].enable()
+    if st.session_state.get("_profiling_tracemalloc") and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        run["tracemalloc"] = True
+    _local.run = run
+
+
+def end_run(page=None):
+    """Clôt la mesure du rerun (page affichée), émet l'enregistrement JSON et l'ajoute à l'historique de la session"""
+    run = getattr(_local, "run", None)
+    _local.run = None
+    _local.in_script = False
+    if run is None:
+        return None
+
+    record = {
+        "run_id": run["run_id"],
+        "session_id": run["session_id"],
+        "page": page,
+        "timestamp": run["timestamp"],
+        "total_ms": round((time.perf_counter() - run["t0"]) * 1000, 3),
+        "spans": sorted(run["spans"], key=lambda s: s["start_ms"]),
+    }
+    if run["profiler"] is not None:
+        run["profiler"].disable()
+        buffer = io.StringIO()
+        pstats.Stats(run["profiler"], stream=buffer).sort_stats("cumulative").print_stats(25)
+        record["cprofile"] = buffer.getvalue()
+    if run["tracemalloc"]:
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        record["tracemalloc"] = [str(stat) for stat in snapshot.statistics("lineno")[:15]]
+
+    _emit(record)
+    history = st.session_state.setdefault("_profiling_history", [])
+    history.append(record)
+    del history[:-HISTORY_SIZE]
+    return record
+
+
+def _emit(record):
+    """Écrit l'enregistrement (sans les rapports détaillés) dans le journal et, si configuré, un fichier JSONL"""
+    line = json.dumps({k: v for k, v in record.items() if k not in ("cprofile", "tracemalloc")}, ensure_ascii=False)
+    logger.info(line)
+    log_path = os.environ.get(PROFILING_LOG_ENV)
+    if log_path:
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def render_panel():
+    """Panneau de profilage dans la barre latérale (uniquement avec ?debug=1)"""
+    if not debug_requested():
+        return
+    history = st.session_state.get("_profiling_history", [])
+    _render_memory()
+
+    with st.sidebar.expander("🛠️ Profilage", expanded=True):
+        st.checkbox("cProfile au prochain rerun", key="_profiling_cprofile")
+        st.checkbox("tracemalloc au prochain rerun (tous threads)", key="_profiling_tracemalloc")
+        if not history:
+            st.caption("Aucune mesure pour l'instant.")
+            return
+
+        last = history[-1]
+        st.markdown(f"**Dernier rerun** ({last['page']}) : {last['total_ms']:.1f} ms")
+        st.dataframe(
+            [{"section": "  " * s["depth"] + s["name"], "ms": s["duration_ms"], "début": s["start_ms"]}
+             for s in last["spans"]],
+            hide_index=True, use_container_width=True
+        )
+        st.line_chart([r["total_ms"] for r in history], height=120)
+        if "cprofile" in last:
+            st.code(last["cprofile"], language=None)
+        if "tracemalloc" in last:
+            st.code("\n".join(last["tracemalloc"]), language=None)
+        st.download_button("Exporter (JSON)", json.dumps(history, ensure_ascii=False, indent=2),
+                           file_name="profiling.json", mime="application/json")
+
+
+def _render_memory():
+    """Mémoire partagée du jeu de données et mémoire propre à la session courante"""
+    from dataset import memory_report
+
+    report = memory_report(st.session_state)
+    with st.sidebar.expander("🧠 Mémoire", expanded=False):
+        st.markdown(f"**Partagé (une fois par processus)** : {report['shared_total'] / 1024:.1f} Kio  \n"
+                    f"**Cette session** : {report['session_total'] / 1024:.1f} Kio  \n"
+                    f"**{report['n_sessions']} sessions** : ≈ {report['estimated_total'] / 1024 ** 2:.2f} Mio")
+        if report["process_rss"] is not None:
+            st.caption(f"RSS du processus : {report['process_rss'] / 1024 ** 2:.0f} Mio"
+                       + (f", {report['active_sessions']} session(s) active(s)"
+                          if report["active_sessions"] is not None else ""))
+        st.dataframe(
+            [{"objet": name, "portée": scope, "octets": size}
+             for scope, items in (("partagé", report["shared"]), ("session", report["session"]))
+             for name, size in sorted(items.items(), key=lambda item: -item[1])],
+            hide_index=True, use_container_width=True
+        )
@@ -0,0 +1,239 @@
+# report_diff.py - Historique des rapports encodé en deltas et différences entre deux dates
+#
+# Chaque instantané de la base des rapports (data_store) est réduit à des enregistrements
+# (section, clé, champ) -> valeur JSON. Pour chaque rapport, seuls les champs qui diffèrent
+# du rapport précédent sont conservés (table snapshot_deltas) : ajout (old NULL), retrait
+# (new NULL) ou modification. La différence entre deux dates quelconques compose les deltas
+# intermédiaires, sans reconstruire les instantanés complets.
+import argparse
+import json
+import threading
+from datetime import datetime
+
+import streamlit as st
+
+import data_store
+
+DELTA_SCHEMA = """
+CREATE TABLE IF NOT EXISTS delta_chain (
+    report_date TEXT PRIMARY KEY,
+    base_date TEXT,
+    content_hash TEXT NOT NULL,
+    base_hash TEXT,
+    n_changes INTEGER NOT NULL,
+    computed_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshot_deltas (
+    report_date TEXT NOT NULL,
+    section TEXT NOT NULL,
+    key TEXT NOT NULL,
+    field TEXT NOT NULL,
+    old_value TEXT,
+    new_value TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_deltas_report ON snapshot_deltas(report_date);
+CREATE TABLE IF NOT EXISTS delta_meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Version du découpage en enregistrements (snapshot_records) : les deltas calculés avec
+# une autre version sont tous recalculés
+RECORDS_VERSION = "2"
+
+# Sections comparées et libellés affichés
+SECTIONS = {
+    "report": "Chiffres du rapport",
+    "thresholds": "Seuils",
+    "facilities": "Sites",
+    "enrichment_history": "Historique d'enrichissement",
+    "timeline_events": "Chronologie",
+    "statements": "Déclarations",
+    "negotiations": "Négociations",
+}
+
+_sync_state = {}
+_sync_lock = threading.Lock()
+
+
+def connect(db_path=data_store.DEFAULT_DB_PATH):
+    """Connexion à la base des rapports, avec les tables de deltas"""
+    conn = data_store.connect(db_path)
+    conn.executescript(DELTA_SCHEMA)
+    return conn
+
+
+def _value(value):
+    return json.dumps(value, ensure_ascii=False, sort_keys=True)
+
+
+def snapshot_records(conn, report_date):
+    """Enregistrements {(section, clé, champ): valeur JSON} d'un instantané"""
+    records = {}
+    row = conn.execute("SELECT uranium_60_percent, uranium_total, weapons_potential, thresholds "
+                       "FROM snapshots WHERE report_date = ?", (report_date,)).fetchone()
+    for field, value in zip(("uranium_60_percent", "uranium_total", "weapons_potential"), row[:3]):
+        records[("report", "", field)] = _value(value)
+    for field, value in json.loads(row[3]).items():
+        records[("thresholds", "", field)] = _value(value)
+
+    for facility_id, *values, lat, lon, levels, extra in conn.execute(
+            f"SELECT facility_id, {', '.join(data_store.FACILITY_COLUMNS)}, lat, lon, enrichment_levels, extra "
+            "FROM facilities WHERE report_date = ?", (report_date,)):
+        fields = dict(zip(data_store.FACILITY_COLUMNS, values))
+        fields.update(lat=lat, lon=lon, enrichment_levels=json.loads(levels), **json.loads(extra))
+        for field, value in fields.items():
+            if value is not None:
+                records[("facilities", facility_id, field)] = _value(value)
+
+    for date, level, stock in conn.execute(
+            "SELECT date, level, stock FROM enrichment_history WHERE report_date = ?", (report_date,)):
+        records[("enrichment_history", date, "level")] = _value(level)
+        records[("enrichment_history", date, "stock")] = _value(stock)
+    # Événements, déclarations et négociations sans identifiant : clé = contenu (plusieurs
+    # déclarations d'une même source ou réunions d'un même lieu peuvent tomber le même jour)
+    for date, event, kind in conn.execute(
+            "SELECT date, event, type FROM timeline_events WHERE report_date = ?", (report_date,)):
+        records[("timeline_events", f"{date} | {event}", "type")] = _value(kind)
+    for date, source, statement in conn.execute(
+            "SELECT date, source, statement FROM statements WHERE report_date = ?", (report_date,)):
+        records[("statements", f"{date} | {source} | {statement}", "statement")] = _value(statement)
+    for date, location, parties, outcome in conn.execute(
+            "SELECT date, location, parties, outcome FROM negotiations WHERE report_date = ?", (report_date,)):
+        key = f"{date} | {location} | {', '.join(sorted(json.loads(parties or '[]')))}"
+        records[("negotiations", key, "outcome")] = _value(outcome)
+    return records
+
+
+def delta(old_records, new_records):
+    """Lignes (section, clé, champ, ancien, nouveau) des champs ajoutés, retirés ou modifiés"""
+    rows = []
+    for record, new_value in new_records.items():
+        old_value = old_records.get(record)
+        if old_value != new_value:
+            rows.append((*record, old_value, new_value))
+    rows.extend((*record, old_value, None) for record, old_value in old_records.items()
+                if record not in new_records)
+    return rows
+
+
+def sync_deltas(db_path=data_store.DEFAULT_DB_PATH):
+    """Calcule les deltas manquants ou périmés ; renvoie le nombre de rapports (re)calculés.
+
+    Un rapport importé entre deux dates existantes invalide le delta du rapport suivant,
+    recalculé ici. Deux instantanés au plus sont chargés en même temps.
+    """
+    data_store.sync_reports_dir(db_path)
+    signature = data_store.store_signature(db_path)
+    if _sync_state.get(db_path) == signature:
+        return 0
+
+    with _sync_lock:
+        conn = connect(db_path)
+        try:
+            snapshots = conn.execute("SELECT report_date, content_hash FROM snapshots ORDER BY report_date").fetchall()
+            chain = {row[0]: row[1:] for row in conn.execute(
+                "SELECT report_date, base_date, content_hash, base_hash FROM delta_chain")}
+            version = conn.execute("SELECT value FROM delta_meta WHERE name = 'records_version'").fetchone()
+            if version != (RECORDS_VERSION,):
+                chain = {}
+            computed = 0
+            previous = (None, None)
+            previous_records = None
+            for report_date, content_hash in snapshots:
+                if chain.get(report_date) != (previous[0], content_hash, previous[1]):
+                    if previous_records is None:
+                        previous_records = snapshot_records(conn, previous[0]) if previous[0] else {}
+                    records = snapshot_records(conn, report_date)
+                    rows = delta(previous_records, records)
+                    with conn:
+                        conn.execute("DELETE FROM snapshot_deltas WHERE report_date = ?", (report_date,))
+                        conn.executemany("INSERT INTO snapshot_deltas VALUES (?, ?, ?, ?, ?, ?)",
+                                         [(report_date, *row) for row in rows])
+                        conn.execute("INSERT OR REPLACE INTO delta_chain VALUES (?, ?, ?, ?, ?, ?)",
+                                     (report_date, previous[0], content_hash, previous[1], len(rows),
+                                      datetime.now().isoformat(timespec="seconds")))
+                    previous_records = records
+                    computed += 1
+                else:
+                    previous_records = None
+                previous = (report_date, content_hash)
+            conn.execute(
+                "DELETE FROM snapshot_deltas WHERE report_date NOT IN (SELECT report_date FROM snapshots)")
+            conn.execute("INSERT OR REPLACE INTO delta_meta VALUES ('records_version', ?)", (RECORDS_VERSION,))
+            conn.commit()
+        finally:
+            conn.close()
+        _sync_state[db_path] = data_store.store_signature(db_path)
+        return computed
+
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _diff(db_path, signature, start, end):
+    conn = connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT section, key, field, old_value, new_value FROM snapshot_deltas "
+            "WHERE report_date > ? AND report_date <= ? ORDER BY report_date",
+            (start, end)).fetchall()
+    finally:
+        conn.close()
+    # Composition : première valeur avant, dernière valeur après
+    net = {}
+    for section, key, field, old_value, new_value in rows:
+        record = (section, key, field)
+        first = net[record][0] if record in net else old_value
+        net[record] = (first, new_value)
+    return [(*record, old, new) for record, (old, new) in net.items() if old != new]
+
+
+def diff_reports(old_date, new_date, db_path=data_store.DEFAULT_DB_PATH):
+    """Changements champ par champ entre deux dates de rapport.
+
+    Renvoie une liste de dicts (section, key, field, change, old, new) triée par
+    section puis clé ; change vaut "ajouté", "retiré" ou "modifié". Si old_date est
+    postérieure à new_date, les deltas sont composés à rebours.
+    """
+    sync_deltas(db_path)
+    dates = set(data_store.list_snapshots(db_path))
+    for report_date in (old_date, new_date):
+        if report_date not in dates:
+            raise KeyError(f"Aucun rapport pour la date {report_date}")
+    reverse = old_date > new_date
+    start, end = (new_date, old_date) if reverse else (old_date, new_date)
+    changes = []
+    for section, key, field, old, new in _diff(db_path, data_store.store_signature(db_path), start, end):
+        if reverse:
+            old, new = new, old
+        changes.append({
+            "section": section, "key": key, "field": field,
+            "change": "ajouté" if old is None else "retiré" if new is None else "modifié",
+            "old": None if old is None else json.loads(old),
+            "new": None if new is None else json.loads(new),
+        })
+    order = list(SECTIONS)
+    changes.sort(key=lambda c: (order.index(c["section"]) if c["section"] in order else len(order), c["key"], c["field"]))
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Différences entre deux rapports AIEA")
+    parser.add_argument("--db", default=data_store.DEFAULT_DB_PATH, help="chemin de la base SQLite")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("sync", help="calculer les deltas manquants")
+    sub_diff = sub.add_parser("diff", help="afficher les changements entre deux dates")
+    sub_diff.add_argument("old_date")
+    sub_diff.add_argument("new_date")
+    args = parser.parse_args()
+
+    if args.command == "sync":
+        print(f"{sync_deltas(args.db)} rapport(s) recalculé(s)")
+    else:
+        for change in diff_reports(args.old_date, args.new_date, args.db):
+            print(f"[{change['section']}] {change['key'] or '-'} . {change['field']} ({change['change']}) : "
+                  f"{change['old']} -> {change['new']}")
+
+
+if __name__ == "__main__":
+    main()
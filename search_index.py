@@ -0,0 +1,391 @@
+# search_index.py - Index de recherche plein texte des déclarations, négociations et événements
+#
+# Index inversé persistant (SQLite) avec classement BM25. Les textes sont normalisés avant
+# indexation : pliage des accents et de la casse (français), unification des variantes de
+# lettres arabes/persanes, suppression des diacritiques, du tatweel et de l'antiliant (ZWNJ).
+# Les documents sont identifiés par l'empreinte de leur contenu : réindexer un rapport
+# n'ajoute que les documents nouveaux.
+#
+# Chaque terme est une ligne (numéros de documents, fréquences) stockée en tableaux binaires :
+# une requête lit une ligne par terme et calcule les scores avec numpy. Les métadonnées des
+# documents (type, date, source, longueur) sont gardées en mémoire pour les filtres et
+# complétées à chaque requête avec les seuls documents ajoutés depuis.
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB_PATH = os.environ.get("IAEA_SEARCH_DB", os.path.join(BASE_DIR, "data", "search_index.sqlite"))
+
+# Paramètres BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+PAGE_SIZE = 20
+
+# Types de documents indexés -> libellé affiché
+DOCUMENT_KINDS = {"statement": "Déclaration", "negotiation": "Négociation", "event": "Chronologie"}
+
+# Variantes arabes -> lettres persanes, chiffres persans/arabes -> chiffres latins
+PERSIAN_MAP = str.maketrans({
+    "\u064a": "\u06cc", "\u0649": "\u06cc",  # ي ى -> ی
+    "\u0643": "\u06a9",                      # ك -> ک
+    "\u0629": "\u0647",                      # ة -> ه
+    "\u0640": None,                          # tatweel
+    "\u200c": None, "\u200d": None,          # antiliant (ZWNJ) / liant
+    **{chr(0x06f0 + i): str(i) for i in range(10)},
+    **{chr(0x0660 + i): str(i) for i in range(10)},
+})
+
+STOPWORDS = {
+    "au", "aux", "avec", "ce", "ces", "dans", "de", "des", "du", "elle", "en", "et", "il", "la", "le",
+    "les", "leur", "mais", "ne", "ni", "ou", "par", "pas", "pour", "qu", "que", "qui", "sa", "se", "ses",
+    "son", "sur", "un", "une", "the", "of", "and", "to", "in",
+}
+
+TOKEN_RE = re.compile(r"\w+")
+# Mot du texte brut pour le surlignage : lettres, diacritiques et antiliant (ZWNJ) / liant compris
+WORD_RE = re.compile(r"(?:\w|[\u0300-\u036f\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u200c\u200d])+")
+
+# Version de la normalisation des termes (PRAGMA user_version) : un index construit avec une
+# autre version est vidé, puis reconstruit au fil des rapports
+INDEX_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_ord INTEGER PRIMARY KEY,
+    doc_id TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    date TEXT NOT NULL,
+    source TEXT,
+    title TEXT,
+    body TEXT NOT NULL,
+    parties TEXT,
+    length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT PRIMARY KEY,
+    doc_ords BLOB NOT NULL,
+    tfs BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS document_parties (
+    party TEXT NOT NULL,
+    doc_ord INTEGER NOT NULL,
+    PRIMARY KEY (party, doc_ord)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS indexed_reports (
+    data_version TEXT PRIMARY KEY
+);
+"""
+
+# Types des tableaux binaires des listes de documents
+ORD_DTYPE = np.int32
+TF_DTYPE = np.uint16
+
+# Rapports déjà indexés dans ce processus (évite une requête par rerun)
+_indexed_versions = set()
+_index_lock = threading.Lock()
+# Métadonnées des documents en mémoire, par index (complétées au fil des ajouts)
+_document_tables = {}
+_tables_lock = threading.Lock()
+
+
+def normalize(text):
+    """Forme normalisée d'un texte : variantes persanes unifiées, sans accents ni diacritiques, en minuscules"""
+    decomposed = unicodedata.normalize("NFKD", unicodedata.normalize("NFKC", str(text)))
+    # Variantes unifiées après suppression des diacritiques (ئ -> ي + hamza -> ی)
+    folded = "".join(c for c in decomposed if not unicodedata.combining(c)).translate(PERSIAN_MAP)
+    return unicodedata.normalize("NFC", folded).casefold()
+
+
+def tokenize(text):
+    """Termes indexés d'un texte (normalisés, sans mots vides ni lettres isolées)"""
+    return [t for t in TOKEN_RE.findall(normalize(text)) if len(t) > 1 and t not in STOPWORDS]
+
+
+def connect(db_path=DEFAULT_DB_PATH):
+    """Ouvre une connexion SQLite et crée le schéma si nécessaire"""
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.executescript(SCHEMA)
+    if conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+        with conn:
+            for table in ("documents", "postings", "document_parties", "indexed_reports"):
+                conn.execute(f"DELETE FROM {table}")
+        conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+    return conn
+
+
+def documents_from_report(report):
+    """Documents indexables d'un rapport : déclarations, négociations et événements de la chronologie"""
+    for statement in report.get("statements", []):
+        yield {"kind": "statement", "date": str(statement["date"])[:10], "source": statement.get("source"),
+               "title": statement.get("source"), "body": statement.get("statement", ""), "parties": []}
+    for negotiation in report.get("negotiations", []):
+        parties = list(negotiation.get("parties") or [])
+        yield {"kind": "negotiation", "date": str(negotiation["date"])[:10], "source": negotiation.get("location"),
+               "title": f"{negotiation.get('location')} — {', '.join(parties)}",
+               "body": negotiation.get("outcome") or "", "parties": parties}
+    for event in report.get("timeline_events", []):
+        yield {"kind": "event", "date": str(event["date"])[:10], "source": None,
+               "title": event.get("type"), "body": event.get("event", ""), "parties": []}
+
+
+def document_id(document):
+    payload = json.dumps([document["kind"], document["date"], document["source"], document["body"],
+                          document["parties"]], ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:20]
+
+
+def add_documents(documents, db_path=DEFAULT_DB_PATH, report_version=None):
+    """Ajoute les documents absents de l'index (une transaction) ; renvoie le nombre ajouté.
+
+    Avec report_version, le rapport est marqué comme indexé dans la même
+    transaction, et ignoré s'il l'était déjà.
+    """
+    conn = connect(db_path)
+    try:
+        with conn:
+            if report_version is not None:
+                if conn.execute("SELECT 1 FROM indexed_reports WHERE data_version = ?",
+                                (report_version,)).fetchone() is not None:
+                    return 0
+                conn.execute("INSERT INTO indexed_reports VALUES (?)", (report_version,))
+            # Listes de documents des nouveaux documents, regroupées par terme avant écriture
+            new_postings = defaultdict(lambda: ([], []))
+            added = 0
+            for document in documents:
+                terms = Counter(tokenize(f"{document['title'] or ''} {document['body']}"))
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO documents (doc_id, kind, date, source, title, body, parties, length) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (document_id(document), document["kind"], document["date"], document["source"],
+                     document["title"], document["body"], json.dumps(document["parties"], ensure_ascii=False),
+                     sum(terms.values()))
+                )
+                if cursor.rowcount == 0:
+                    continue
+                doc_ord = cursor.lastrowid
+                for term, tf in terms.items():
+                    ords, tfs = new_postings[term]
+                    ords.append(doc_ord)
+                    tfs.append(min(tf, np.iinfo(TF_DTYPE).max))
+                conn.executemany("INSERT OR IGNORE INTO document_parties VALUES (?, ?)",
+                                 [(party, doc_ord) for party in document["parties"]])
+                added += 1
+
+            # Les numéros croissent : les nouveaux documents s'ajoutent en fin de liste
+            for term, (ords, tfs) in new_postings.items():
+                row = conn.execute("SELECT doc_ords, tfs FROM postings WHERE term = ?", (term,)).fetchone()
+                ords = np.asarray(ords, dtype=ORD_DTYPE).tobytes()
+                tfs = np.asarray(tfs, dtype=TF_DTYPE).tobytes()
+                if row is not None:
+                    ords, tfs = row[0] + ords, row[1] + tfs
+                conn.execute("INSERT OR REPLACE INTO postings VALUES (?, ?, ?)", (term, ords, tfs))
+        return added
+    finally:
+        conn.close()
+
+
+def sync_report(report, db_path=DEFAULT_DB_PATH):
+    """Indexe les documents d'un rapport (instantané) s'il ne l'a pas déjà été"""
+    key = (os.path.abspath(db_path), report.get("data_version"))
+    if key in _indexed_versions:
+        return 0
+    with _index_lock:
+        added = add_documents(documents_from_report(report), db_path, report_version=report.get("data_version"))
+        _indexed_versions.add(key)
+        return added
+
+
+def _document_table(conn, db_path):
+    """Métadonnées des documents indexées par numéro (complétées avec les documents ajoutés depuis)"""
+    with _tables_lock:
+        table = _document_tables.get(db_path)
+        if table is None:
+            table = {"max_ord": 0, "kind": np.zeros(1, np.int8), "date": np.zeros(1, np.int32),
+                     "source": np.full(1, -1, np.int32), "length": np.zeros(1, np.int32),
+                     "source_codes": {}}
+        rows = conn.execute("SELECT doc_ord, kind, date, source, length FROM documents WHERE doc_ord > ? "
+                            "ORDER BY doc_ord", (table["max_ord"],)).fetchall()
+        if rows:
+            kinds = list(DOCUMENT_KINDS)
+            size = rows[-1][0] + 1
+            table = dict(table)
+            for key, fill in (("kind", 0), ("date", 0), ("source", -1), ("length", 0)):
+                grown = np.full(size, fill, dtype=table[key].dtype)
+                grown[:len(table[key])] = table[key]
+                table[key] = grown
+            codes = table["source_codes"] = dict(table["source_codes"])
+            ords = np.fromiter((r[0] for r in rows), np.int64, len(rows))
+            table["kind"][ords] = [kinds.index(r[1]) for r in rows]
+            table["date"][ords] = [int(r[2].replace("-", "")[:8]) for r in rows]
+            table["source"][ords] = [-1 if r[3] is None else codes.setdefault(r[3], len(codes)) for r in rows]
+            table["length"][ords] = [r[4] for r in rows]
+            table["max_ord"] = rows[-1][0]
+            table["n_docs"] = table.get("n_docs", 0) + len(rows)
+            table["avg_length"] = max(float(table["length"].sum()) / table["n_docs"], 1.0)
+            _document_tables[db_path] = table
+        return table
+
+
+def _date_key(value):
+    return int(str(value)[:10].replace("-", ""))
+
+
+def _filter_mask(conn, table, kinds, source, party, start, end):
+    """Masque des documents retenus par les filtres (None : aucun filtre)"""
+    mask = None
+
+    def restrict(condition):
+        nonlocal mask
+        mask = condition if mask is None else mask & condition
+
+    if kinds:
+        restrict(np.isin(table["kind"], [list(DOCUMENT_KINDS).index(kind) for kind in kinds]))
+    if source:
+        restrict(table["source"] == table["source_codes"].get(source, -2))
+    if party:
+        ords = [row[0] for row in conn.execute("SELECT doc_ord FROM document_parties WHERE party = ?", (party,))]
+        selected = np.zeros(len(table["kind"]), dtype=bool)
+        selected[ords] = True
+        restrict(selected)
+    if start:
+        restrict(table["date"] >= _date_key(start))
+    if end:
+        restrict(table["date"] <= _date_key(end))
+    if mask is not None:
+        mask[0] = False
+    return mask
+
+
+def _top(candidates, primary, secondary, count):
+    """Les `count` premiers candidats par (primary, secondary) décroissants"""
+    if len(candidates) > count:
+        kth = np.argpartition(-primary[candidates], count - 1)[:count]
+        # Les ex aequo au rang limite sont conservés pour un ordre stable
+        threshold = primary[candidates[kth]].min()
+        candidates = candidates[primary[candidates] >= threshold]
+    order = np.lexsort((-secondary[candidates], -primary[candidates]))
+    return candidates[order[:count]]
+
+
+def search(query="", kinds=None, source=None, party=None, start=None, end=None,
+           page=1, page_size=PAGE_SIZE, match_all=True, db_path=DEFAULT_DB_PATH):
+    """Recherche classée (BM25) et paginée.
+
+    Renvoie {"total", "results", "terms"} ; chaque résultat est un dict
+    (doc_id, kind, date, source, title, body, parties, score). Sans terme de
+    recherche, les documents filtrés sont renvoyés du plus récent au plus ancien.
+    """
+    terms = sorted(set(tokenize(query)))
+    offset = (max(page, 1) - 1) * page_size
+    empty = {"total": 0, "results": [], "terms": terms}
+
+    conn = connect(db_path)
+    try:
+        table = _document_table(conn, db_path)
+        mask = _filter_mask(conn, table, kinds, source, party, start, end)
+        dates = table["date"]
+
+        if not terms:
+            candidates = np.flatnonzero(mask) if mask is not None else np.arange(1, table["max_ord"] + 1)
+            scores = None
+            page_ords = _top(candidates, dates, -np.arange(len(dates)), offset + page_size)[offset:]
+        else:
+            scores = np.zeros(len(dates))
+            hits = np.zeros(len(dates), dtype=np.int16)
+            n_docs, avg_length = table.get("n_docs", 0), table.get("avg_length", 1.0)
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * table["length"] / avg_length)
+            for term in terms:
+                row = conn.execute("SELECT doc_ords, tfs FROM postings WHERE term = ?", (term,)).fetchone()
+                if row is None:
+                    if match_all:
+                        return empty
+                    continue
+                ords = np.frombuffer(row[0], dtype=ORD_DTYPE)
+                tfs = np.frombuffer(row[1], dtype=TF_DTYPE).astype(float)
+                idf = math.log(1 + (n_docs - len(ords) + 0.5) / (len(ords) + 0.5))
+                scores[ords] += idf * tfs * (BM25_K1 + 1) / (tfs + norm[ords])
+                hits[ords] += 1
+            matched = hits == len(terms) if match_all else hits > 0
+            if mask is not None:
+                matched &= mask
+            candidates = np.flatnonzero(matched)
+            page_ords = _top(candidates, scores, dates, offset + page_size)[offset:]
+
+        total = len(candidates)
+        if not len(page_ords):
+            return {"total": total, "results": [], "terms": terms}
+        placeholders = ", ".join("?" * len(page_ords))
+        rows = {row[0]: row for row in conn.execute(
+            f"SELECT doc_ord, doc_id, kind, date, source, title, body, parties FROM documents "
+            f"WHERE doc_ord IN ({placeholders})", [int(o) for o in page_ords])}
+    finally:
+        conn.close()
+
+    results = []
+    for doc_ord in page_ords:
+        _, doc_id, kind, date, source_name, title, body, parties = rows[int(doc_ord)]
+        results.append({"doc_id": doc_id, "kind": kind, "date": date, "source": source_name, "title": title,
+                        "body": body, "parties": json.loads(parties or "[]"),
+                        "score": None if scores is None else float(scores[doc_ord])})
+    return {"total": total, "results": results, "terms": terms}
+
+
+def facets(db_path=DEFAULT_DB_PATH):
+    """Valeurs proposées pour les filtres : sources, parties et bornes de dates"""
+    conn = connect(db_path)
+    try:
+        table = _document_table(conn, db_path)
+        parties = [row[0] for row in conn.execute("SELECT DISTINCT party FROM document_parties ORDER BY party")]
+    finally:
+        conn.close()
+    dates = table["date"][1:]
+    bounds = [None, None]
+    if len(dates):
+        bounds = [f"{d // 10000:04d}-{d // 100 % 100:02d}-{d % 100:02d}" for d in (dates.min(), dates.max())]
+    return {"sources": sorted(table["source_codes"]), "parties": parties,
+            "first_date": bounds[0], "last_date": bounds[1]}
+
+
+def highlight(text, terms):
+    """Met en gras (Markdown) les mots du texte dont la forme normalisée est un terme recherché"""
+    if not terms:
+        return text
+    terms = set(terms)
+    return WORD_RE.sub(lambda m: f"**{m.group(0)}**" if normalize(m.group(0)) in terms else m.group(0), text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index de recherche des déclarations et négociations")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="chemin de l'index SQLite")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub_index = sub.add_parser("index", help="indexer des rapports JSON")
+    sub_index.add_argument("paths", nargs="+")
+    sub_search = sub.add_parser("search", help="rechercher")
+    sub_search.add_argument("query")
+    sub_search.add_argument("--page", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.command == "index":
+        for path in args.paths:
+            with open(path, encoding="utf-8") as f:
+                print(f"{path}: {add_documents(documents_from_report(json.load(f)), args.db)} document(s) ajouté(s)")
+    else:
+        response = search(args.query, page=args.page, db_path=args.db)
+        print(f"{response['total']} résultat(s)")
+        for result in response["results"]:
+            print(f"{result['date']}  [{DOCUMENT_KINDS[result['kind']]}] {result['title']} : {result['body']}")
+
+
+if __name__ == "__main__":
+    main()
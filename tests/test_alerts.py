@@ -0,0 +1,19 @@
+# tests/test_alerts.py - Bandeau d'alerte du tableau de bord
+from alerts import headline_alert
+
+
+def state(rule_id, severity, active, first_crossed):
+    return {"rule_id": rule_id, "severity": severity, "active": active, "first_crossed": first_crossed,
+            "active_since": first_crossed}
+
+
+def test_headline_is_most_severe_active_alert():
+    states = [state("jcpoa_limit", "warning", 1, "2019-07-01"),
+              state("weapons_grade", "critical", 0, None),
+              state("breakout_time", "critical", 1, "2026-03-10"),
+              state("significant_quantity", "critical", 1, "2026-02-27")]
+    assert headline_alert(states)["rule_id"] == "significant_quantity"
+
+
+def test_no_headline_without_active_alert():
+    assert headline_alert([state("jcpoa_limit", "warning", 0, "2019-07-01")]) is None
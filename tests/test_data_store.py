@@ -0,0 +1,26 @@
+# tests/test_data_store.py - Import du répertoire des rapports
+import json
+
+import data_store
+
+REPORT = {"report_date": "2026-02-27", "uranium_60_percent": 440.9, "thresholds": {}, "facilities": {}}
+
+
+def test_bad_report_files_are_skipped(tmp_path):
+    reports_dir = tmp_path / "reports"
+    reports_dir.mkdir()
+    (reports_dir / "2026-02-27.json").write_text(json.dumps(REPORT), encoding="utf-8")
+    # Même date, contenu différent ; JSON invalide ; rapport valide
+    (reports_dir / "2026-02-28.json").write_text(json.dumps({**REPORT, "uranium_60_percent": 1}), encoding="utf-8")
+    (reports_dir / "2026-03-01.json").write_text("{", encoding="utf-8")
+    (reports_dir / "2026-03-02.json").write_text(json.dumps({**REPORT, "report_date": "2026-03-02"}),
+                                                 encoding="utf-8")
+    db_path = str(tmp_path / "reports.sqlite")
+
+    assert data_store.sync_reports_dir(db_path, str(reports_dir)) == 2
+    conn = data_store.connect(db_path)
+    try:
+        dates = [row[0] for row in conn.execute("SELECT report_date FROM snapshots ORDER BY report_date")]
+    finally:
+        conn.close()
+    assert dates == ["2026-02-27", "2026-03-02"]
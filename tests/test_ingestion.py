@@ -0,0 +1,96 @@
+# tests/test_ingestion.py - Ingestion d'un CSV de section depuis un serveur local
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import data_store
+from ingestion import IngestionWorker, build_session
+
+LATEST = "2026-02-27"
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    # Base isolée : les rapports déposés dans data/reports ne sont pas importés
+    monkeypatch.setattr(data_store, "sync_reports_dir", lambda *args, **kwargs: 0)
+    path = str(tmp_path / "reports.sqlite")
+    data_store.write_snapshot({
+        "report_date": LATEST, "uranium_60_percent": 440.9, "uranium_total": 9247.6,
+        "weapons_potential": 10, "thresholds": {}, "facilities": {},
+        "enrichment_history": [{"date": "2026-01-01", "level": 60.0, "stock": 440.9}],
+        "statements": [{"date": LATEST, "source": "AIEA", "statement": "Accès refusé"}],
+    }, path)
+    return path
+
+
+@pytest.fixture
+def server():
+    """Serveur HTTP local : sert le contenu de server.files[chemin] en text/csv"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = httpd.files[self.path].encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.files = {}
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def poll(server, db_path, path, content):
+    server.files[path] = content
+    url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+    worker = IngestionWorker([url], db_path=db_path, session=build_session(retries=0))
+    added = worker.poll_once()
+    return added, worker.status[url]["error"]
+
+
+def report_dates(db_path):
+    conn = data_store.connect(db_path)
+    try:
+        return [row[0] for row in conn.execute("SELECT report_date FROM snapshots ORDER BY report_date")]
+    finally:
+        conn.close()
+
+
+def test_statements_on_latest_date_create_a_new_report(server, db_path):
+    csv = f"date,source,statement\n{LATEST},AIEA,Accès refusé\n{LATEST},Iran,Coopération suspendue\n"
+    for _ in range(2):
+        added, error = poll(server, db_path, "/statements.csv", csv)
+        assert error is None
+    dates = report_dates(db_path)
+    assert dates[0] == LATEST and len(dates) == 2
+    assert dates[1] >= date.today().isoformat()
+
+
+def test_older_history_is_not_backdated(server, db_path):
+    added, error = poll(server, db_path, "/history.csv", "date,level,stock\n2025-01-01,60,274.8\n")
+    assert (added, error) == (1, None)
+    assert report_dates(db_path)[-1] > LATEST
+
+
+def test_unchanged_section_is_ignored(server, db_path):
+    added, error = poll(server, db_path, "/statements.csv", f"date,source,statement\n{LATEST},AIEA,Accès refusé\n")
+    assert (added, error) == (0, None)
+    assert report_dates(db_path) == [LATEST]
+
+
+def test_explicit_report_date(server, db_path):
+    csv = "report_date,date,level,stock\n2026-03-15,2026-03-01,60,460\n"
+    assert poll(server, db_path, "/history.csv", csv) == (1, None)
+    assert report_dates(db_path) == [LATEST, "2026-03-15"]
+
+    added, error = poll(server, db_path, "/history.csv", csv.replace("2026-03-15", "2026-01-31"))
+    assert added == 0 and "antérieure" in error
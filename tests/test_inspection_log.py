@@ -0,0 +1,40 @@
+# tests/test_inspection_log.py - Agrégats du journal après renommage ou suppression d'un fichier
+import os
+
+from inspection_log import load_inspection_history
+
+LOG = """timestamp,facility,kind,value
+2025-01-10T08:00:00,Natanz,visit,
+2025-01-20T08:00:00,Fordow,visit,
+2025-02-05T08:00:00,Natanz,visit,
+2025-02-06T08:00:00,Natanz,stock,274.8
+"""
+
+
+def total_visits(db_path, log_dir):
+    return int(load_inspection_history(str(db_path), str(log_dir))["inspections_conducted"].sum())
+
+
+def test_renamed_then_deleted_log_file(tmp_path):
+    log_dir = tmp_path / "inspections"
+    log_dir.mkdir()
+    (log_dir / "inspection_log.csv").write_text(LOG, encoding="utf-8")
+    db_path = tmp_path / "inspection_log.sqlite"
+    assert total_visits(db_path, log_dir) == 3
+
+    os.rename(log_dir / "inspection_log.csv", log_dir / "journal_2025.csv")
+    assert total_visits(db_path, log_dir) == 3
+
+    os.remove(log_dir / "journal_2025.csv")
+    assert total_visits(db_path, log_dir) == 0
+
+
+def test_sources_survive_moving_the_checkout(tmp_path):
+    for name in ("a", "b"):
+        log_dir = tmp_path / name / "inspections"
+        log_dir.mkdir(parents=True)
+        (log_dir / "inspection_log.csv").write_text(LOG, encoding="utf-8")
+    db_path = tmp_path / "inspection_log.sqlite"
+    assert total_visits(db_path, tmp_path / "a" / "inspections") == 3
+    # Même base, même fichier vu depuis un autre emplacement : pas de double comptage
+    assert total_visits(db_path, tmp_path / "b" / "inspections") == 3
@@ -0,0 +1,35 @@
+# tests/test_report_diff.py - Déclarations et réunions d'un même jour dans les différences
+import pytest
+
+import data_store
+from report_diff import diff_reports
+
+BASE = {"uranium_60_percent": 440.9, "thresholds": {}, "facilities": {}}
+STATEMENT_A = {"date": "2026-02-20", "source": "AIEA", "statement": "A"}
+STATEMENT_B = {"date": "2026-02-20", "source": "AIEA", "statement": "B"}
+STATEMENT_C = {"date": "2026-02-20", "source": "AIEA", "statement": "C"}
+MEETING_1 = {"date": "2026-02-19", "location": "Genève", "parties": ["Iran", "États-Unis"], "outcome": "Reportée"}
+MEETING_2 = {"date": "2026-02-19", "location": "Genève", "parties": ["AIEA", "Iran"], "outcome": "Accord technique"}
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    # Base isolée : les rapports déposés dans data/reports ne sont pas importés
+    monkeypatch.setattr(data_store, "sync_reports_dir", lambda *args, **kwargs: 0)
+    path = str(tmp_path / "reports.sqlite")
+    data_store.write_snapshot({**BASE, "report_date": "2026-02-01",
+                               "statements": [STATEMENT_A, STATEMENT_B], "negotiations": [MEETING_1]}, path)
+    data_store.write_snapshot({**BASE, "report_date": "2026-02-27",
+                               "statements": [STATEMENT_A, STATEMENT_B, STATEMENT_C],
+                               "negotiations": [MEETING_1, MEETING_2]}, path)
+    return path
+
+
+def test_same_day_records_are_added_not_modified(db_path):
+    changes = [(c["section"], c["change"], c["new"]) for c in diff_reports("2026-02-01", "2026-02-27", db_path)]
+    assert changes == [("statements", "ajouté", "C"), ("negotiations", "ajouté", "Accord technique")]
+
+
+def test_reverse_diff_removes_them(db_path):
+    changes = [(c["section"], c["change"], c["old"]) for c in diff_reports("2026-02-27", "2026-02-01", db_path)]
+    assert changes == [("statements", "retiré", "C"), ("negotiations", "retiré", "Accord technique")]
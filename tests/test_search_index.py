@@ -0,0 +1,16 @@
+# tests/test_search_index.py - Normalisation et surlignage (variantes persanes, antiliant)
+from search_index import highlight, normalize, tokenize
+
+
+def test_yeh_variants_match():
+    assert normalize("ئ") == normalize("ي") == normalize("ی") == "ی"
+    assert normalize("كتاب") == normalize("کتاب")
+
+
+def test_zwnj_word_is_one_term_and_highlighted():
+    assert tokenize("غنی‌سازی") == ["غنیسازی"]
+    assert highlight("برنامه غنی‌سازی اورانیوم", tokenize("غنیسازی")) == "برنامه **غنی‌سازی** اورانیوم"
+
+
+def test_accents_folded_in_highlight():
+    assert highlight("L'Iran a refusé l'accès", tokenize("refuse acces")) == "L'Iran a **refusé** l'**accès**"
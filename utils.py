@@ -0,0 +1,157 @@
+# utils.py - Fonctions utilitaires partagées par les pages du tableau de bord
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import infer_dtype, is_float_dtype, is_integer_dtype
+
+# Nombre d'entrées des tables de libellés du formatage vectorisé (entiers en unités de 10^-décimales)
+FORMAT_TABLE_SIZE = 1 << 14
+
+def compact_frame(df):
+    """Copie de df en types compacts : catégories pour le texte répétitif (si plus léger),
+    petits entiers, float32 lorsque la conversion est exacte. Les dates et les autres
+    colonnes sont conservées."""
+    columns = {}
+    for name, series in df.items():
+        if is_integer_dtype(series.dtype):
+            series = pd.to_numeric(series, downcast="integer")
+        elif is_float_dtype(series.dtype):
+            values = series.to_numpy()
+            as_float32 = values.astype(np.float32)
+            # float32 seulement si toutes les valeurs (NaN compris) sont représentées exactement
+            if np.array_equal(as_float32.astype(values.dtype), values, equal_nan=True):
+                series = series.astype(np.float32)
+        elif series.dtype == object and infer_dtype(series, skipna=True) == "string":
+            categorical = series.astype("category")
+            # Catégorie seulement si elle occupe moins de mémoire que les chaînes
+            if categorical.memory_usage(deep=True) < series.memory_usage(deep=True):
+                series = categorical
+        columns[name] = series
+    return pd.DataFrame(columns, index=df.index)
+
+
+def frame_bytes(df):
+    """Mémoire occupée par un DataFrame, chaînes comprises (octets)"""
+    return int(df.memory_usage(deep=True).sum())
+
+
+MONTHS_FR = ["janvier", "février", "mars", "avril", "mai", "juin", "juillet",
+             "août", "septembre", "octobre", "novembre", "décembre"]
+
+
+def format_date_fr(value):
+    """Formate une date (ou une chaîne ISO) en « 10 juin 2025 »"""
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    return f"{value.day} {MONTHS_FR[value.month - 1]} {value.year}"
+
+
+def format_uranium_kg(value, include_bombs=True):
+    """Formate une quantité d'uranium en kg avec équivalent bombes"""
+    if value is None or value == 0:
+        return "N/A"
+    
+    if value >= 1000:
+        result = f"{value/1000:.2f} tonnes"
+    else:
+        result = f"{value:.1f} kg"
+    
+    if include_bombs and value > 0:
+        bombs_possible = value / 42  # 42 kg à 60% = 1 bombe potentielle 
+        result += f" (≈ {bombs_possible:.1f} bombes potentielles)"
+    
+    return result
+
+def get_threat_level(percentage):
+    """Détermine le niveau de menace basé sur le pourcentage d'enrichissement"""
+    if percentage >= 90:
+        return "CRITIQUE", "🔴"
+    elif percentage >= 60:
+        return "ÉLEVÉ", "🟠"
+    elif percentage >= 20:
+        return "MODÉRÉ", "🟡"
+    else:
+        return "FAIBLE", "🟢"
+
+def get_facility_status_color(status):
+    """Retourne une couleur basée sur le statut d'accès"""
+    if "non autorisé" in status.lower() or "Non" in status:
+        return "#DA0000"
+    elif "partiel" in status.lower():
+        return "#FFA500"
+    else:
+        return "#239F40"
+
+
+# Versions vectorisées : une passe sur une colonne entière, sortie identique aux fonctions
+# scalaires ci-dessus. Elles renvoient un tableau NumPy (objets str), ou une Series de même
+# index si l'entrée est une Series.
+
+def _like(values, result):
+    if isinstance(values, pd.Series):
+        return pd.Series(result, index=values.index, name=values.name)
+    return result
+
+
+@lru_cache(maxsize=None)
+def _fixed_table(decimals, prefix, suffix):
+    scale = 10 ** decimals
+    return np.array([f"{prefix}{n // scale}.{n % scale:0{decimals}d}{suffix}" for n in range(FORMAT_TABLE_SIZE)],
+                    dtype=object)
+
+
+def format_fixed(values, decimals, prefix="", suffix=""):
+    """Équivalent vectorisé de f"{prefix}{v:.{decimals}f}{suffix}" (decimals >= 1) sur un tableau de flottants"""
+    values = np.asarray(values, dtype=float)
+    magnitude = np.abs(values) * 10 ** decimals
+    rounded = np.rint(magnitude)
+    # Libellés complets (préfixe et suffixe compris) lus dans une table ; format() Python
+    # (arrondi décimal exact) pour les valeurs négatives, proches d'une demi-unité, hors
+    # table ou non finies
+    with np.errstate(invalid="ignore"):
+        fast = (np.isfinite(magnitude) & (rounded < FORMAT_TABLE_SIZE) & ~np.signbit(values)
+                & (np.abs(magnitude - np.floor(magnitude) - 0.5) > 1e-6))
+    result = np.empty(values.shape, dtype=object)
+    result[fast] = _fixed_table(decimals, prefix, suffix)[rounded[fast].astype(np.int64)]
+    result[~fast] = [f"{prefix}{value:.{decimals}f}{suffix}" for value in values[~fast]]
+    return result
+
+
+def format_uranium_kg_array(values, include_bombs=True):
+    """format_uranium_kg appliquée à une colonne (None et 0 -> "N/A")"""
+    raw = np.asarray(values)
+    if raw.dtype == object:
+        raw = np.where(np.equal(raw, None), 0.0, raw)
+    amounts = raw.astype(float)
+    result = np.empty(amounts.shape, dtype=object)
+    tonnes = amounts >= 1000
+    result[tonnes] = format_fixed(amounts[tonnes] / 1000, 2, suffix=" tonnes")
+    result[~tonnes] = format_fixed(amounts[~tonnes], 1, suffix=" kg")
+    if include_bombs:
+        positive = amounts > 0
+        # 42 kg à 60% = 1 bombe potentielle
+        result[positive] += format_fixed(amounts[positive] / 42, 1, " (≈ ", " bombes potentielles)")
+    result[amounts == 0] = "N/A"
+    return _like(values, result)
+
+
+THREAT_LEVELS = np.array([("CRITIQUE", "🔴"), ("ÉLEVÉ", "🟠"), ("MODÉRÉ", "🟡"), ("FAIBLE", "🟢")], dtype=object)
+
+
+def threat_levels(percentages):
+    """get_threat_level appliquée à une colonne : (niveaux, icônes)"""
+    values = np.asarray(percentages, dtype=float)
+    with np.errstate(invalid="ignore"):
+        tiers = np.select([values >= 90, values >= 60, values >= 20], [0, 1, 2], 3)
+    return _like(percentages, THREAT_LEVELS[tiers, 0]), _like(percentages, THREAT_LEVELS[tiers, 1])
+
+
+def facility_status_colors(statuses):
+    """get_facility_status_color appliquée à une colonne (valeur manquante traitée comme "")"""
+    # Peu de statuts distincts : la fonction scalaire n'est appelée qu'une fois par valeur
+    codes, uniques = pd.factorize(np.asarray(statuses, dtype=object))
+    colors = np.array([get_facility_status_color(status) for status in uniques]
+                      + [get_facility_status_color("")], dtype=object)
+    return _like(statuses, colors[codes])